@@ -0,0 +1,35 @@
+"""peyote benchmark configuration.
+
+Run with ``poe bench``, which saves the results as JSON under .benchmarks/
+so that ``poe bench-compare`` can check a later run against them.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+# Benchmarks run without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Canvas sizes (w, h) used by the size-dependent benchmarks
+SIZES = [(320, 180), (640, 360), (1920, 1080)]
+
+
+def size_id(size: tuple[int, int]) -> str:
+    """Return a readable benchmark id for a canvas size."""
+    return "{}x{}".format(*size)
+
+
+@pytest.fixture(params=SIZES, ids=size_id)
+def size(request: pytest.FixtureRequest) -> tuple[int, int]:
+    """Return each benchmark canvas size in turn."""
+    return request.param
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Return an isolated data directory for sketch packages."""
+    path = tmp_path / "data"
+    monkeypatch.setenv("XDG_DATA_HOME", str(path))
+    return path
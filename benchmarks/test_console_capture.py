@@ -0,0 +1,25 @@
+"""Benchmark sketch output capture when nobody drains it."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from peyote.ide.console_capture import ConsoleCapture
+
+# print() writes the text and the newline separately, so a full capture
+# holds this many chunks
+FULL_CHUNKS = 200_000
+WRITES = 10_000
+
+
+def test_write_when_full(benchmark) -> None:  # noqa: ANN001
+    """Write to a full capture, which drops its oldest chunk every write."""
+    capture = ConsoleCapture(max_chars=FULL_CHUNKS)
+    for _ in range(FULL_CHUNKS):
+        capture.write("\n")
+
+    def write() -> None:
+        for _ in range(WRITES):
+            capture.write("\n")
+
+    benchmark(write)
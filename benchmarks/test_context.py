@@ -0,0 +1,90 @@
+"""Benchmark the pixel, blit and cairo paths of graphics.Context."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("cairo")
+pygame = pytest.importorskip("pygame")
+np = pytest.importorskip("numpy")
+
+from peyote.graphics import Context  # noqa: E402
+
+PIXELS = 1000
+
+
+@pytest.fixture
+def context(size: tuple[int, int]) -> Context:
+    """Return a Context of the benchmark size."""
+    return Context({}, size)
+
+
+@pytest.fixture
+def coords(size: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Return PIXELS random coordinates inside the canvas."""
+    rng = np.random.default_rng(0)
+    w, h = size
+    return rng.integers(0, w, PIXELS), rng.integers(0, h, PIXELS)
+
+
+def test_set_pixel(benchmark, context: Context, coords) -> None:  # noqa: ANN001
+    """Set PIXELS pixels one call at a time."""
+    points = list(zip(*(c.tolist() for c in coords), strict=True))
+
+    def run() -> None:
+        for x, y in points:
+            context.set_pixel(x, y, (255, 128, 0))
+
+    benchmark(run)
+
+
+def test_get_pixel(benchmark, context: Context, coords) -> None:  # noqa: ANN001
+    """Read PIXELS pixels one call at a time."""
+    points = list(zip(*(c.tolist() for c in coords), strict=True))
+
+    def run() -> None:
+        for x, y in points:
+            context.get_pixel(x, y)
+
+    benchmark(run)
+
+
+def test_set_pixels(benchmark, context: Context, coords) -> None:  # noqa: ANN001
+    """Set PIXELS pixels in one vectorized call."""
+    benchmark(context.set_pixels, *coords, (255, 128, 0))
+
+
+def test_blit(benchmark, context: Context, size: tuple[int, int]) -> None:  # noqa: ANN001
+    """Blit a full-canvas pygame surface."""
+    surface = pygame.Surface(size)
+    surface.fill((0, 128, 255))
+    benchmark(context.blit, surface, (0, 0))
+
+
+def test_blit_a(benchmark, context: Context, size: tuple[int, int]) -> None:  # noqa: ANN001
+    """Blit a full-canvas (w, h, 3) array."""
+    w, h = size
+    array = np.full((w, h, 3), 128, dtype=np.uint8)
+    benchmark(context.blit_a, array, (0, 0))
+
+
+def test_cairo_cycle(benchmark, context: Context) -> None:  # noqa: ANN001
+    """Enter and exit the cairo context without drawing."""
+
+    def run() -> None:
+        with context:
+            pass
+
+    benchmark(run)
+
+
+def test_cairo_fill(benchmark, context: Context, size: tuple[int, int]) -> None:  # noqa: ANN001
+    """Fill the canvas with cairo, including the enter/exit cycle."""
+    w, h = size
+
+    def run() -> None:
+        with context as cr:
+            cr.set_source_rgb(0.2, 0.4, 0.8)
+            cr.rectangle(0, 0, w, h)
+            cr.fill()
+
+    benchmark(run)
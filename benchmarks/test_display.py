@@ -0,0 +1,39 @@
+"""Benchmark clearing and exporting the display framebuffers."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("PySide6")
+
+from peyote.ide.display_widget import FramebufferWidget, OffscreenWidget
+
+GIF_FRAMES = 10
+
+
+def test_framebuffer_clear(benchmark, qapp, size: tuple[int, int]) -> None:  # noqa: ANN001, ARG001
+    """Clear the on-screen framebuffer."""
+    widget = FramebufferWidget(*size)
+    benchmark(widget.clear, (30, 60, 90))
+
+
+def test_save_png(benchmark, size: tuple[int, int], tmp_path: Path) -> None:  # noqa: ANN001
+    """Save a frame as PNG."""
+    widget = OffscreenWidget(*size)
+    widget.rgb[..., 0] = 200
+    path = str(tmp_path / "frame.png")
+    assert benchmark(widget.save_png, path)
+
+
+def test_save_gif(benchmark, size: tuple[int, int], tmp_path: Path) -> None:  # noqa: ANN001
+    """Save GIF_FRAMES frames as an animated GIF."""
+    widget = OffscreenWidget(*size)
+    path = str(tmp_path / "frames.gif")
+
+    def frames():  # noqa: ANN202
+        for index in range(GIF_FRAMES):
+            widget.clear((index * 20, 0, 255 - index * 20))
+            yield widget.framebuffer
+
+    assert benchmark(lambda: widget.save_gif(path, frames()))
@@ -0,0 +1,40 @@
+"""Benchmark full-frame runs of the bundled example sketches."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("PySide6")
+
+from peyote.ide.headless import HeadlessRenderer, read_sketch_modules
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples" / "ide_examples"
+
+# The top-level examples/*.py predate the IDE (and Python 3), so only the
+# IDE examples are run
+EXAMPLES = sorted(path for path in EXAMPLES_DIR.iterdir() if path.is_dir())
+
+FRAMES = 30
+
+
+@pytest.mark.parametrize("example", EXAMPLES, ids=lambda path: path.name)
+def test_example_frames(
+    benchmark,  # noqa: ANN001
+    qapp,  # noqa: ANN001, ARG001
+    data_dir: Path,  # noqa: ARG001
+    example: Path,
+    size: tuple[int, int],
+) -> None:
+    """Run setup() and FRAMES draw() calls of an example sketch."""
+    modules = read_sketch_modules(example)
+    renderer = HeadlessRenderer(*size, project_name=f"bench_{example.name}")
+
+    def run() -> int:
+        renderer.load(modules, "main")
+        return sum(1 for _ in renderer.iter_frames(FRAMES))
+
+    try:
+        assert benchmark(run) == FRAMES
+    finally:
+        renderer.unload()
@@ -0,0 +1,39 @@
+"""Benchmark the syntax highlighter on a large file."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("PySide6")
+
+from PySide6.QtWidgets import QPlainTextEdit
+
+from peyote.ide.syntax_highlighter import PythonSyntaxHighlighter
+
+CHUNK = '''
+def draw(frame=0):
+    """Draw one frame.
+
+    Docstrings span lines, so the highlighter carries state across blocks.
+    """
+    for index in range(100):  # loop over the particles
+        x = abs(index * 0.5 - frame) % WIDTH
+        print(f"particle {index}: {x:.2f}", 'done', 0x1F)
+    return len([x for x in range(10) if x > 3])
+'''
+
+LINES = 6000
+
+
+@pytest.fixture
+def editor(qtbot) -> QPlainTextEdit:  # noqa: ANN001
+    """Return an editor holding about LINES lines of Python."""
+    editor = QPlainTextEdit()
+    qtbot.addWidget(editor)
+    editor.highlighter = PythonSyntaxHighlighter(editor.document())
+    editor.setPlainText(CHUNK * (LINES // CHUNK.count("\n")))
+    return editor
+
+
+def test_rehighlight(benchmark, editor: QPlainTextEdit) -> None:  # noqa: ANN001
+    """Highlight the whole document from scratch."""
+    benchmark(editor.highlighter.rehighlight)
@@ -9,8 +9,8 @@ import typer
 from loguru import logger
 
 from .ide_subcommand import cli as ide_cli
+from .render_subcommand import cli as render_cli
 from .self_subcommand import cli as self_cli
-from .settings import Settings
 from .smoke_subcommand import cli as smoke_cli
 
 cli = typer.Typer()
@@ -21,6 +21,12 @@ cli.add_typer(
     help="Launch the Peyote IDE for creating generative art sketches.",
 )
 
+cli.add_typer(
+    render_cli,
+    name="render",
+    help="Render sketches headlessly to image files.",
+)
+
 cli.add_typer(
     self_cli,
     name="self",
@@ -45,10 +51,14 @@ def global_callback(
     ),
 ) -> None:
     """Create visually attractive computational artifacts"""
+    # Import here so that --help and completion don't load pydantic
+    from .settings import Settings
+
     ctx.obj = Settings()
     debug = debug or ctx.obj.debug
     (logger.enable if debug else logger.disable)("peyote")
-    logger.add("peyote.log")
+    if debug:
+        logger.add("peyote.log")
     logger.info(f"{debug=}")
 
 
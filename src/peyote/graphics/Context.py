@@ -1,29 +1,219 @@
 import pygame
 import cairo
+import numpy as np
 from pprint import pprint
 
+from ..util import compositing
+from ..util.framebuffer import Framebuffer, premultiply, unpremultiply
+
+# Drawing state carried over when size() rebuilds the cairo context, as
+# (getter, setter) pairs
+_CAIRO_STATE = [
+    ("get_source", "set_source"),
+    ("get_operator", "set_operator"),
+    ("get_antialias", "set_antialias"),
+    ("get_fill_rule", "set_fill_rule"),
+    ("get_tolerance", "set_tolerance"),
+    ("get_line_width", "set_line_width"),
+    ("get_line_cap", "set_line_cap"),
+    ("get_line_join", "set_line_join"),
+    ("get_miter_limit", "set_miter_limit"),
+    ("get_dash", "set_dash"),
+    ("get_matrix", "set_matrix"),
+    ("get_font_face", "set_font_face"),
+    ("get_font_matrix", "set_font_matrix"),
+    ("get_font_options", "set_font_options"),
+]
+
 class Context:
-    def __init__(self, namespace, dims=(256,256)):
-        self._surface = pygame.Surface(dims, pygame.SRCALPHA, 32)
+    def __init__(self, namespace, dims=(256,256), framebuffer=None):
+        """Draw with pygame, cairo and NumPy into one framebuffer.
+
+        framebuffer is an optional peyote.util.framebuffer.Framebuffer of
+        size dims to draw into, e.g. the IDE display's, so frames reach
+        the screen without a copy. The pixel methods and pygame drawing
+        (clear, set_pixel, get_pixel, blit, blit_a) take and return
+        straight colors for premultiplied framebuffers too; pixel_view()
+        and cairo see the stored, premultiplied values.
+
+        A Context drawing into a given framebuffer can't change its size,
+        since others share the pixels; size() raises ValueError instead.
+
+        When the framebuffer is one tile of a larger canvas, e.g. a poster,
+        the cairo context maps canvas coordinates to the tile between
+        start_cairo_context() and end_cairo_context().
+        """
         self._namespace = namespace
         self._background = (0,0,0,0)
-        self._cairo_state = None
+        self._cairo = None
+        self._placement = None
+        self._shared = framebuffer is not None
+        self._allocate(*dims, framebuffer=framebuffer)
         
     def clear(self,color=(0,0,0)):
         self._surface.fill(color)
+        self._premultiply(self._surface.get_rect())
+        self._framebuffer.mark_dirty()
 
     def size(self, w, h):
         global WIDTH, HEIGHT
+        resize = (w, h) != (self._framebuffer.w, self._framebuffer.h)
+        if resize and self._shared:
+            raise ValueError(
+                f"Can't resize a shared {self._framebuffer.w}x"
+                f"{self._framebuffer.h} framebuffer to {w}x{h}")
         self._namespace["WIDTH"] = w
         self._namespace["HEIGHT"] = h
-        del self._surface
-        self._surface = pygame.Surface((w,h), pygame.SRCALPHA, 32)
+        if resize:
+            # The cairo context is rebuilt for the new surface, keeping its
+            # drawing state
+            self._allocate(w, h)
+
+    @property
+    def framebuffer(self):
+        return self._framebuffer
+
+    def _allocate(self, w, h, framebuffer=None):
+        # pygame, cairo and NumPy all wrap this one buffer, without copies
+        # and without holding a surface lock, so blits work while cairo is
+        # live
+        state = self._save_cairo_state()
+        if framebuffer is None:
+            framebuffer = Framebuffer(w, h)
+            framebuffer.fill((0, 0, 0, 0))
+        self._framebuffer = framebuffer
+        self._pixels = framebuffer.pixels
+        self._surface = framebuffer.pygame_surface()
+        self._cairo_surface = framebuffer.cairo_surface()
+        self._cairo = cairo.Context(self._cairo_surface)
+        self._restore_cairo_state(state)
         
     def set_pixel(self, x, y, color):
         self._surface.set_at((x,y),color)
+        self._premultiply(pygame.Rect(x, y, 1, 1))
+        self._framebuffer.mark_dirty(x, y, 1, 1)
 
     def get_pixel(self, x, y):
-        return self._surface.get_at((x,y))
+        color = self._surface.get_at((x,y))
+        if self._framebuffer.premultiplied:
+            r, g, b = unpremultiply(np.array(color[:3], dtype=np.uint8), color.a)
+            color = pygame.Color(int(r), int(g), int(b), color.a)
+        return color
+
+    def _unpremultiply(self, rect):
+        # pygame reads and writes straight alpha: premultiplied pixels are
+        # made straight before pygame blends onto them, and premultiplied
+        # again afterwards. The round trip is exact
+        rect = rect.clip(self._surface.get_rect())
+        if self._framebuffer.premultiplied and rect.w and rect.h:
+            rows, cols = slice(rect.top, rect.bottom), slice(rect.left, rect.right)
+            fb = self._framebuffer
+            fb.rgb[rows, cols] = unpremultiply(fb.rgb[rows, cols],
+                                               fb.alpha[rows, cols])
+
+    def _premultiply(self, rect):
+        rect = rect.clip(self._surface.get_rect())
+        if self._framebuffer.premultiplied and rect.w and rect.h:
+            rows, cols = slice(rect.top, rect.bottom), slice(rect.left, rect.right)
+            fb = self._framebuffer
+            fb.rgb[rows, cols] = premultiply(fb.rgb[rows, cols],
+                                             fb.alpha[rows, cols])
+
+    def _clip(self, xs, ys):
+        # Drop coordinates outside the surface, like set_at/get_at do
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        w, h = self._framebuffer.w, self._framebuffer.h
+        inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        return xs[inside], ys[inside], inside
+
+    def _colors(self, colors, inside):
+        colors = np.asarray(colors, dtype=np.uint8)
+        if colors.ndim > 1:
+            colors = colors[inside]
+        if colors.shape[-1] == 3:
+            alpha = np.full(colors.shape[:-1] + (1,), 255, dtype=np.uint8)
+            colors = np.concatenate([colors, alpha], axis=-1)
+        return colors
+
+    def _mark_points(self, xs, ys):
+        # Damage the bounding box of clipped coordinates
+        if len(xs):
+            x0, y0 = xs.min(), ys.min()
+            self._framebuffer.mark_dirty(x0, y0, xs.max() - x0 + 1,
+                                         ys.max() - y0 + 1)
+
+    def pixel_view(self):
+        """Zero-copy (rgb, alpha) views of the surface, indexed [x, y].
+
+        These are the framebuffer's views transposed to pygame's surfarray
+        axes; use framebuffer.rgb and framebuffer.alpha for [y, x]. Call
+        framebuffer.mark_dirty() after writing through them.
+        """
+        return (self._framebuffer.rgb.swapaxes(0, 1),
+                self._framebuffer.alpha.T)
+
+    def set_pixels(self, xs, ys, colors):
+        """Set many pixels in one call.
+
+        xs and ys are integer coordinate arrays, colors is a single RGB(A)
+        color or an (n, 3) / (n, 4) array.
+        """
+        xs, ys, inside = self._clip(xs, ys)
+        colors = self._colors(colors, inside)
+        rgb = colors[..., :3]
+        if self._framebuffer.premultiplied:
+            rgb = premultiply(rgb, colors[..., 3])
+        self._framebuffer.rgb[ys, xs] = rgb
+        self._framebuffer.alpha[ys, xs] = colors[..., 3]
+        self._mark_points(xs, ys)
+
+    def get_pixels(self, xs, ys):
+        """Read many pixels in one call as an (n, 4) RGBA array.
+
+        Coordinates outside the surface are dropped.
+        """
+        xs, ys, _ = self._clip(xs, ys)
+        out = np.empty((len(xs), 4), dtype=np.uint8)
+        out[:, :3] = self._framebuffer.rgb[ys, xs]
+        out[:, 3] = self._framebuffer.alpha[ys, xs]
+        if self._framebuffer.premultiplied:
+            out[:, :3] = unpremultiply(out[:, :3], out[:, 3])
+        return out
+
+    def blend_pixels(self, xs, ys, colors, alpha=1.0, mode="source_over"):
+        """Blend many pixels onto the surface in one call.
+
+        The color's own alpha is multiplied by alpha, which may be a scalar
+        or an array with one value per pixel. mode is one of
+        peyote.util.compositing.MODES.
+        """
+        xs, ys, inside = self._clip(xs, ys)
+        colors = self._colors(colors, inside)
+        alpha = np.asarray(alpha, dtype=np.float32)
+        if alpha.ndim:
+            alpha = alpha[inside]
+        if self._framebuffer.premultiplied:
+            self._blend_premultiplied(xs, ys, colors, alpha, mode)
+        else:
+            compositing.blend_at(self._framebuffer.rgb, (ys, xs), colors,
+                                 alpha, mode, self._framebuffer.alpha)
+        self._mark_points(xs, ys)
+
+    def _blend_premultiplied(self, xs, ys, colors, alpha, mode):
+        # Blend straight copies of the touched pixels, one row per distinct
+        # pixel so repeated hits still blend in order, then store them
+        # premultiplied again
+        fb = self._framebuffer
+        linear = ys * fb.w + xs
+        pixels, slots = np.unique(linear, return_inverse=True)
+        py, px = np.divmod(pixels, fb.w)
+        dst_alpha = fb.alpha[py, px][:, np.newaxis]
+        dst = unpremultiply(fb.rgb[py, px], dst_alpha[:, 0])[:, np.newaxis]
+        compositing.blend_at(dst, (slots, np.zeros_like(slots)), colors, alpha,
+                             mode, dst_alpha)
+        fb.rgb[py, px] = premultiply(dst[:, 0], dst_alpha[:, 0])
+        fb.alpha[py, px] = dst_alpha[:, 0]
 
     def background(self, color):
         self._background = color
@@ -35,54 +225,61 @@ class Context:
         return self._surface.unmap_rgb(color_int)
 
     def blit(self, surf, coord):
-        self._surface.blit(surf, coord)
+        self._unpremultiply(surf.get_rect(topleft=tuple(coord)[:2]))
+        rect = self._surface.blit(surf, coord)
+        self._premultiply(rect)
+        self._framebuffer.mark_dirty(*rect)
 
     def blit_a(self, a, coord):
+        self._unpremultiply(self._surface.get_rect())
         pygame.surfarray.blit_array(self._surface, a)
+        self._premultiply(self._surface.get_rect())
+        self._framebuffer.mark_dirty()
 
     def start_cairo_context(self):
-        self._pixels = pygame.surfarray.pixels2d(self._surface)
-        w, h = self._pixels.shape
-        self._cairo_surface = cairo.ImageSurface.create_for_data(self._pixels,
-                                                         cairo.FORMAT_ARGB32,
-                                                         w, h)
-        self._cairo = cairo.Context(self._cairo_surface)
-        
-        self._restore_cairo_state()
+        # pygame may have written to the pixels since cairo last looked
+        self._cairo_surface.mark_dirty()
+        # The tile's placement is applied after the sketch's own transform
+        self._placement = self._placement_matrices()
+        if self._placement is not None:
+            self._cairo.set_matrix(
+                self._cairo.get_matrix().multiply(self._placement[0]))
+        return self._cairo
 
     def end_cairo_context(self):
-        self._save_cairo_state()
-        
-        del self._cairo
-        del self._cairo_surface
-        del self._pixels
+        if self._placement is not None:
+            # Take the placement off again, keeping any transform the sketch
+            # made, since the next tile may be placed elsewhere
+            self._cairo.set_matrix(
+                self._cairo.get_matrix().multiply(self._placement[1]))
+            self._placement = None
+        self._cairo_surface.flush()
+        # cairo doesn't report what it drew
+        self._framebuffer.mark_dirty()
+
+    def _placement_matrices(self):
+        # (canvas to tile, tile to canvas), or None for a whole canvas
+        fb = self._framebuffer
+        if fb.origin == (0, 0) and fb.scale == 1.0:
+            return None
+        (x, y), s = fb.origin, fb.scale
+        return (cairo.Matrix(s, 0, 0, s, -x, -y),
+                cairo.Matrix(1 / s, 0, 0, 1 / s, x / s, y / s))
 
     def _save_cairo_state(self):
-        attr_pairs = []
-        # print "Saving cairo state."
-        for attr_name in dir(self._cairo):
-            if attr_name.startswith("get_"):
-                settr_name = attr_name.replace("get_", "set_")
-                if hasattr(self._cairo, settr_name):
-                    attr_pairs.append((attr_name, settr_name))
-        self._cairo_state = [
-            (getattr(self._cairo, g)(), s)
-            for g, s in attr_pairs
-            ]
-        # pprint(self._cairo_state)
-        
-    def _restore_cairo_state(self):
-        if self._cairo_state:
-            for val, settr_name in self._cairo_state:
-                # print "Setting: %s, %s" % (settr_name, val)
-                if isinstance(val, tuple):
-                    getattr(self._cairo, settr_name)(*val)
-                else:
-                    getattr(self._cairo, settr_name)(val)
-        self._cairo_state = None
+        if self._cairo is None:
+            return []
+        return [(getattr(self._cairo, g)(), s) for g, s in _CAIRO_STATE]
+
+    def _restore_cairo_state(self, state):
+        for val, settr_name in state:
+            if isinstance(val, tuple):
+                getattr(self._cairo, settr_name)(*val)
+            else:
+                getattr(self._cairo, settr_name)(val)
 
     def __enter__(self):
-        self.start_cairo_context()
+        return self.start_cairo_context()
         
     def __exit__(self, exc_type, exc_value, traceback):
         self.end_cairo_context()
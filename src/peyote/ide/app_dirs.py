@@ -56,3 +56,16 @@ def get_log_file() -> Path:
 
     """
     return get_data_dir() / "peyote-ide.log"
+
+
+def get_console_log_file() -> Path:
+    """Get the path to the console log of the current sketch run.
+
+    The console only keeps the most recent lines; the full output of a run
+    is written here.
+
+    Returns:
+        Path to console log file
+
+    """
+    return get_data_dir() / "console.log"
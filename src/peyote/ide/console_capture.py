@@ -0,0 +1,103 @@
+"""Console capture for running sketches."""
+
+import collections
+import io
+import sys
+import threading
+
+from loguru import logger
+
+
+class ConsoleCapture(io.TextIOBase):
+    """Thread-safe text stream that collects sketch output between flushes.
+
+    The capture is installed as sys.stdout and sys.stderr once per run, so a
+    print() costs one locked list append and frames that don't print cost
+    nothing. The owner periodically calls ``drain()`` to forward the batched
+    text to the console. If nobody drains it, only the most recent
+    ``max_chars`` characters are kept, cutting the oldest kept write short
+    if needed.
+    """
+
+    def __init__(self, max_chars: int = 1_000_000) -> None:
+        """Initialize the console capture.
+
+        Args:
+            max_chars: Maximum number of characters held between drains
+
+        """
+        super().__init__()
+        self.max_chars = max_chars
+
+        self._lock = threading.Lock()
+        self._chunks: collections.deque[str] = collections.deque()
+        self._size = 0
+        self._dropped = False
+
+        self._saved_streams: tuple | None = None
+
+    def writable(self) -> bool:
+        """Return True; the capture accepts text."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Append text to the pending output.
+
+        Args:
+            text: Text to append
+
+        Returns:
+            Number of characters written
+
+        """
+        if not text:
+            return 0
+
+        with self._lock:
+            self._chunks.append(text)
+            self._size += len(text)
+            while self._size > self.max_chars:
+                excess = self._size - self.max_chars
+                oldest = self._chunks[0]
+                if len(oldest) <= excess:
+                    self._chunks.popleft()
+                    self._size -= len(oldest)
+                else:
+                    self._chunks[0] = oldest[excess:]
+                    self._size -= excess
+                self._dropped = True
+        return len(text)
+
+    def drain(self) -> str:
+        """Take all pending output.
+
+        Returns:
+            The text written since the last drain
+
+        """
+        with self._lock:
+            if not self._chunks:
+                return ""
+            text = "".join(self._chunks)
+            if self._dropped:
+                text = "[... earlier output dropped ...]\n" + text
+            self._chunks.clear()
+            self._size = 0
+            self._dropped = False
+        return text
+
+    def install(self) -> None:
+        """Redirect sys.stdout and sys.stderr into the capture."""
+        if self._saved_streams is not None:
+            return
+        self._saved_streams = (sys.stdout, sys.stderr)
+        sys.stdout = sys.stderr = self
+        logger.debug("Console capture installed")
+
+    def uninstall(self) -> None:
+        """Restore the original sys.stdout and sys.stderr."""
+        if self._saved_streams is None:
+            return
+        sys.stdout, sys.stderr = self._saved_streams
+        self._saved_streams = None
+        logger.debug("Console capture uninstalled")
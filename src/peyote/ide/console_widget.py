@@ -0,0 +1,130 @@
+"""Console output widget for running sketches."""
+
+from pathlib import Path
+from typing import TextIO
+
+from loguru import logger
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit, QWidget
+
+from .app_dirs import get_console_log_file
+
+
+class ConsoleWidget(QPlainTextEdit):
+    """Bounded, throttled console for sketch output.
+
+    Text passed to ``write`` is queued and inserted in one plain-text edit
+    per UI tick, however many chunks arrived in between. The document keeps
+    at most ``max_lines`` lines, dropping the oldest ones, so a sketch that
+    prints every frame costs the same after an hour as after a second. The
+    complete output of the run is also written to a log file, where
+    scrollback beyond the retained lines can be found.
+    """
+
+    def __init__(
+        self,
+        max_lines: int = 5000,
+        flush_interval_ms: int = 50,
+        log_path: Path | None = None,
+        parent: QWidget | None = None,
+    ) -> None:
+        """Initialize the console widget.
+
+        Args:
+            max_lines: Maximum number of lines kept in the widget
+            flush_interval_ms: How long output is collected before display
+            log_path: File the full output is written to, None for the
+                default console log
+            parent: Parent widget
+
+        """
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self.log_path = log_path or get_console_log_file()
+
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_lines)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+
+        self._pending: list[str] = []
+        self._log: TextIO | None = None
+        self._log_failed = False
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def write(self, text: str) -> None:
+        """Queue text for display on the next UI tick.
+
+        Args:
+            text: Text to append, including any newlines
+
+        """
+        if not text:
+            return
+        self._pending.append(text)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Display all queued text in a single edit."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+
+        self._write_log(text)
+
+        # Lines that would be dropped right away are never inserted
+        if text.count("\n") > self.max_lines:
+            text = "".join(text.splitlines(keepends=True)[-self.max_lines :])
+
+        scroll_bar = self.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def clear(self) -> None:
+        """Clear the console and start a new console log."""
+        self._flush_timer.stop()
+        self._pending.clear()
+        super().clear()
+        self._close_log()
+        self._log_failed = False
+        self.log_path.unlink(missing_ok=True)
+
+    def _write_log(self, text: str) -> None:
+        """Append text to the console log file.
+
+        Args:
+            text: Text to append
+
+        """
+        if self._log_failed:
+            return
+        try:
+            if self._log is None:
+                self._log = self.log_path.open("a", encoding="utf-8")
+            self._log.write(text)
+            self._log.flush()
+        except OSError:
+            # Keep the console working; only the scrollback is lost
+            logger.exception(f"Failed to write console log: {self.log_path}")
+            self._log_failed = True
+            self._close_log()
+
+    def _close_log(self) -> None:
+        """Close the console log file if it is open."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
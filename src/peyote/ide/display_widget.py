@@ -1,71 +1,328 @@
 """Display widgets for real-time and offscreen rendering."""
 
+import threading
+import time
+import warnings
+from collections.abc import Iterable
+
 import numpy as np
 from loguru import logger
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QImage, QPainter, QPaintEvent
+from PySide6.QtCore import QRect, Qt, Signal, Slot
+from PySide6.QtGui import QColor, QFont, QImage, QPainter, QPaintEvent, QRegion
 from PySide6.QtWidgets import QWidget
 
+from peyote.util.framebuffer import Framebuffer
+
+from .export import GifWriter
+from .profiler import FrameProfiler
+
+
+class _SketchViews:
+    """Sketch-facing views of ``framebuffer`` that record damage.
+
+    Handing out a writable view marks the whole framebuffer dirty, since
+    the caller may write anywhere through it, so sketches that write to
+    ``display.rgb`` every frame are always shown. Sketches that keep a view
+    across frames call ``mark_dirty()`` after writing; drawing through a
+    graphics.Context or renderTiles() records exact rectangles by itself.
+    """
+
+    framebuffer: Framebuffer
+    _qimg: QImage
+
+    @property
+    def raw(self) -> np.ndarray:
+        """Raw (h, w, 4) bytes of the framebuffer in native ARGB32 order.
+
+        That is B, G, R, A on little-endian machines; see BYTE_ORDER.
+        """
+        self.framebuffer.mark_dirty()
+        return self.framebuffer.array
+
+    @property
+    def buf(self) -> np.ndarray:
+        """Deprecated alias of ``raw``.
 
-class FramebufferWidget(QWidget):
+        ``buf`` used to be an RGBA array. It now holds native ARGB32 bytes,
+        so ``buf[..., :3] = (r, g, b)`` swaps red and blue on little-endian
+        machines; write colors through ``rgb`` and ``alpha`` instead.
+        """
+        warnings.warn(
+            "display.buf holds native ARGB32 bytes (B, G, R, A on little-endian "
+            "machines), not RGBA; use display.rgb and display.alpha for colors, "
+            "or display.raw for the raw bytes",
+            FutureWarning,
+            stacklevel=2,
+        )
+        return self.raw
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """(h, w, 3) view of the framebuffer in R, G, B order.
+
+        Holds premultiplied colors if the framebuffer is premultiplied.
+        """
+        self.framebuffer.mark_dirty()
+        return self.framebuffer.rgb
+
+    @property
+    def alpha(self) -> np.ndarray:
+        """(h, w) view of the framebuffer's alpha channel."""
+        self.framebuffer.mark_dirty()
+        return self.framebuffer.alpha
+
+    @property
+    def qimg(self) -> QImage:
+        """QImage wrapping the framebuffer."""
+        self.framebuffer.mark_dirty()
+        return self._qimg
+
+    def mark_dirty(
+        self,
+        x: int = 0,
+        y: int = 0,
+        w: int | None = None,
+        h: int | None = None,
+    ) -> None:
+        """Record that a rectangle of the framebuffer changed.
+
+        Args:
+            x: Left edge
+            y: Top edge
+            w: Width, defaults to the rest of the row
+            h: Height, defaults to the rest of the column
+
+        """
+        self.framebuffer.mark_dirty(x, y, w, h)
+
+    def get_painter(self) -> QPainter:
+        """Get a QPainter for drawing into the framebuffer.
+
+        Returns:
+            QPainter configured for the framebuffer
+
+        """
+        self.framebuffer.mark_dirty()
+        return QPainter(self._qimg)
+
+
+class FramebufferWidget(_SketchViews, QWidget):
     """Widget that displays a framebuffer backed by a NumPy array.
 
     This widget provides real-time display of rendered content.
+
+    Sketches always draw into ``framebuffer``, which ``buf`` (raw ARGB32
+    bytes), ``rgb``, ``alpha`` and ``qimg`` all view without copying. When
+    double buffering is enabled the widget paints a separate front buffer
+    instead, and ``present()`` copies a finished frame into it under a lock, so a frame
+    that is still being drawn on another thread is never shown.
+
+    Only the rectangles damaged since the last frame are copied and
+    repainted. A frame that changed nothing costs no copy and no repaint.
+
+    The framebuffer is premultiplied by default, so ``rgb`` holds colors
+    multiplied by ``alpha``. The display is opaque, where the two agree.
     """
 
-    def __init__(self, w: int = 640, h: int = 360, parent: QWidget | None = None) -> None:
+    frame_presented = Signal()
+
+    def __init__(
+        self,
+        w: int = 640,
+        h: int = 360,
+        parent: QWidget | None = None,
+        *,
+        premultiplied: bool = True,
+    ) -> None:
         """Initialize the framebuffer widget.
 
         Args:
             w: Width of the framebuffer
             h: Height of the framebuffer
             parent: Parent widget
+            premultiplied: Store premultiplied colors, Qt's native format,
+                so painting is a plain copy
 
         """
         super().__init__(parent)
         self.w = w
         self.h = h
 
-        # Shared RGBA framebuffer
-        self.buf = np.zeros((h, w, 4), dtype=np.uint8, order="C")
-        self.buf[..., 3] = 255  # opaque alpha
-
-        # Wrap NumPy memory with QImage (NO COPY)
-        self.qimg = QImage(
-            self.buf.data,
-            w,
-            h,
-            self.buf.strides[0],
-            QImage.Format.Format_RGBA8888,
-        )
-
-        # Keep a reference to prevent GC surprises
-        self.qimg._buf = self.buf  # noqa: SLF001
+        # Shared framebuffer, also wrapped by QImage (NO COPY)
+        self.framebuffer = Framebuffer(w, h, premultiplied=premultiplied)
+        self._qimg = self.framebuffer.qimage()
+
+        # Front buffer shown by paintEvent (the same memory unless double
+        # buffered)
+        self.front_buf = self.framebuffer.array
+        self.front_qimg = self._qimg
+        self.double_buffered = False
+        self._front_lock = threading.Lock()
+
+        # Rectangles presented but not yet scheduled for painting, the
+        # region scheduled but not yet painted, and the framebuffer
+        # generation shown by the last presented frame
+        self._pending_rects: list[tuple[int, int, int, int]] = []
+        self._pending_lock = threading.Lock()
+        self._scheduled = QRegion()
+        self.presented_generation = 0
 
         self.setFixedSize(w, h)
         self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
 
-        # Timer for refresh (will be controlled by execution engine)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update)
+        # The widget only repaints when a frame is presented; presenting from
+        # a render thread schedules the repaint on the GUI thread
+        self.frame_presented.connect(self._schedule_paint)
+
+        # Paint times go to the profiler, which also feeds the FPS overlay
+        self.profiler: FrameProfiler | None = None
+        self.hud_visible = False
+        self._hud_rect = QRect()
 
         logger.debug(f"FramebufferWidget initialized: {w}x{h}")
 
-    def start_refresh(self, fps: int = 60) -> None:
-        """Start the refresh timer.
+    def set_profiler(self, profiler: FrameProfiler | None) -> None:
+        """Record paint times into a profiler.
+
+        Args:
+            profiler: Profiler to record into, or None to stop recording
+
+        """
+        self.profiler = profiler
+
+    def set_hud_visible(self, visible: bool) -> None:
+        """Show or hide the FPS/ms overlay.
+
+        Args:
+            visible: True to draw the profiler summary over the frame
+
+        """
+        self.hud_visible = visible
+        self.update()
+
+    def set_double_buffered(self, enabled: bool) -> None:
+        """Enable or disable a separate front buffer for display.
+
+        Args:
+            enabled: True to paint from a front buffer updated by present()
+
+        """
+        if enabled == self.double_buffered:
+            return
+
+        with self._front_lock:
+            if enabled:
+                self.front_buf = self.framebuffer.array.copy()
+                self.front_qimg = self._wrap(self.front_buf)
+            else:
+                self.front_buf = self.framebuffer.array
+                self.front_qimg = self._qimg
+            self.double_buffered = enabled
+
+        logger.debug(f"Double buffering {'enabled' if enabled else 'disabled'}")
+
+    def attach_front_buffer(self, front_buf: np.ndarray, lock) -> None:  # noqa: ANN001
+        """Display an externally owned front buffer, e.g. shared memory.
+
+        The buffer is wrapped without copying. ``lock`` must be held by
+        whoever writes to the buffer, and is held here while painting.
+        Whoever writes it reports the changed rectangles to
+        ``show_damage()``.
 
         Args:
-            fps: Frames per second
+            front_buf: (h, w, 4) uint8 array in Framebuffer layout
+            lock: Lock guarding writes to front_buf
 
         """
-        interval_ms = int(1000 / fps)
-        self.timer.start(interval_ms)
-        logger.debug(f"Refresh timer started: {fps} FPS")
+        front_qimg = self._wrap(front_buf)
+
+        with self._front_lock:
+            self.front_buf = front_buf
+            self.front_qimg = front_qimg
+        self._front_lock = lock
+        self.update()
+        logger.debug("Attached external front buffer")
+
+    def _wrap(self, buf: np.ndarray) -> QImage:
+        """Wrap a front buffer in a QImage of the framebuffer's format.
 
-    def stop_refresh(self) -> None:
-        """Stop the refresh timer."""
-        self.timer.stop()
-        logger.debug("Refresh timer stopped")
+        Args:
+            buf: (h, w, 4) uint8 array in Framebuffer layout
+
+        Returns:
+            QImage viewing buf
+
+        """
+        premultiplied = self.framebuffer.premultiplied
+        return Framebuffer(self.w, self.h, buf, premultiplied=premultiplied).qimage()
+
+    def detach_front_buffer(self) -> None:
+        """Go back to displaying the widget's own buffer."""
+        with self._front_lock:
+            self.front_buf = self.framebuffer.array
+            self.front_qimg = self._qimg
+        self._front_lock = threading.Lock()
+        self.double_buffered = False
+        self.update()
+        logger.debug("Detached external front buffer")
+
+    def present(self) -> None:
+        """Publish the damaged parts of the frame and schedule their repaint.
+
+        Safe to call from any thread. Does nothing if no damage was
+        recorded since the last call.
+        """
+        generation, rects = self.framebuffer.take_damage()
+        if not rects:
+            return
+
+        if self.double_buffered:
+            back = self.framebuffer.array
+            with self._front_lock:
+                for x, y, w, h in rects:
+                    self.front_buf[y : y + h, x : x + w] = back[y : y + h, x : x + w]
+        self.presented_generation = generation
+        self.show_damage(rects)
+
+    def show_damage(self, rects: list[tuple[int, int, int, int]]) -> None:
+        """Schedule a repaint of rectangles of the front buffer.
+
+        Safe to call from any thread.
+
+        Args:
+            rects: Changed (x, y, w, h) rectangles
+
+        """
+        with self._pending_lock:
+            self._pending_rects.extend(rects)
+        self.frame_presented.emit()
+
+    def paint_now(self) -> None:
+        """Repaint the scheduled region right away.
+
+        For when the GUI thread is busy and a scheduled repaint would only
+        happen later. Must be called on the GUI thread.
+        """
+        if not self._scheduled.isEmpty():
+            self.repaint(self._scheduled)
+
+    @Slot()
+    def _schedule_paint(self) -> None:
+        """Turn the presented rectangles into a repaint of their region."""
+        with self._pending_lock:
+            rects = self._pending_rects
+            self._pending_rects = []
+        if not rects:
+            return
+
+        region = QRegion()
+        for rect in rects:
+            region |= QRect(*rect)
+        if self.hud_visible:
+            # The overlay shows new numbers for every frame
+            region |= self._hud_rect
+        self._scheduled |= region
+        self.update(region)
 
     def clear(self, color: tuple[int, int, int] = (20, 20, 20)) -> None:
         """Clear the framebuffer to a solid color.
@@ -74,64 +331,107 @@ class FramebufferWidget(QWidget):
             color: RGB color tuple
 
         """
-        self.buf[..., :3] = color
+        self.framebuffer.fill(color)
+        self.present()
 
-    def paintEvent(self, event: QPaintEvent) -> None:  # noqa: N802, ARG002
-        """Handle paint events by drawing the framebuffer to the widget.
+    def paintEvent(self, event: QPaintEvent) -> None:  # noqa: N802
+        """Handle paint events by drawing the damaged part of the framebuffer.
 
         Args:
             event: The paint event
 
         """
+        start = time.perf_counter()
+        self._scheduled = QRegion()
         p = QPainter(self)
-        p.drawImage(0, 0, self.qimg)
+        # The widget is opaque, so the frame replaces what was there; for
+        # premultiplied frames that is a plain copy
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        with self._front_lock:
+            for rect in event.region():
+                p.drawImage(rect, self.front_qimg, rect)
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+
+        if self.profiler is not None:
+            self.profiler.record_paint(time.perf_counter() - start)
+            if self.hud_visible:
+                self._paint_hud(p, self.profiler.hud_text())
+        p.end()
+
+    def _paint_hud(self, p: QPainter, text: str) -> None:
+        """Draw the FPS/ms overlay in the top left corner.
 
-    def get_painter(self) -> QPainter:
-        """Get a QPainter for drawing into the framebuffer.
-
-        Returns:
-            QPainter configured for the framebuffer
+        Args:
+            p: Painter drawing on the widget
+            text: Overlay text
 
         """
-        return QPainter(self.qimg)
-
-
-class OffscreenWidget:
+        p.setFont(QFont("monospace", 9))
+        metrics = p.fontMetrics()
+        rect = metrics.boundingRect(text).adjusted(-4, -2, 4, 2)
+        rect.moveTo(4, 4)
+        # Repainted with every frame; the full width leaves room for
+        # longer text
+        self._hud_rect = QRect(0, 0, self.w, rect.bottom() + 1)
+        p.fillRect(rect, QColor(0, 0, 0, 160))
+        p.setPen(QColor(255, 255, 255))
+        p.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+
+class OffscreenWidget(_SketchViews):
     """Offscreen rendering widget for headless operation.
 
     This widget provides the same NumPy buffer interface as FramebufferWidget
     but doesn't display anything. It's used for exporting images and GIFs.
     """
 
-    def __init__(self, w: int = 640, h: int = 360) -> None:
+    def __init__(
+        self,
+        w: int = 640,
+        h: int = 360,
+        buf: np.ndarray | None = None,
+        *,
+        premultiplied: bool = True,
+    ) -> None:
         """Initialize the offscreen widget.
 
         Args:
             w: Width of the framebuffer
             h: Height of the framebuffer
+            buf: Optional existing (h, w, 4) uint8 array in Framebuffer
+                layout to render into, e.g. a view of shared memory or a
+                memory-mapped raw frame file; its pixels are kept
+            premultiplied: Store premultiplied colors, like the display
 
         """
         self.w = w
         self.h = h
 
-        # Shared RGBA framebuffer
-        self.buf = np.zeros((h, w, 4), dtype=np.uint8, order="C")
-        self.buf[..., 3] = 255  # opaque alpha
-
-        # Wrap NumPy memory with QImage (NO COPY)
-        self.qimg = QImage(
-            self.buf.data,
-            w,
-            h,
-            self.buf.strides[0],
-            QImage.Format.Format_RGBA8888,
-        )
-
-        # Keep a reference to prevent GC
-        self.qimg._buf = self.buf  # noqa: SLF001
+        # Shared framebuffer, also wrapped by QImage (NO COPY); new buffers
+        # start opaque black
+        self.framebuffer = Framebuffer(w, h, buf, premultiplied=premultiplied)
+        self._qimg = self.framebuffer.qimage()
 
         logger.debug(f"OffscreenWidget initialized: {w}x{h}")
 
+    @property
+    def origin(self) -> tuple[int, int]:
+        """Canvas position of the top left pixel, when rendering a poster tile."""
+        return self.framebuffer.origin
+
+    @origin.setter
+    def origin(self, origin: tuple[int, int]) -> None:
+        self.framebuffer.origin = origin
+
+    @property
+    def scale(self) -> float:
+        """Pixels per canvas unit, when rendering a poster tile."""
+        return self.framebuffer.scale
+
+    @scale.setter
+    def scale(self, scale: float) -> None:
+        self.framebuffer.scale = scale
+
     def clear(self, color: tuple[int, int, int] = (20, 20, 20)) -> None:
         """Clear the framebuffer to a solid color.
 
@@ -139,16 +439,23 @@ class OffscreenWidget:
             color: RGB color tuple
 
         """
-        self.buf[..., :3] = color
+        self.framebuffer.fill(color)
 
     def get_painter(self) -> QPainter:
         """Get a QPainter for drawing into the framebuffer.
 
+        The painter maps canvas coordinates to the framebuffer, so a tile of
+        a poster shows its part of the canvas.
+
         Returns:
             QPainter configured for the framebuffer
 
         """
-        return QPainter(self.qimg)
+        painter = super().get_painter()
+        if self.origin != (0, 0) or self.scale != 1.0:
+            painter.translate(-self.origin[0], -self.origin[1])
+            painter.scale(self.scale, self.scale)
+        return painter
 
     def save_png(self, path: str) -> bool:
         """Save the current framebuffer as a PNG file.
@@ -160,7 +467,7 @@ class OffscreenWidget:
             True if successful
 
         """
-        success = self.qimg.save(path, "PNG")
+        success = self._qimg.save(path, "PNG")
         if success:
             logger.info(f"Saved PNG: {path}")
         else:
@@ -176,15 +483,25 @@ class OffscreenWidget:
         """
         from PIL import Image
 
-        # Convert RGBA numpy array to PIL Image
-        return Image.fromarray(self.buf, mode="RGBA")
+        return Image.fromarray(self.framebuffer.to_rgba(), mode="RGBA")
 
-    def save_gif(self, path: str, frames: list, duration: int = 33) -> bool:
+    def save_gif(
+        self,
+        path: str,
+        frames: Iterable,
+        duration: int = 33,
+    ) -> bool:
         """Save a sequence of frames as an animated GIF.
 
+        Frames are encoded as they are pulled from ``frames``, so passing a
+        generator keeps memory use constant regardless of the frame count.
+        For frames rendered into this widget, prefer feeding ``framebuffer``
+        to a GifWriter from peyote.ide.export directly.
+
         Args:
             path: Path to save the GIF file
-            frames: List of PIL Image objects
+            frames: Iterable of PIL Image objects, RGBA NumPy arrays or
+                Framebuffers
             duration: Duration per frame in milliseconds (default: 33ms ≈ 30fps)
 
         Returns:
@@ -192,20 +509,17 @@ class OffscreenWidget:
 
         """
         try:
-            if not frames:
+            with GifWriter(path, duration=duration) as writer:
+                for frame in frames:
+                    if not isinstance(frame, (np.ndarray, Framebuffer)):
+                        frame = np.asarray(frame.convert("RGBA"))  # noqa: PLW2901
+                    writer.add_frame(frame)
+
+            if not writer.frame_count:
                 logger.error("No frames to save")
                 return False
 
-            # Save as animated GIF
-            frames[0].save(
-                path,
-                save_all=True,
-                append_images=frames[1:],
-                duration=duration,
-                loop=0,
-                optimize=False,
-            )
-            logger.info(f"Saved GIF with {len(frames)} frames: {path}")
+            logger.info(f"Saved GIF with {writer.frame_count} frames: {path}")
             return True
         except Exception:
             logger.exception(f"Failed to save GIF: {path}")
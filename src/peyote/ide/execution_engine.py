@@ -1,34 +1,132 @@
 """Execution engine for running sketches."""
 
-import io
+import math
 import sys
-from contextlib import redirect_stderr, redirect_stdout
+import threading
+import traceback
+from collections.abc import Callable
 
 from loguru import logger
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import QObject, Qt, QThread, QTimer, Signal, Slot
 
+from .console_capture import ConsoleCapture
 from .display_widget import FramebufferWidget
+from .frame_scheduler import FrameScheduler
 from .module_loader import ModuleLoader
-from .package_manager import PackageManager
+from .package_manager import PackageManager, content_hash
+from .process_backend import SketchProcess
+from .profiler import FrameProfiler
+from .tiles import TileRenderer
 
+# How draw() is driven: "timer" calls it from a QTimer on the GUI thread,
+# "thread" calls it from a RenderThread into a double-buffered framebuffer,
+# and "process" runs the whole sketch in a SketchProcess.
+EXECUTION_MODES = ("timer", "thread", "process")
 
-class SketchExecutor:
+# How often captured sketch output is forwarded to the console
+CONSOLE_FLUSH_INTERVAL_MS = 100
+
+
+class RenderThread(QThread):
+    """Worker thread that calls draw() and presents each finished frame."""
+
+    failed = Signal(str)
+
+    def __init__(
+        self,
+        draw_frame: Callable[[], None],
+        present: Callable[[], None],
+        scheduler: FrameScheduler,
+    ) -> None:
+        """Initialize the render thread.
+
+        Args:
+            draw_frame: Function that draws one frame into the back buffer
+            present: Function that publishes the finished frame
+            scheduler: Scheduler deciding when each frame is due
+
+        """
+        super().__init__()
+        self.draw_frame = draw_frame
+        self.present = present
+        self.scheduler = scheduler
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        """Draw and present frames until stopped or draw() fails."""
+        scheduler = self.scheduler
+        while not self._stop_event.is_set():
+            delay = scheduler.time_until_next_frame()
+            if delay is None or delay > 0:
+                # Sleep until the frame is due, or until noLoop()/loop(),
+                # redraw(), frameRate() or request_stop() change the plan
+                scheduler.changed.wait(delay)
+                scheduler.changed.clear()
+                continue
+
+            try:
+                scheduler.begin_frame()
+                self.draw_frame()
+                scheduler.end_frame()
+            except Exception:
+                self.failed.emit(_get_exception_text())
+                return
+            self.present()
+
+    def request_stop(self) -> None:
+        """Ask the thread to stop after the current frame."""
+        self._stop_event.set()
+        self.scheduler.changed.set()
+
+
+def _get_exception_text() -> str:
+    """Get formatted exception text.
+
+    Returns:
+        Exception text with traceback
+
+    """
+    return "".join(traceback.format_exception(*sys.exc_info()))
+
+
+class SketchExecutor(QObject):
     """Executes user sketch modules with setup() and draw() functions."""
 
+    console_output = Signal(str)
+
     def __init__(
         self,
         display_widget: FramebufferWidget,
         console_callback=None,  # noqa: ANN001
+        execution_mode: str = "timer",
     ) -> None:
         """Initialize the sketch executor.
 
         Args:
             display_widget: Display widget for rendering
             console_callback: Function to call with console output
+            execution_mode: One of EXECUTION_MODES
 
         """
+        super().__init__()
         self.display_widget = display_widget
         self.console_callback = console_callback
+        self.execution_mode = "timer"
+        self.set_execution_mode(execution_mode)
+
+        # Output produced on the render thread is delivered on the GUI thread
+        self.console_output.connect(self._deliver_console_output)
+        self.render_thread: RenderThread | None = None
+
+        # Sketch output is captured once per run and flushed on a timer
+        self.console_capture = ConsoleCapture()
+        self.console_timer = QTimer()
+        self.console_timer.timeout.connect(self._flush_console)
+
+        # Sketch process and the timer polling its pipe
+        self.sketch_process: SketchProcess | None = None
+        self.process_timer = QTimer()
+        self.process_timer.timeout.connect(self._poll_sketch_process)
 
         self.package_manager: PackageManager | None = None
         self.module_loader = ModuleLoader()
@@ -37,11 +135,30 @@ class SketchExecutor:
         self.setup_func = None
         self.draw_func = None
 
+        # Content hash of each module in the running sketch, for hot reload
+        self.module_hashes: dict[str, str] = {}
+        # Held while drawing a frame, so modules are only swapped between
+        # frames
+        self._frame_lock = threading.Lock()
+
         self.is_running = False
         self.frame_count = 0
 
-        # Timer for calling draw() repeatedly
+        # Paces draw(); replaced for every run so sketch settings don't leak
+        self.scheduler = FrameScheduler()
+
+        # Per-frame timings, also shown by the display widget's overlay
+        self.profiler = FrameProfiler()
+        self.profiler.on_report = self._output_to_console
+        self.display_widget.set_profiler(self.profiler)
+
+        # Renders renderTiles() functions on a pool that lives across frames
+        self.tiles = TileRenderer(self.display_widget.framebuffer)
+
+        # Single-shot timer armed for the next frame the scheduler asks for
         self.draw_timer = QTimer()
+        self.draw_timer.setSingleShot(True)
+        self.draw_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.draw_timer.timeout.connect(self._execute_draw)
 
         logger.info("Sketch executor initialized")
@@ -64,12 +181,19 @@ class SketchExecutor:
         try:
             # Stop any running sketch
             self.stop()
+            self.profiler.reset()
+
+            if self.execution_mode == "process":
+                return self._start_sketch_process(modules, main_module_name)
 
             # Create package manager
             self.package_manager = PackageManager("current_sketch")
 
             # Save all modules to disk
             self.package_manager.save_all_modules(modules)
+            self.module_hashes = {
+                name: content_hash(code) for name, code in modules.items()
+            }
 
             # Load modules
             module_files = [f"{name}.py" if not name.endswith(".py") else name
@@ -90,6 +214,19 @@ class SketchExecutor:
 
             self.main_module = loaded_modules[main_key]
 
+            # Expose the drawing target and frame pacing to sketch code
+            self.scheduler = FrameScheduler()
+            self.module_loader.inject_globals(
+                {
+                    "display": self.display_widget,
+                    "WIDTH": self.display_widget.w,
+                    "HEIGHT": self.display_widget.h,
+                    **self.scheduler.sketch_api(),
+                    **self.tiles.sketch_api(on_progress=self._present_tiles),
+                },
+            )
+            self.tiles.sketch_globals = self.module_loader.injected_globals
+
             # Get setup() and draw() functions
             self.setup_func = self.module_loader.get_module_function(
                 self.main_module,
@@ -100,9 +237,12 @@ class SketchExecutor:
                 "draw",
             )
 
+            # Capture sketch output for the rest of the run
+            self._start_console_capture()
+
             # Run setup() if it exists
             if self.setup_func:
-                self._execute_with_output_capture(self.setup_func)
+                self.setup_func()
                 logger.info("Executed setup()")
             else:
                 logger.warning("No setup() function found in main module")
@@ -111,20 +251,135 @@ class SketchExecutor:
             if self.draw_func:
                 self.is_running = True
                 self.frame_count = 0
-                self.display_widget.start_refresh(fps=60)
-                self.draw_timer.start(16)  # ~60 FPS
-                logger.info("Started draw() loop")
+                # GC pauses only matter when draw() runs in this process;
+                # installed once running, so stop() always removes it
+                self.profiler.install_gc_hook()
+                if self.execution_mode == "thread":
+                    self._start_render_thread()
+                else:
+                    self._schedule_next_frame()
+                logger.info(f"Started draw() loop ({self.execution_mode})")
             else:
                 logger.warning("No draw() function found in main module")
+                self._stop_console_capture()
                 self._output_to_console("Warning: No draw() function found\n")
 
             return True
 
         except Exception:
             logger.exception("Failed to load and run sketch")
-            self._output_to_console(f"Error loading sketch:\n{self._get_exception_text()}\n")
+            self._stop_console_capture()
+            self._output_to_console(
+                f"Error loading sketch:\n{self._get_exception_text()}\n",
+            )
+            return False
+
+    def hot_reload(
+        self,
+        modules: dict[str, str],
+        main_module_name: str = "sketch",
+    ) -> bool:
+        """Swap edited modules into the running sketch without restarting it.
+
+        Only modules whose content changed, and the modules that import
+        them, are re-executed. setup() is not run again and the framebuffer
+        is kept, so the new draw() continues from the current canvas on the
+        next frame. Module globals listed in ``__preserve__`` keep their
+        values. If nothing is running, or the sketch runs in a separate
+        process, or tabs were removed, the sketch is restarted instead.
+
+        Args:
+            modules: Dictionary mapping module names to content
+            main_module_name: Name of the main module (without .py)
+
+        Returns:
+            True if the sketch is running the new code
+
+        """
+        main_key = main_module_name.replace(".py", "")
+        if (
+            not self.is_running
+            or self.execution_mode == "process"
+            or self.main_module is None
+            or self.main_module.__name__.rpartition(".")[2] != main_key
+            or not self.module_hashes.keys() <= modules.keys()
+        ):
+            return self.load_and_run(modules, main_module_name)
+
+        hashes = {name: content_hash(code) for name, code in modules.items()}
+        changed = {
+            name
+            for name, digest in hashes.items()
+            if self.module_hashes.get(name) != digest
+        }
+        if not changed:
+            logger.info("Hot reload: no modules changed")
+            return True
+
+        order = self.module_loader.plan_reload(modules, changed)
+        new_modules = changed - self.module_hashes.keys()
+        for name in new_modules:
+            self.package_manager.save_module(name, modules[name])
+
+        with self._frame_lock:
+            try:
+                reloaded = self.module_loader.reexecute_modules(
+                    self.package_manager.get_package_dir(),
+                    modules,
+                    order,
+                )
+            except Exception:
+                logger.exception("Hot reload failed")
+                self._output_to_console(
+                    "Reload failed, still running the previous code:\n"
+                    f"{self._get_exception_text()}\n",
+                )
+                return False
+
+            for name in changed - new_modules:
+                self.package_manager.save_module(name, modules[name])
+            self.module_hashes.update(hashes)
+
+            # Tile worker processes still hold the old code
+            self.tiles.shutdown()
+            self.main_module = reloaded.get(main_key, self.main_module)
+            self.setup_func = self.module_loader.get_module_function(
+                self.main_module,
+                "setup",
+            )
+            self.draw_func = self.module_loader.get_module_function(
+                self.main_module,
+                "draw",
+            )
+
+        logger.info(f"Hot reloaded modules: {', '.join(order)}")
+        if not self.draw_func:
+            self._output_to_console("Warning: No draw() function found\n")
+            self.stop()
             return False
 
+        # Show the new code even if the sketch called noLoop()
+        self.scheduler.redraw()
+        if self.execution_mode == "timer" and not self.draw_timer.isActive():
+            self._schedule_next_frame()
+        return True
+
+    def set_execution_mode(self, mode: str) -> None:
+        """Choose how draw() is driven for the next run.
+
+        Args:
+            mode: One of EXECUTION_MODES
+
+        Raises:
+            ValueError: If mode is not a known execution mode
+
+        """
+        if mode not in EXECUTION_MODES:
+            msg = f"Unknown execution mode: {mode!r}"
+            raise ValueError(msg)
+        self.execution_mode = mode
+        logger.info(f"Execution mode: {mode}")
+
     def stop(self) -> None:
         """Stop the running sketch."""
         if not self.is_running:
@@ -132,7 +387,11 @@ class SketchExecutor:
 
         self.is_running = False
         self.draw_timer.stop()
-        self.display_widget.stop_refresh()
+        self._stop_render_thread()
+        self._stop_sketch_process()
+        self._stop_console_capture()
+        self.profiler.uninstall_gc_hook()
+        self.tiles.shutdown()
 
         # Clear display
         self.display_widget.clear()
@@ -143,55 +402,231 @@ class SketchExecutor:
         self.main_module = None
         self.setup_func = None
         self.draw_func = None
+        self.module_hashes = {}
         self.frame_count = 0
 
         logger.info("Sketch stopped")
 
+    def _start_render_thread(self) -> None:
+        """Run draw() on a worker thread into a double-buffered framebuffer."""
+        self.display_widget.set_double_buffered(True)
+        self.render_thread = RenderThread(
+            self._draw_frame,
+            self.display_widget.present,
+            self.scheduler,
+        )
+        self.render_thread.failed.connect(self._on_render_thread_failed)
+        self.render_thread.start()
+
+    def _stop_render_thread(self) -> None:
+        """Stop the render thread and wait for its current frame to finish."""
+        if self.render_thread is None:
+            return
+
+        self.render_thread.request_stop()
+        self.render_thread.wait()
+        self.render_thread = None
+        self.display_widget.set_double_buffered(False)
+
+    def _start_sketch_process(
+        self,
+        modules: dict[str, str],
+        main_module_name: str,
+    ) -> bool:
+        """Run the sketch in a separate process drawing into shared memory.
+
+        Args:
+            modules: Dictionary mapping module names to content
+            main_module_name: Name of the main module (without .py)
+
+        Returns:
+            True if the process was started
+
+        """
+        self.sketch_process = SketchProcess(
+            self.display_widget.w,
+            self.display_widget.h,
+        )
+        self.display_widget.attach_front_buffer(
+            self.sketch_process.front_buf,
+            self.sketch_process.lock,
+        )
+        self.sketch_process.start(modules, main_module_name.replace(".py", ""))
+
+        self.is_running = True
+        self.frame_count = 0
+        self.process_timer.start(8)
+        self.console_timer.start(CONSOLE_FLUSH_INTERVAL_MS)
+        logger.info("Started sketch process")
+        return True
+
+    def _stop_sketch_process(self) -> None:
+        """Stop the sketch process and release the shared framebuffer."""
+        if self.sketch_process is None:
+            return
+
+        self.process_timer.stop()
+        # Drop the widget's views of shared memory before it is released
+        self.display_widget.detach_front_buffer()
+        self.sketch_process.stop()
+        self.sketch_process = None
+
+    def _poll_sketch_process(self) -> None:
+        """Handle output, frame and exit messages from the sketch process."""
+        if self.sketch_process is None:
+            return
+
+        for kind, payload in self.sketch_process.poll():
+            if kind == "output":
+                self.console_capture.write(payload)
+            elif kind == "frame":
+                self.frame_count, draw_time, damage = payload
+                self.profiler.add_frame(draw_time)
+                self.display_widget.show_damage(damage)
+            elif kind == "error":
+                self._flush_console()
+                logger.error(f"Error in sketch process:\n{payload}")
+                self._output_to_console(f"Error in sketch:\n{payload}\n")
+                self.stop()
+                return
+            elif kind == "exit":
+                self._flush_console()
+                if payload:
+                    self._output_to_console(
+                        f"Sketch process exited with code {payload}\n",
+                    )
+                self.stop()
+                return
+
+    def profile_frames(self, frames: int = 60) -> None:
+        """Run cProfile over the next frames and print the report.
+
+        Args:
+            frames: Number of frames to profile
+
+        """
+        if self.execution_mode == "process":
+            self._output_to_console(
+                "Profiling is not available for sketches in a separate process\n",
+            )
+            return
+        self.profiler.profile_next(frames)
+        self._output_to_console(f"Profiling the next {frames} frames...\n")
+
+    def set_stack_sampling(self, enabled: bool) -> None:
+        """Start or stop sampling the stack of the thread running draw().
+
+        Args:
+            enabled: True to start sampling
+
+        """
+        if enabled:
+            self.profiler.start_sampling()
+        else:
+            self.profiler.stop_sampling()
+
+    def report_samples(self, frames: int = 60) -> None:
+        """Print the sampled stacks of the last frames to the console.
+
+        Args:
+            frames: Number of recent frames to include
+
+        """
+        self._output_to_console(self.profiler.sample_report(frames))
+
+    def _draw_frame(self) -> None:
+        """Draw one frame, recording its timings."""
+        with self._frame_lock:
+            self.profiler.begin_frame()
+            try:
+                self.draw_func()
+            finally:
+                self.profiler.end_frame()
+        self.frame_count += 1
+
+    def _present_tiles(self) -> None:
+        """Show the tiles rendered so far while draw() is still running."""
+        self.display_widget.present()
+        if threading.current_thread() is threading.main_thread():
+            # draw() is blocking the event loop, so a scheduled repaint
+            # would only happen after the whole frame
+            self.display_widget.paint_now()
+
+    @Slot(str)
+    def _on_render_thread_failed(self, error_text: str) -> None:
+        """Report a draw() error raised on the render thread.
+
+        Args:
+            error_text: Formatted exception text
+
+        """
+        self._flush_console()
+        logger.error(f"Error in draw() function:\n{error_text}")
+        self._output_to_console(f"Error in draw():\n{error_text}\n")
+        self.stop()
+
+    def _schedule_next_frame(self) -> None:
+        """Arm the draw timer for the next frame the scheduler asks for."""
+        delay = self.scheduler.time_until_next_frame()
+        if delay is None:
+            return  # Paused by noLoop()
+        # Round up so the timer doesn't fire just before the frame is due
+        self.draw_timer.start(max(0, math.ceil(delay * 1000)))
+
     def _execute_draw(self) -> None:
-        """Execute the draw() function."""
+        """Execute the draw() function if a frame is due, then repaint."""
         if not self.is_running or not self.draw_func:
             return
 
+        delay = self.scheduler.time_until_next_frame()
+        if delay is None or delay > 0:
+            self._schedule_next_frame()
+            return
+
         try:
-            self._execute_with_output_capture(self.draw_func)
-            self.frame_count += 1
+            self.scheduler.begin_frame()
+            self._draw_frame()
+            self.scheduler.end_frame()
         except Exception:
             logger.exception("Error in draw() function")
+            self._flush_console()
             self._output_to_console(f"Error in draw():\n{self._get_exception_text()}\n")
             self.stop()
+            return
 
-    def _execute_with_output_capture(self, func) -> None:  # noqa: ANN001
-        """Execute a function and capture its output.
+        self.display_widget.present()
+        self._schedule_next_frame()
 
-        Args:
-            func: Function to execute
+    def _start_console_capture(self) -> None:
+        """Redirect stdout/stderr into the capture for the rest of the run."""
+        self.console_capture.install()
+        self.console_timer.start(CONSOLE_FLUSH_INTERVAL_MS)
 
-        """
-        # Capture stdout and stderr
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
+    def _stop_console_capture(self) -> None:
+        """Restore stdout/stderr and forward any remaining output."""
+        self.console_timer.stop()
+        self.console_capture.uninstall()
+        self._flush_console()
 
-        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-            try:
-                func()
-            except Exception as e:
-                # Print the exception so it's captured
-                import traceback
-                traceback.print_exc()
-                raise e
+    def _flush_console(self) -> None:
+        """Forward captured output to the console in one batch."""
+        text = self.console_capture.drain()
+        if text:
+            self._output_to_console(text)
 
-        # Send captured output to console
-        stdout_text = stdout_capture.getvalue()
-        stderr_text = stderr_capture.getvalue()
+    def _output_to_console(self, text: str) -> None:
+        """Send text to the console.
 
-        if stdout_text:
-            self._output_to_console(stdout_text)
+        Args:
+            text: Text to output
 
-        if stderr_text:
-            self._output_to_console(stderr_text)
+        """
+        if self.console_callback:
+            self.console_output.emit(text)
 
-    def _output_to_console(self, text: str) -> None:
-        """Send text to the console.
+    @Slot(str)
+    def _deliver_console_output(self, text: str) -> None:
+        """Pass console output to the callback on the GUI thread.
 
         Args:
             text: Text to output
@@ -207,5 +642,4 @@ class SketchExecutor:
             Exception text with traceback
 
         """
-        import traceback
-        return "".join(traceback.format_exception(*sys.exc_info()))
+        return _get_exception_text()
@@ -0,0 +1,973 @@
+"""Export pipelines for rendered frames.
+
+Animation writers accept frames one at a time, as RGBA arrays or straight
+from a Framebuffer, and encode them to disk as they arrive. Nothing but the frame
+currently being encoded is kept in memory, so the cost of an export does not
+grow with its frame count.
+
+Image writers do the same for the rows of a single image too large to hold
+in memory: rows are written top to bottom in bands, and only the band being
+encoded is kept. ``save_framebuffer()`` uses them to export framebuffers of
+any size, including memory-mapped raw frame files.
+
+Frame sequences are written by a PngSequenceWriter, which encodes each
+frame to its own PNG on a pool of worker processes while the next frames
+are drawn.
+"""
+
+import abc
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+import struct
+import threading
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Self
+
+import numpy as np
+from loguru import logger
+from PIL import GifImagePlugin, Image
+
+from peyote.util.framebuffer import Framebuffer
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_chunk(tag: bytes, data: bytes) -> bytes:
+    """Build a PNG chunk with its length and CRC.
+
+    Args:
+        tag: Four byte chunk type
+        data: Chunk payload
+
+    Returns:
+        Encoded chunk
+
+    """
+    crc = zlib.crc32(data, zlib.crc32(tag))
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+
+def png_header(w: int, h: int) -> bytes:
+    """Build the IHDR payload for an 8-bit RGBA image.
+
+    Args:
+        w: Image width
+        h: Image height
+
+    Returns:
+        IHDR chunk payload
+
+    """
+    return struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)
+
+
+def filter_rows(rgba: np.ndarray, prev_row: np.ndarray | None = None) -> np.ndarray:
+    """Apply the PNG "Up" filter to a block of RGBA rows.
+
+    Args:
+        rgba: Array of shape (rows, w, 4) with dtype uint8
+        prev_row: The row preceding the block, if any
+
+    Returns:
+        Array of shape (rows, 1 + w * 4) ready for zlib compression
+
+    """
+    rows = rgba.reshape(rgba.shape[0], -1)
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2  # Up filter
+    if prev_row is None:
+        filtered[0, 1:] = rows[0]
+    else:
+        np.subtract(rows[0], prev_row.reshape(-1), out=filtered[0, 1:])
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+    return filtered
+
+
+class AnimationWriter(abc.ABC):
+    """Base class for streaming animation writers.
+
+    Frames are handed to ``add_frame`` as RGBA arrays or Framebuffers,
+    which are converted to RGBA on the way in. With ``threaded``
+    enabled the frame is copied into a small bounded queue and quantized and
+    encoded on a worker thread, so rendering the next frame overlaps with
+    encoding the previous one. Leaving a ``with`` block with an exception
+    discards the file.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        duration: int = 33,
+        loop: int = 0,
+        *,
+        threaded: bool = False,
+        queue_size: int = 4,
+    ) -> None:
+        """Initialize the writer and open the output file.
+
+        Args:
+            path: Path to write the animation to
+            duration: Duration per frame in milliseconds
+            loop: Number of times to loop, 0 for forever
+            threaded: Encode frames on a worker thread
+            queue_size: Maximum number of frames waiting to be encoded
+
+        """
+        self.path = Path(path)
+        self.duration = duration
+        self.loop = loop
+        self.frame_count = 0
+
+        self._fp: BinaryIO = self.path.open("wb")
+        self._size: tuple[int, int] | None = None
+        self._error: BaseException | None = None
+        self._closed = False
+
+        self._queue: queue.Queue[np.ndarray | None] | None = None
+        self._worker: threading.Thread | None = None
+        if threaded:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._worker = threading.Thread(
+                target=self._run_worker,
+                name="animation-writer",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def add_frame(self, buf: np.ndarray | Framebuffer) -> None:
+        """Add a frame to the animation.
+
+        Args:
+            buf: RGBA array of shape (h, w, 4) with dtype uint8, or a
+                Framebuffer
+
+        Raises:
+            ValueError: If the frame size differs from the first frame
+            RuntimeError: If the writer is closed
+
+        """
+        if self._closed:
+            msg = "Animation writer is closed"
+            raise RuntimeError(msg)
+        self._raise_worker_error()
+
+        # The conversion is a copy, so the caller can draw the next frame
+        # right away
+        converted = isinstance(buf, Framebuffer)
+        if converted:
+            buf = buf.to_rgba()
+
+        h, w = buf.shape[:2]
+        if self._size is None:
+            self._size = (w, h)
+        elif self._size != (w, h):
+            msg = f"Frame size {w}x{h} does not match {self._size[0]}x{self._size[1]}"
+            raise ValueError(msg)
+
+        if self._queue is not None:
+            # Copy so the caller can draw the next frame into buf immediately
+            self._queue.put(buf if converted else np.array(buf, dtype=np.uint8))
+        else:
+            self._encode_frame(buf)
+
+    def close(self) -> None:
+        """Finish encoding queued frames and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            self._stop_worker()
+            self._raise_worker_error()
+            if self.frame_count:
+                self._finish()
+        finally:
+            self._fp.close()
+            if not self.frame_count:
+                self.path.unlink(missing_ok=True)
+
+        logger.info(f"Saved animation with {self.frame_count} frames: {self.path}")
+
+    def __enter__(self) -> Self:
+        """Return the writer for use as a context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the writer, or discard the file if an error is propagating."""
+        if exc_type is not None:
+            self._discard()
+        else:
+            self.close()
+
+    def _discard(self) -> None:
+        """Stop encoding, then close and delete the unfinished file."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._stop_worker()
+        finally:
+            self._fp.close()
+            self.path.unlink(missing_ok=True)
+        logger.info(f"Discarded unfinished animation: {self.path}")
+
+    def _stop_worker(self) -> None:
+        """Let the worker thread encode the queued frames and exit."""
+        if self._queue is not None and self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+
+    def _run_worker(self) -> None:
+        """Encode queued frames until the end-of-stream marker arrives."""
+        assert self._queue is not None  # noqa: S101
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            if self._error is not None:
+                continue  # Drain the queue so add_frame never blocks forever
+            try:
+                self._encode_frame(frame)
+            except BaseException as error:
+                logger.exception("Failed to encode animation frame")
+                self._error = error
+
+    def _raise_worker_error(self) -> None:
+        """Re-raise an error that happened on the worker thread."""
+        if self._error is not None:
+            msg = f"Failed to encode animation: {self.path}"
+            raise RuntimeError(msg) from self._error
+
+    @abc.abstractmethod
+    def _encode_frame(self, buf: np.ndarray) -> None:
+        """Encode one frame and write it to the file.
+
+        Args:
+            buf: RGBA array of shape (h, w, 4)
+
+        """
+
+    @abc.abstractmethod
+    def _finish(self) -> None:
+        """Write any trailing data once all frames are encoded."""
+
+
+class GifWriter(AnimationWriter):
+    """Streaming animated GIF writer.
+
+    Each frame is quantized to its own 256 color palette and written with a
+    local color table.
+    """
+
+    def _encode_frame(self, buf: np.ndarray) -> None:
+        """Quantize one frame and append it to the GIF.
+
+        Args:
+            buf: RGBA array of shape (h, w, 4)
+
+        """
+        rgb = Image.fromarray(np.ascontiguousarray(buf[..., :3]))
+        frame = rgb.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+
+        if self.frame_count == 0:
+            header, _ = GifImagePlugin.getheader(
+                frame,
+                info={"loop": self.loop, "duration": self.duration},
+            )
+            self._fp.write(b"".join(header))
+
+        for data in GifImagePlugin.getdata(
+            frame,
+            duration=self.duration,
+            include_color_table=True,
+        ):
+            self._fp.write(data)
+        self.frame_count += 1
+
+    def _finish(self) -> None:
+        """Write the GIF trailer."""
+        self._fp.write(b";")
+
+
+class ApngWriter(AnimationWriter):
+    """Streaming animated PNG writer.
+
+    The frame count in the acTL chunk is not known until the animation is
+    closed, so a placeholder is written up front and patched in place.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str | Path,
+        duration: int = 33,
+        loop: int = 0,
+        *,
+        threaded: bool = False,
+        queue_size: int = 4,
+        compress_level: int = 6,
+    ) -> None:
+        """Initialize the writer and open the output file.
+
+        Args:
+            path: Path to write the animation to
+            duration: Duration per frame in milliseconds
+            loop: Number of times to loop, 0 for forever
+            threaded: Encode frames on a worker thread
+            queue_size: Maximum number of frames waiting to be encoded
+            compress_level: zlib compression level (0-9)
+
+        """
+        self.compress_level = compress_level
+        self._sequence = 0
+        self._actl_offset = 0
+        super().__init__(
+            path,
+            duration,
+            loop,
+            threaded=threaded,
+            queue_size=queue_size,
+        )
+
+    def _encode_frame(self, buf: np.ndarray) -> None:
+        """Compress one frame and append it to the APNG.
+
+        Args:
+            buf: RGBA array of shape (h, w, 4)
+
+        """
+        h, w = buf.shape[:2]
+
+        if self.frame_count == 0:
+            self._fp.write(PNG_SIGNATURE)
+            self._fp.write(png_chunk(b"IHDR", png_header(w, h)))
+            self._actl_offset = self._fp.tell()
+            self._fp.write(png_chunk(b"acTL", struct.pack(">II", 0, self.loop)))
+
+        self._fp.write(
+            png_chunk(
+                b"fcTL",
+                struct.pack(
+                    ">IIIIIHHBB",
+                    self._next_sequence(),
+                    w,
+                    h,
+                    0,
+                    0,
+                    self.duration,
+                    1000,
+                    0,  # APNG_DISPOSE_OP_NONE
+                    0,  # APNG_BLEND_OP_SOURCE
+                ),
+            ),
+        )
+
+        data = zlib.compress(filter_rows(buf).tobytes(), self.compress_level)
+        if self.frame_count == 0:
+            self._fp.write(png_chunk(b"IDAT", data))
+        else:
+            sequence = struct.pack(">I", self._next_sequence())
+            self._fp.write(png_chunk(b"fdAT", sequence + data))
+        self.frame_count += 1
+
+    def _finish(self) -> None:
+        """Write the end chunk and patch the frame count."""
+        self._fp.write(png_chunk(b"IEND", b""))
+        self._fp.seek(self._actl_offset)
+        self._fp.write(
+            png_chunk(b"acTL", struct.pack(">II", self.frame_count, self.loop)),
+        )
+
+    def _next_sequence(self) -> int:
+        """Return the next APNG sequence number."""
+        sequence = self._sequence
+        self._sequence += 1
+        return sequence
+
+
+class ImageWriter(abc.ABC):
+    """Base class for streaming still-image writers.
+
+    The image is written top to bottom in bands of rows with
+    ``write_rows()``, so the whole image is never in memory. Closing the
+    writer before every row was written discards the file.
+    """
+
+    def __init__(self, path: str | Path, w: int, h: int) -> None:
+        """Open the output file.
+
+        Args:
+            path: Path to write the image to
+            w: Image width
+            h: Image height
+
+        """
+        self.path = Path(path)
+        self.w = w
+        self.h = h
+        self.rows_written = 0
+        self._fp: BinaryIO = self.path.open("wb")
+        self._closed = False
+
+    def write_rows(self, rgba: np.ndarray) -> None:
+        """Append the next band of rows.
+
+        Args:
+            rgba: Array of shape (rows, w, 4) with dtype uint8
+
+        Raises:
+            ValueError: If the band has the wrong width or runs past the
+                bottom of the image
+            RuntimeError: If the writer is closed
+
+        """
+        if self._closed:
+            msg = "Image writer is closed"
+            raise RuntimeError(msg)
+        rows = rgba.shape[0]
+        if rgba.shape[1:] != (self.w, 4):
+            msg = f"Expected rows of shape ({self.w}, 4), got {rgba.shape[1:]}"
+            raise ValueError(msg)
+        if self.rows_written + rows > self.h:
+            end = self.rows_written + rows
+            msg = f"Rows up to {end} written to an image {self.h} rows high"
+            raise ValueError(msg)
+
+        self._write_rows(rgba)
+        self.rows_written += rows
+
+    def close(self) -> None:
+        """Finish the image and close the file.
+
+        Raises:
+            ValueError: If fewer rows than the image height were written
+
+        """
+        if self._closed:
+            return
+        if self.rows_written != self.h:
+            self._discard()
+            msg = f"Only {self.rows_written} of {self.h} rows were written"
+            raise ValueError(msg)
+
+        self._closed = True
+        try:
+            self._finish()
+        finally:
+            self._fp.close()
+        logger.info(f"Saved {self.w}x{self.h} image: {self.path}")
+
+    def __enter__(self) -> Self:
+        """Return the writer for use as a context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the writer, or discard the file if an error is propagating."""
+        if exc_type is not None:
+            self._discard()
+        else:
+            self.close()
+
+    def _discard(self) -> None:
+        """Close and delete an unfinished file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._fp.close()
+        self.path.unlink(missing_ok=True)
+
+    @abc.abstractmethod
+    def _write_rows(self, rgba: np.ndarray) -> None:
+        """Encode a band of rows.
+
+        Args:
+            rgba: Array of shape (rows, w, 4)
+
+        """
+
+    @abc.abstractmethod
+    def _finish(self) -> None:
+        """Write any trailing data once all rows are encoded."""
+
+
+class PngImageWriter(ImageWriter):
+    """Streaming RGBA PNG writer.
+
+    Rows are filtered and fed to a single zlib stream, which is written out
+    as IDAT chunks whenever enough compressed data has accumulated.
+    """
+
+    # Compressed bytes collected before an IDAT chunk is written
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(
+        self,
+        path: str | Path,
+        w: int,
+        h: int,
+        compress_level: int = 6,
+    ) -> None:
+        """Open the output file and write the header.
+
+        Args:
+            path: Path to write the image to
+            w: Image width
+            h: Image height
+            compress_level: zlib compression level (0-9)
+
+        """
+        super().__init__(path, w, h)
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending: list[bytes] = []
+        self._pending_size = 0
+        self._prev_row: np.ndarray | None = None
+
+        self._fp.write(PNG_SIGNATURE)
+        self._fp.write(png_chunk(b"IHDR", png_header(w, h)))
+
+    def _write_rows(self, rgba: np.ndarray) -> None:
+        """Filter, compress and buffer a band of rows.
+
+        Args:
+            rgba: Array of shape (rows, w, 4)
+
+        """
+        if not len(rgba):
+            return
+        filtered = filter_rows(rgba, self._prev_row)
+        self._add(self._compressor.compress(filtered.tobytes()))
+        self._prev_row = rgba[-1].copy()
+
+    def _finish(self) -> None:
+        """Flush the zlib stream and write the end chunk."""
+        self._add(self._compressor.flush())
+        self._write_idat()
+        self._fp.write(png_chunk(b"IEND", b""))
+
+    def _add(self, data: bytes) -> None:
+        """Buffer compressed data, writing an IDAT chunk once enough is ready.
+
+        Args:
+            data: Compressed bytes
+
+        """
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= self.CHUNK_SIZE:
+            self._write_idat()
+
+    def _write_idat(self) -> None:
+        """Write the buffered compressed data as one IDAT chunk."""
+        if self._pending:
+            self._fp.write(png_chunk(b"IDAT", b"".join(self._pending)))
+        self._pending = []
+        self._pending_size = 0
+
+
+class TiffImageWriter(ImageWriter):
+    """Streaming RGBA TIFF writer.
+
+    Rows are written as fixed-height strips, each deflate-compressed on its
+    own unless compression is off. The directory describing the strips is
+    written at the end of the file. Offsets are 32 bits, so files are
+    limited to 4 GB.
+    """
+
+    # TIFF field types
+    _SHORT = 3
+    _LONG = 4
+
+    def __init__(
+        self,
+        path: str | Path,
+        w: int,
+        h: int,
+        compress_level: int = 6,
+        rows_per_strip: int = 64,
+    ) -> None:
+        """Open the output file and write the header.
+
+        Args:
+            path: Path to write the image to
+            w: Image width
+            h: Image height
+            compress_level: zlib compression level (1-9), or 0 to store
+                strips uncompressed
+            rows_per_strip: Height of each strip
+
+        """
+        super().__init__(path, w, h)
+        self.compress_level = compress_level
+        self.rows_per_strip = rows_per_strip
+        self._strips: list[tuple[int, int]] = []
+        self._partial: np.ndarray | None = None
+
+        # Little-endian header; the directory offset is patched in _finish()
+        self._fp.write(b"II*\x00" + struct.pack("<I", 0))
+
+    def _write_rows(self, rgba: np.ndarray) -> None:
+        """Cut the rows into strips and write every complete one.
+
+        Args:
+            rgba: Array of shape (rows, w, 4)
+
+        """
+        if self._partial is not None:
+            rgba = np.concatenate([self._partial, rgba])
+            self._partial = None
+
+        full = len(rgba) - len(rgba) % self.rows_per_strip
+        for start in range(0, full, self.rows_per_strip):
+            self._write_strip(rgba[start : start + self.rows_per_strip])
+        if full < len(rgba):
+            self._partial = rgba[full:].copy()
+
+    def _write_strip(self, rgba: np.ndarray) -> None:
+        """Write one strip.
+
+        Args:
+            rgba: Array of shape (rows, w, 4)
+
+        Raises:
+            ValueError: If the file grows past the 4 GB TIFF limit
+
+        """
+        data = np.ascontiguousarray(rgba).tobytes()
+        if self.compress_level:
+            data = zlib.compress(data, self.compress_level)
+        offset = self._fp.tell()
+        if offset + len(data) >= 1 << 32:
+            msg = "TIFF files are limited to 4 GB; export a PNG instead"
+            raise ValueError(msg)
+        self._fp.write(data)
+        self._strips.append((offset, len(data)))
+
+    def _finish(self) -> None:
+        """Write the last strip and the image file directory."""
+        if self._partial is not None:
+            self._write_strip(self._partial)
+            self._partial = None
+
+        fp = self._fp
+        offsets = [offset for offset, _ in self._strips]
+        counts = [count for _, count in self._strips]
+
+        # Values longer than four bytes are stored before the directory
+        def store(fmt: str, values: list[int]) -> int:
+            if fp.tell() % 2:
+                fp.write(b"\x00")
+            position = fp.tell()
+            fp.write(struct.pack(f"<{len(values)}{fmt}", *values))
+            return position
+
+        bits = store("H", [8, 8, 8, 8])
+        many = len(self._strips) > 1
+        strip_offsets = store("I", offsets) if many else offsets[0]
+        strip_counts = store("I", counts) if many else counts[0]
+
+        short, long = self._SHORT, self._LONG
+        entries = [
+            (256, long, 1, self.w),  # ImageWidth
+            (257, long, 1, self.h),  # ImageLength
+            (258, short, 4, bits),  # BitsPerSample
+            (259, short, 1, 8 if self.compress_level else 1),  # Compression
+            (262, short, 1, 2),  # PhotometricInterpretation: RGB
+            (273, long, len(offsets), strip_offsets),  # StripOffsets
+            (277, short, 1, 4),  # SamplesPerPixel
+            (278, long, 1, self.rows_per_strip),  # RowsPerStrip
+            (279, long, len(counts), strip_counts),  # StripByteCounts
+            (284, short, 1, 1),  # PlanarConfiguration: interleaved
+            (338, short, 1, 2),  # ExtraSamples: unassociated alpha
+        ]
+
+        if fp.tell() % 2:
+            fp.write(b"\x00")
+        directory = fp.tell()
+        fp.write(struct.pack("<H", len(entries)))
+        for tag, kind, count, value in entries:
+            if kind == short and count == 1:
+                packed = struct.pack("<HH", value, 0)
+            else:
+                packed = struct.pack("<I", value)
+            fp.write(struct.pack("<HHI", tag, kind, count) + packed)
+        fp.write(struct.pack("<I", 0))  # No further directories
+
+        fp.seek(4)
+        fp.write(struct.pack("<I", directory))
+
+
+def _encode_png(path: Path, rgba: np.ndarray, compress_level: int) -> None:
+    """Write one RGBA frame as a PNG; runs in a PngSequenceWriter worker.
+
+    Args:
+        path: Path to write the PNG to
+        rgba: Array of shape (h, w, 4) with dtype uint8
+        compress_level: zlib compression level (0-9)
+
+    """
+    h, w = rgba.shape[:2]
+    with PngImageWriter(path, w, h, compress_level=compress_level) as writer:
+        writer.write_rows(rgba)
+
+
+class PngSequenceWriter:
+    """Writes frames as numbered PNG files, encoded on a process pool.
+
+    ``add_frame()`` copies the frame to straight RGBA and hands it to one of
+    ``jobs`` worker processes, so the caller draws the next frame while
+    earlier ones are compressed on other cores. At most ``queue_size``
+    frames are queued or encoding at once: when the encoders fall behind,
+    ``add_frame()`` waits for the oldest frame to finish, which keeps memory
+    bounded.
+
+    Frames are completed in the order they were added. ``on_frame`` is
+    called for each one once its file is written, and an encoding error is
+    raised by the ``add_frame()`` or ``close()`` call that reaches that
+    frame. ``close()`` waits for every frame.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        output_dir: str | Path,
+        pattern: str = "frame_{:05d}.png",
+        *,
+        jobs: int | None = None,
+        compress_level: int = 6,
+        queue_size: int | None = None,
+        on_frame: Callable[[int, Path], None] | None = None,
+    ) -> None:
+        """Create the output directory; workers start with the first frames.
+
+        Args:
+            output_dir: Directory the PNG files are written to
+            pattern: Format string for frame file names, given the frame index
+            jobs: Number of encoder processes, one per CPU by default
+            compress_level: zlib compression level (0-9)
+            queue_size: Maximum number of frames queued or encoding, twice
+                the number of jobs by default
+            on_frame: Optional callback invoked with the index and path of
+                each written frame, in order
+
+        """
+        self.output_dir = Path(output_dir)
+        self.pattern = pattern
+        self.jobs = jobs or os.cpu_count() or 1
+        self.compress_level = compress_level
+        self.queue_size = queue_size or 2 * self.jobs
+        self.on_frame = on_frame
+        self.frames_added = 0
+        self.frames_written = 0
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._pending: collections.deque[
+            tuple[int, Path, concurrent.futures.Future[None]]
+        ] = collections.deque()
+        # Spawned rather than forked; forking a process running Qt threads
+        # is not safe
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Number of frames queued or encoding."""
+        return len(self._pending)
+
+    def add_frame(self, buf: np.ndarray | Framebuffer) -> Path:
+        """Queue a frame for encoding, waiting if the queue is full.
+
+        Args:
+            buf: RGBA array of shape (h, w, 4) with dtype uint8, or a
+                Framebuffer
+
+        Returns:
+            Path the frame will be written to
+
+        Raises:
+            OSError: If an earlier frame could not be written
+            RuntimeError: If the writer is closed
+
+        """
+        if self._closed:
+            msg = "PNG sequence writer is closed"
+            raise RuntimeError(msg)
+
+        # Copy so the caller can draw the next frame into buf immediately
+        if isinstance(buf, Framebuffer):
+            rgba = buf.to_rgba()
+        else:
+            rgba = np.array(buf, dtype=np.uint8)
+
+        while len(self._pending) >= self.queue_size:
+            self._complete_oldest()
+
+        index = self.frames_added
+        path = self.output_dir / self.pattern.format(index)
+        future = self._pool.submit(_encode_png, path, rgba, self.compress_level)
+        self._pending.append((index, path, future))
+        self.frames_added += 1
+
+        # Report frames that are already done without waiting
+        while self._pending and self._pending[0][2].done():
+            self._complete_oldest()
+        return path
+
+    def close(self) -> None:
+        """Wait for all queued frames and stop the workers.
+
+        Raises:
+            OSError: If a frame could not be written
+
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            while self._pending:
+                self._complete_oldest()
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        logger.info(f"Saved {self.frames_written} frames to {self.output_dir}")
+
+    def __enter__(self) -> Self:
+        """Return the writer for use as a context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the writer, or drop queued frames if an error is propagating."""
+        if exc_type is None:
+            self.close()
+            return
+        self._closed = True
+        self._pending.clear()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _complete_oldest(self) -> None:
+        """Wait for the oldest queued frame and report it."""
+        index, path, future = self._pending.popleft()
+        try:
+            future.result()
+        except Exception as error:
+            msg = f"Failed to write frame: {path}"
+            raise OSError(msg) from error
+
+        self.frames_written += 1
+        if self.on_frame:
+            self.on_frame(index, path)
+
+
+def open_image_writer(
+    path: str | Path,
+    w: int,
+    h: int,
+    **kwargs: object,
+) -> ImageWriter:
+    """Open a streaming image writer for the format implied by the suffix.
+
+    ``.png`` files get a PngImageWriter, ``.tif`` and ``.tiff`` files a
+    TiffImageWriter.
+
+    Args:
+        path: Path to write the image to
+        w: Image width
+        h: Image height
+        **kwargs: Passed through to the writer
+
+    Returns:
+        An open image writer
+
+    Raises:
+        ValueError: If the suffix is not a supported image format
+
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".png":
+        return PngImageWriter(path, w, h, **kwargs)  # type: ignore[arg-type]
+    if suffix in {".tif", ".tiff"}:
+        return TiffImageWriter(path, w, h, **kwargs)  # type: ignore[arg-type]
+    msg = f"Unsupported image format: {suffix}"
+    raise ValueError(msg)
+
+
+def save_framebuffer(
+    framebuffer: Framebuffer,
+    path: str | Path,
+    band_rows: int = 256,
+    **kwargs: object,
+) -> None:
+    """Write a framebuffer to a PNG or TIFF, a band of rows at a time.
+
+    Only one band is converted to straight RGBA at once, so a memory-mapped
+    framebuffer larger than RAM is exported with bounded memory.
+
+    Args:
+        framebuffer: Framebuffer to export
+        path: Path to write the image to; the suffix selects the format
+        band_rows: Rows converted and written at a time
+        **kwargs: Passed through to the image writer
+
+    Raises:
+        ValueError: If the suffix is not a supported image format
+
+    """
+    w, h = framebuffer.w, framebuffer.h
+    rgba = np.empty((min(band_rows, h), w, 4), dtype=np.uint8)
+    with open_image_writer(path, w, h, **kwargs) as writer:
+        for y in range(0, h, band_rows):
+            rows = min(band_rows, h - y)
+            band = Framebuffer(
+                w,
+                rows,
+                framebuffer.array[y : y + rows],
+                premultiplied=framebuffer.premultiplied,
+            )
+            writer.write_rows(band.to_rgba(out=rgba[:rows]))
+    logger.info(f"Saved {w}x{h} framebuffer to {path}")
+
+
+def open_animation_writer(path: str | Path, **kwargs: object) -> AnimationWriter:
+    """Open an animation writer for the format implied by the file suffix.
+
+    ``.gif`` files get a GifWriter, ``.png`` and ``.apng`` files an ApngWriter.
+
+    Args:
+        path: Path to write the animation to
+        **kwargs: Passed through to the writer
+
+    Returns:
+        An open animation writer
+
+    Raises:
+        ValueError: If the suffix is not a supported animation format
+
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".gif":
+        return GifWriter(path, **kwargs)  # type: ignore[arg-type]
+    if suffix in {".png", ".apng"}:
+        return ApngWriter(path, **kwargs)  # type: ignore[arg-type]
+    msg = f"Unsupported animation format: {suffix}"
+    raise ValueError(msg)
@@ -0,0 +1,194 @@
+"""Frame pacing for running sketches.
+
+A FrameScheduler decides when the next draw() is due. Frames are scheduled
+on a fixed grid of ``1 / frame_rate`` seconds. A frame that starts less than
+one interval late keeps the grid, so the next frame comes early and the
+lost time is made up. A frame that starts one or more whole intervals late
+drops those slots instead of drawing a burst of catch-up frames. Either
+way the outcome only depends on the measured timings, never on timer
+jitter.
+
+Sketches control the scheduler through the Processing-style functions in
+``sketch_api()``: ``frameRate()``, ``noLoop()``, ``loop()`` and
+``redraw()``.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+DEFAULT_FRAME_RATE = 60.0
+
+
+class FrameScheduler:
+    """Paces draw() calls and measures how long they take."""
+
+    def __init__(
+        self,
+        frame_rate: float = DEFAULT_FRAME_RATE,
+        clock: Callable[[], float] = time.perf_counter,
+        history: int = 60,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            frame_rate: Target frames per second
+            clock: Monotonic clock returning seconds
+            history: Number of recent frames used for the measurements
+
+        """
+        self.clock = clock
+        self.frame_rate = DEFAULT_FRAME_RATE
+
+        # Set whenever pacing changes, so a waiting render loop re-checks
+        self.changed = threading.Event()
+
+        self._history = history
+        self.reset()
+        self.set_frame_rate(frame_rate)
+
+    def reset(self) -> None:
+        """Forget all state from a previous run and resume looping."""
+        self.looping = True
+        self.frame_count = 0
+        self.dropped_frames = 0
+
+        self._redraw_requested = False
+        self._next_deadline: float | None = None
+        self._frame_start: float | None = None
+        self._last_start: float | None = None
+        self._draw_times: deque[float] = deque(maxlen=self._history)
+        self._intervals: deque[float] = deque(maxlen=self._history)
+
+    @property
+    def interval(self) -> float:
+        """Target time between frames in seconds."""
+        return 1.0 / self.frame_rate
+
+    @property
+    def measured_frame_rate(self) -> float:
+        """Frames per second over the recent history, 0 before two frames."""
+        if not self._intervals:
+            return 0.0
+        return len(self._intervals) / sum(self._intervals)
+
+    @property
+    def draw_time(self) -> float:
+        """Average draw() duration over the recent history in seconds."""
+        if not self._draw_times:
+            return 0.0
+        return sum(self._draw_times) / len(self._draw_times)
+
+    @property
+    def paused(self) -> bool:
+        """True if no frame will be drawn until loop() or redraw()."""
+        return not self.looping and not self._redraw_requested
+
+    def set_frame_rate(self, frame_rate: float) -> None:
+        """Set the target frame rate.
+
+        Args:
+            frame_rate: Target frames per second
+
+        Raises:
+            ValueError: If frame_rate is not positive
+
+        """
+        if not frame_rate > 0:
+            msg = f"Frame rate must be positive, got {frame_rate!r}"
+            raise ValueError(msg)
+        self.frame_rate = float(frame_rate)
+        if self._last_start is not None:
+            # Keep the frame that's in progress, then use the new interval
+            self._next_deadline = self._last_start + self.interval
+        self._notify()
+
+    def no_loop(self) -> None:
+        """Stop drawing after the current frame."""
+        self.looping = False
+        self._notify()
+
+    def loop(self) -> None:
+        """Resume drawing continuously, starting with a frame right away."""
+        if not self.looping:
+            self.looping = True
+            self._next_deadline = None
+        self._notify()
+
+    def redraw(self) -> None:
+        """Draw one more frame as soon as possible, even when not looping."""
+        self._redraw_requested = True
+        self._notify()
+
+    def time_until_next_frame(self) -> float | None:
+        """Get how long to wait before the next frame is due.
+
+        Returns:
+            Seconds until the next frame (zero or negative when it is due),
+            or None while paused by noLoop()
+
+        """
+        if self._redraw_requested or self._last_start is None:
+            return 0.0  # Like Processing, the first frame is drawn even after noLoop()
+        if self.looping and self._next_deadline is None:
+            return 0.0
+        if not self.looping:
+            return None
+        return self._next_deadline - self.clock()
+
+    def begin_frame(self) -> None:
+        """Mark the start of a frame and schedule the one after it."""
+        now = self.clock()
+        self._redraw_requested = False
+
+        if self._next_deadline is None:
+            self._next_deadline = now + self.interval
+        else:
+            late = now - self._next_deadline
+            missed = int(late // self.interval) if late > 0 else 0
+            self.dropped_frames += missed
+            self._next_deadline += (missed + 1) * self.interval
+            if self._next_deadline <= now:
+                # Only reachable through rounding; never schedule in the past
+                self._next_deadline = now + self.interval
+
+        if self._last_start is not None:
+            self._intervals.append(now - self._last_start)
+        self._last_start = now
+        self._frame_start = now
+
+    def end_frame(self) -> None:
+        """Mark the end of a frame and record how long draw() took."""
+        if self._frame_start is None:
+            return
+        self._draw_times.append(self.clock() - self._frame_start)
+        self._frame_start = None
+        self.frame_count += 1
+
+    def sketch_api(self) -> dict[str, Callable]:
+        """Get the Processing-style pacing functions for sketch globals.
+
+        ``frameRate(fps)`` sets the target rate, and ``frameRate()`` with
+        no argument returns the measured rate.
+
+        Returns:
+            Dictionary mapping global names to functions
+
+        """
+
+        def frame_rate(fps: float | None = None) -> float:
+            if fps is not None:
+                self.set_frame_rate(fps)
+            return self.measured_frame_rate
+
+        return {
+            "frameRate": frame_rate,
+            "noLoop": self.no_loop,
+            "loop": self.loop,
+            "redraw": self.redraw,
+        }
+
+    def _notify(self) -> None:
+        """Wake up a render loop waiting for the next frame."""
+        self.changed.set()
@@ -0,0 +1,328 @@
+"""Headless batch rendering of sketches.
+
+The renderer drives a sketch's setup() and draw() functions directly against
+an OffscreenWidget. There is no QApplication, event loop or QTimer involved,
+so frames are produced as fast as the sketch can draw them. frameRate() is
+accepted but ignored, and rendering ends early once a sketch calls noLoop().
+"""
+
+import shutil
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from loguru import logger
+
+from peyote.util.framebuffer import Framebuffer
+
+from .display_widget import OffscreenWidget
+from .export import PngSequenceWriter, open_animation_writer
+from .frame_scheduler import FrameScheduler
+from .module_loader import ModuleLoader
+from .package_manager import PackageManager
+from .tiles import TileRenderer
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+
+def read_sketch_modules(path: Path) -> dict[str, str]:
+    """Read the modules of a sketch from disk.
+
+    Args:
+        path: A sketch package directory or a single .py file
+
+    Returns:
+        Dictionary mapping module names (without .py) to content
+
+    """
+    if path.is_file():
+        return {path.stem: path.read_text()}
+
+    return {
+        module_path.stem: module_path.read_text()
+        for module_path in sorted(path.glob("*.py"))
+        if module_path.name != "__init__.py"
+    }
+
+
+def open_canvas_file(
+    path: Path,
+    w: int,
+    h: int,
+    *,
+    opaque: bool = False,
+) -> Framebuffer:
+    """Map a raw frame file as the canvas, creating it if needed.
+
+    An existing file of the same size is reopened with its pixels, so an
+    accumulation render can continue where an earlier run stopped. A new
+    file is sparse and starts transparent black.
+
+    Args:
+        path: Raw frame file
+        w: Canvas width
+        h: Canvas height
+        opaque: Start a new file opaque black instead, so RGB-only drawing
+            such as ``display.rgb`` writes is visible without a clear();
+            this writes the whole file once
+
+    Returns:
+        Framebuffer backed by a numpy.memmap of the file
+
+    Raises:
+        ValueError: If the file exists with another size, or is not a raw
+            frame file
+
+    """
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Creating {w}x{h} canvas file {path}")
+        return Framebuffer.create_file(path, w, h, premultiplied=True, opaque=opaque)
+
+    framebuffer = Framebuffer.open_file(path)
+    if (framebuffer.w, framebuffer.h) != (w, h):
+        msg = f"{path} holds a {framebuffer.w}x{framebuffer.h} canvas, not {w}x{h}"
+        raise ValueError(msg)
+    logger.info(f"Reopened canvas file {path}")
+    return framebuffer
+
+
+class HeadlessRenderer:
+    """Renders sketch frames into an OffscreenWidget without a display."""
+
+    def __init__(
+        self,
+        w: int = 640,
+        h: int = 360,
+        project_name: str | None = None,
+        buf: np.ndarray | None = None,
+        *,
+        premultiplied: bool = True,
+    ) -> None:
+        """Initialize the headless renderer.
+
+        Args:
+            w: Width of the framebuffer
+            h: Height of the framebuffer
+            project_name: Name of the package the sketch is saved into;
+                by default every renderer saves into a package of its own,
+                which is deleted again by unload()
+            buf: Optional existing (h, w, 4) uint8 array in Framebuffer
+                layout to render into
+            premultiplied: Whether buf holds premultiplied colors
+
+        """
+        self.display_widget = OffscreenWidget(w, h, buf, premultiplied=premultiplied)
+
+        # A package per renderer keeps concurrent renders, and the IDE,
+        # from overwriting and pruning each other's modules
+        self.project_name = project_name or f"headless_{uuid.uuid4().hex}"
+        self._owns_package = project_name is None
+        self.package_manager: PackageManager | None = None
+        self.module_loader = ModuleLoader()
+
+        self.main_module: ModuleType | None = None
+        self.setup_func = None
+        self.draw_func = None
+
+        self.scheduler = FrameScheduler()
+        self.tiles = TileRenderer(self.display_widget.framebuffer)
+        self.frame_count = 0
+
+        logger.info(f"Headless renderer initialized: {w}x{h}")
+
+    def load(
+        self,
+        modules: dict[str, str],
+        main_module_name: str = "sketch",
+        sketch_globals: dict[str, object] | None = None,
+    ) -> None:
+        """Load sketch modules and run setup().
+
+        Args:
+            modules: Dictionary mapping module names to content
+            main_module_name: Name of the main module (without .py)
+            sketch_globals: Globals to inject on top of the defaults, e.g.
+                a canvas size other than the framebuffer's
+
+        Raises:
+            ImportError: If the main module could not be loaded
+
+        """
+        self.unload()
+
+        self.package_manager = PackageManager(self.project_name)
+        self.package_manager.save_all_modules(modules, prune=True)
+
+        module_files = [
+            f"{name}.py" if not name.endswith(".py") else name for name in modules
+        ]
+
+        loaded_modules = self.module_loader.load_package_modules(
+            self.package_manager.get_package_dir(),
+            module_files,
+        )
+
+        main_key = main_module_name.replace(".py", "")
+        if main_key not in loaded_modules:
+            msg = f"Main module '{main_key}' not found in loaded modules"
+            raise ImportError(msg)
+
+        self.main_module = loaded_modules[main_key]
+        self.scheduler = FrameScheduler()
+        self.module_loader.inject_globals(
+            {
+                "display": self.display_widget,
+                "WIDTH": self.display_widget.w,
+                "HEIGHT": self.display_widget.h,
+                **self.scheduler.sketch_api(),
+                **self.tiles.sketch_api(),
+                **(sketch_globals or {}),
+            },
+        )
+        self.tiles.sketch_globals = self.module_loader.injected_globals
+
+        self.setup_func = self.module_loader.get_module_function(
+            self.main_module,
+            "setup",
+        )
+        self.draw_func = self.module_loader.get_module_function(
+            self.main_module,
+            "draw",
+        )
+
+        if self.setup_func:
+            self.setup_func()
+            logger.info("Executed setup()")
+        else:
+            logger.warning("No setup() function found in main module")
+
+        self.frame_count = 0
+
+    def iter_frames(self, frames: int) -> Iterator[int]:
+        """Call draw() repeatedly, yielding after each frame.
+
+        The frame is available in ``display_widget.framebuffer`` until the
+        generator is resumed. Frames are not paced, but rendering stops
+        early once the sketch has called noLoop(); like Processing, the
+        first frame is drawn even if setup() called it.
+
+        Args:
+            frames: Maximum number of frames to render
+
+        Yields:
+            Index of the frame that was just drawn
+
+        """
+        start = time.perf_counter()
+        rendered = 0
+        for index in range(frames):
+            # None only once a frame was drawn after noLoop()
+            if self.scheduler.time_until_next_frame() is None:
+                break
+            self.scheduler.begin_frame()
+            if self.draw_func:
+                self.draw_func()
+            self.scheduler.end_frame()
+            self.frame_count += 1
+            rendered += 1
+            yield index
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Rendered {rendered} frames in {elapsed:.2f}s")
+
+    def render(  # noqa: PLR0913
+        self,
+        frames: int,
+        output_dir: Path,
+        pattern: str = "frame_{:05d}.png",
+        on_frame: Callable[[int, Path], None] | None = None,
+        *,
+        jobs: int | None = None,
+        compress_level: int = 6,
+    ) -> int:
+        """Call draw() repeatedly and write each frame as a PNG.
+
+        Frames are encoded on a pool of worker processes while the next
+        ones are drawn; drawing waits when the encoders fall behind.
+
+        Args:
+            frames: Number of frames to render
+            output_dir: Directory the PNG files are written to
+            pattern: Format string for frame file names, given the frame index
+            on_frame: Optional callback invoked with the frame index and path
+                once the frame is written, in frame order
+            jobs: Number of encoder processes, one per CPU by default
+            compress_level: zlib compression level (0-9)
+
+        Returns:
+            Number of frames written
+
+        Raises:
+            OSError: If a frame could not be written
+
+        """
+        with PngSequenceWriter(
+            output_dir,
+            pattern,
+            jobs=jobs,
+            compress_level=compress_level,
+            on_frame=on_frame,
+        ) as writer:
+            for _ in self.iter_frames(frames):
+                writer.add_frame(self.display_widget.framebuffer)
+
+        return writer.frames_written
+
+    def render_animation(
+        self,
+        frames: int,
+        path: Path,
+        duration: int = 33,
+        *,
+        threaded: bool = True,
+    ) -> int:
+        """Call draw() repeatedly and stream each frame into an animation.
+
+        Args:
+            frames: Number of frames to render
+            path: Output path; the suffix selects GIF or APNG
+            duration: Duration per frame in milliseconds
+            threaded: Encode frames on a worker thread
+
+        Returns:
+            Number of frames written
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open_animation_writer(
+            path,
+            duration=duration,
+            threaded=threaded,
+        ) as writer:
+            for _ in self.iter_frames(frames):
+                writer.add_frame(self.display_widget.framebuffer)
+
+        return writer.frame_count
+
+    def unload(self) -> None:
+        """Unload the sketch modules and stop the tile workers.
+
+        A file-backed framebuffer is flushed to disk, and the renderer's own
+        package is deleted.
+        """
+        self.display_widget.framebuffer.flush()
+        self.tiles.shutdown()
+        self.module_loader.unload_all()
+        if self.package_manager is not None and self._owns_package:
+            shutil.rmtree(self.package_manager.get_package_dir(), ignore_errors=True)
+        self.package_manager = None
+        self.main_module = None
+        self.setup_func = None
+        self.draw_func = None
+        self.frame_count = 0
@@ -19,6 +19,7 @@ from PySide6.QtWidgets import (
 )
 
 from .code_editor import CodeEditorWidget
+from .console_widget import ConsoleWidget
 from .display_widget import FramebufferWidget
 from .execution_engine import SketchExecutor
 from .logging_setup import setup_logging
@@ -81,6 +82,29 @@ class ProcessingIDEWindow(QMainWindow):
         sketch_menu = menubar.addMenu("&Sketch")
         sketch_menu.addAction("&Run")
         sketch_menu.addAction("&Stop")
+        sketch_menu.addSeparator()
+        self.render_thread_action = sketch_menu.addAction("Run on Render &Thread")
+        self.render_thread_action.setCheckable(True)
+        self.render_thread_action.toggled.connect(self._on_toggle_render_thread)
+        self.process_action = sketch_menu.addAction("Run in Separate &Process")
+        self.process_action.setCheckable(True)
+        self.process_action.toggled.connect(self._on_toggle_process)
+        sketch_menu.addSeparator()
+        self.live_coding_action = sketch_menu.addAction("&Live Coding")
+        self.live_coding_action.setCheckable(True)
+        self.live_coding_action.setToolTip(
+            "Play reloads edited tabs into the running sketch",
+        )
+        self.live_coding_action.toggled.connect(self._on_toggle_live_coding)
+        sketch_menu.addSeparator()
+        hud_action = sketch_menu.addAction("Show &FPS Overlay")
+        hud_action.setCheckable(True)
+        hud_action.toggled.connect(self._on_toggle_hud)
+        sketch_menu.addAction("Profile &Next 60 Frames", self._on_profile_frames)
+        sampling_action = sketch_menu.addAction("Sample &Stacks")
+        sampling_action.setCheckable(True)
+        sampling_action.toggled.connect(self._on_toggle_sampling)
+        sketch_menu.addAction("Report Sampled Stac&ks", self._on_report_samples)
 
         # Help menu
         help_menu = menubar.addMenu("&Help")
@@ -156,9 +180,8 @@ class ProcessingIDEWindow(QMainWindow):
         bottom_panel.addWidget(self.messages_area)
 
         # Console area
-        self.console_area = QTextEdit()
+        self.console_area = ConsoleWidget()
         self.console_area.setObjectName("console")
-        self.console_area.setReadOnly(True)
         self.console_area.setPlaceholderText("Console output will appear here...")
         self.console_area.setMaximumHeight(150)
         bottom_panel.addWidget(self.console_area)
@@ -203,7 +226,7 @@ class ProcessingIDEWindow(QMainWindow):
             text: Text to display
 
         """
-        self.console_area.append(text)
+        self.console_area.write(text)
 
     def _create_executor(self) -> None:
         """Create the sketch executor."""
@@ -219,6 +242,83 @@ class ProcessingIDEWindow(QMainWindow):
             self.tab_manager.add_new_tab()
             self.show_message("New tab created")
 
+    def _on_toggle_render_thread(self, checked: bool) -> None:
+        """Handle the Run on Render Thread menu toggle.
+
+        Args:
+            checked: Whether draw() should run on a render thread
+
+        """
+        if checked:
+            self.process_action.setChecked(False)
+        if self.executor:
+            self.executor.set_execution_mode("thread" if checked else "timer")
+            self.show_message(
+                "draw() will run on a render thread" if checked
+                else "draw() will run on the GUI thread",
+            )
+
+    def _on_toggle_process(self, checked: bool) -> None:
+        """Handle the Run in Separate Process menu toggle.
+
+        Args:
+            checked: Whether the sketch should run in its own process
+
+        """
+        if checked:
+            self.render_thread_action.setChecked(False)
+        if self.executor:
+            self.executor.set_execution_mode("process" if checked else "timer")
+            self.show_message(
+                "Sketches will run in a separate process" if checked
+                else "Sketches will run in the IDE process",
+            )
+
+    def _on_toggle_live_coding(self, checked: bool) -> None:
+        """Handle the Live Coding menu toggle.
+
+        Args:
+            checked: Whether Play should hot reload the running sketch
+
+        """
+        self._update_run_buttons()
+        self.show_message(
+            "Live coding: Play reloads edited tabs" if checked
+            else "Live coding off: Play restarts the sketch",
+        )
+
+    def _on_toggle_hud(self, checked: bool) -> None:
+        """Handle the Show FPS Overlay menu toggle.
+
+        Args:
+            checked: Whether the overlay should be shown
+
+        """
+        self.display_widget.set_hud_visible(checked)
+
+    def _on_profile_frames(self) -> None:
+        """Handle the Profile Next 60 Frames menu action."""
+        if self.executor:
+            self.executor.profile_frames(60)
+
+    def _on_toggle_sampling(self, checked: bool) -> None:
+        """Handle the Sample Stacks menu toggle.
+
+        Args:
+            checked: Whether the draw() stack should be sampled
+
+        """
+        if self.executor:
+            self.executor.set_stack_sampling(checked)
+            self.show_message(
+                "Sampling draw() stacks" if checked else "Stack sampling stopped",
+            )
+
+    def _on_report_samples(self) -> None:
+        """Handle the Report Sampled Stacks menu action."""
+        if self.executor:
+            self.executor.report_samples(60)
+
     def _on_play(self) -> None:
         """Handle Play button click."""
         if not self.tab_manager or not self.executor:
@@ -242,6 +342,16 @@ class ProcessingIDEWindow(QMainWindow):
         # Get the name of the first tab as the main module
         main_module_name = self.tab_manager.get_tab_name(0).rstrip("*")
 
+        live_coding = self.live_coding_action.isChecked()
+        if live_coding and self.executor.is_running:
+            self.show_message("Reloading sketch...")
+            if self.executor.hot_reload(modules, main_module_name):
+                self.show_message("Sketch reloaded")
+            else:
+                self.show_message("Failed to reload sketch")
+            self._update_run_buttons()
+            return
+
         # Clear console
         self.console_area.clear()
         self.messages_area.clear()
@@ -251,11 +361,10 @@ class ProcessingIDEWindow(QMainWindow):
         success = self.executor.load_and_run(modules, main_module_name)
 
         if success:
-            self.play_button.setEnabled(False)
-            self.stop_button.setEnabled(True)
             self.show_message("Sketch running")
         else:
             self.show_message("Failed to start sketch")
+        self._update_run_buttons()
 
     def _on_stop(self) -> None:
         """Handle Stop button click."""
@@ -263,10 +372,17 @@ class ProcessingIDEWindow(QMainWindow):
             return
 
         self.executor.stop()
-        self.play_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
+        self._update_run_buttons()
         self.show_message("Sketch stopped")
 
+    def _update_run_buttons(self) -> None:
+        """Enable Play/Stop to match whether a sketch is running."""
+        running = bool(self.executor and self.executor.is_running)
+        live_coding = self.live_coding_action.isChecked()
+        self.play_button.setEnabled(live_coding or not running)
+        self.play_button.setText("⟳ Reload" if live_coding and running else "▶ Play")
+        self.stop_button.setEnabled(running)
+
 
 def launch_ide() -> int:
     """Launch the IDE application.
@@ -1,12 +1,45 @@
 """Module loading utilities for sketch execution."""
 
+import ast
 import importlib.util
 import sys
+from collections import OrderedDict
 from pathlib import Path
-from types import ModuleType
+from types import CodeType, ModuleType
 
 from loguru import logger
 
+from .package_manager import content_hash
+
+# Compiled module code shared by all loaders, keyed by file path and source
+# hash, so restarting a sketch only compiles the modules that changed
+_CODE_CACHE_SIZE = 256
+_code_cache: OrderedDict[tuple[str, str], CodeType] = OrderedDict()
+
+
+def compile_module(source: str, module_path: Path) -> CodeType:
+    """Compile module source, reusing the code of identical earlier sources.
+
+    Args:
+        source: Python code content
+        module_path: Path the code is attributed to in tracebacks
+
+    Returns:
+        Compiled module code
+
+    """
+    key = (str(module_path), content_hash(source))
+    code = _code_cache.get(key)
+    if code is not None:
+        _code_cache.move_to_end(key)
+        return code
+
+    code = compile(source, str(module_path), "exec", dont_inherit=True)
+    _code_cache[key] = code
+    if len(_code_cache) > _CODE_CACHE_SIZE:
+        _code_cache.popitem(last=False)
+    return code
+
 
 class ModuleLoader:
     """Loads and manages Python modules for sketch execution."""
@@ -16,6 +49,9 @@ class ModuleLoader:
         self.loaded_modules: dict[str, ModuleType] = {}
         self.package_path: Path | None = None
 
+        # Globals injected into every module, re-applied on hot reload
+        self.injected_globals: dict[str, object] = {}
+
     def load_module(self, module_name: str, module_path: Path) -> ModuleType:
         """Load a Python module from a file.
 
@@ -37,11 +73,18 @@ class ModuleLoader:
         # Create module from spec
         module = importlib.util.module_from_spec(spec)
 
+        # Compile only if the source changed since it was last loaded
+        code = compile_module(module_path.read_text(encoding="utf-8"), module_path)
+
         # Add to sys.modules for imports to work
         sys.modules[module_name] = module
 
         # Execute the module
-        spec.loader.exec_module(module)
+        try:
+            exec(code, module.__dict__)  # noqa: S102
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
 
         # Store reference
         self.loaded_modules[module_name] = module
@@ -110,6 +153,173 @@ class ModuleLoader:
         logger.debug(f"Reloaded module: {module.__name__}")
         return reloaded
 
+    def inject_globals(self, namespace: dict[str, object]) -> None:
+        """Inject names into the globals of every loaded module.
+
+        This is how the execution engines expose the drawing target and
+        canvas dimensions to sketch code.
+
+        Args:
+            namespace: Mapping of global names to values
+
+        """
+        for module in self.loaded_modules.values():
+            module.__dict__.update(namespace)
+        self.injected_globals.update(namespace)
+
+        logger.debug(f"Injected globals: {sorted(namespace)}")
+
+    def find_dependencies(self, sources: dict[str, str]) -> dict[str, set[str]]:
+        """Find which sketch modules each module imports.
+
+        Both relative imports (``from .helpers import f``) and absolute
+        imports through the package name are recognized.
+
+        Args:
+            sources: Dictionary mapping module names (without .py) to content
+
+        Returns:
+            Dictionary mapping each module name to the names it imports
+
+        """
+        package_name = self.package_path.name if self.package_path else None
+        return {
+            name: _imported_modules(source, package_name) & sources.keys() - {name}
+            for name, source in sources.items()
+        }
+
+    def plan_reload(self, sources: dict[str, str], changed: set[str]) -> list[str]:
+        """Get the modules to re-execute after some modules changed.
+
+        A module is re-executed if it changed or if it imports, directly or
+        not, a module that did. Modules are ordered so that each comes after
+        the modules it imports.
+
+        Args:
+            sources: Dictionary mapping module names to their new content
+            changed: Names of the modules whose content changed
+
+        Returns:
+            Module names in the order they should be re-executed
+
+        """
+        dependencies = self.find_dependencies(sources)
+
+        affected = set(changed)
+        grew = True
+        while grew:
+            dependents = {
+                name for name, imports in dependencies.items() if imports & affected
+            }
+            grew = not dependents <= affected
+            affected |= dependents
+
+        order: list[str] = []
+        visiting: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in order or name in visiting:
+                return  # Import cycles keep their tab order
+            visiting.add(name)
+            for imported in sorted(dependencies[name] & affected):
+                visit(imported)
+            order.append(name)
+
+        for name in sources:
+            if name in affected:
+                visit(name)
+        return order
+
+    def reexecute_modules(
+        self,
+        package_dir: Path,
+        sources: dict[str, str],
+        module_names: list[str],
+    ) -> dict[str, ModuleType]:
+        """Re-execute loaded modules in place with new source code.
+
+        The module objects are kept, so other modules that imported them
+        see the new code. Globals named in a module's ``__preserve__`` list
+        keep their value from before the reload. If any module fails to
+        execute, all of them are restored to their previous state, and the
+        package's modules that were first imported during the reload are
+        removed again. Modules that were not loaded before are loaded from
+        their files.
+
+        Args:
+            package_dir: Directory containing the package
+            sources: Dictionary mapping module names to their new content
+            module_names: Module names (without .py) in execution order
+
+        Returns:
+            Dictionary of the re-executed modules
+
+        """
+        package_name = package_dir.name
+        imported_before = set(sys.modules)
+        snapshots: list[tuple[ModuleType, dict[str, object]]] = []
+        modules = {}
+        try:
+            for name in module_names:
+                full_name = f"{package_name}.{name}"
+                module_path = package_dir / f"{name}.py"
+                code = compile_module(sources[name], module_path)
+
+                module = self.loaded_modules.get(full_name)
+                if module is None:
+                    module = self.load_module(full_name, module_path)
+                    module.__dict__.update(self.injected_globals)
+                    modules[name] = module
+                    continue
+
+                snapshot = dict(module.__dict__)
+                snapshots.append((module, snapshot))
+
+                for key in list(module.__dict__):
+                    if not key.startswith("__"):
+                        del module.__dict__[key]
+                module.__dict__.update(self.injected_globals)
+                exec(code, module.__dict__)  # noqa: S102
+
+                for key in module.__dict__.get("__preserve__", ()):
+                    if key in snapshot:
+                        module.__dict__[key] = snapshot[key]
+
+                modules[name] = module
+                logger.debug(f"Re-executed module: {full_name}")
+        except Exception:
+            self._undo_reexecute(package_name, snapshots, imported_before)
+            logger.warning("Hot reload failed; restored previous modules")
+            raise
+
+        logger.info(f"Re-executed {len(modules)} modules")
+        return modules
+
+    def _undo_reexecute(
+        self,
+        package_name: str,
+        snapshots: list[tuple[ModuleType, dict[str, object]]],
+        imported_before: set[str],
+    ) -> None:
+        """Restore modules after a failed reexecute_modules().
+
+        Args:
+            package_name: Name of the sketch package
+            snapshots: Re-executed modules with their globals from before
+            imported_before: Names in sys.modules before the reload
+
+        """
+        for module, snapshot in reversed(snapshots):
+            module.__dict__.clear()
+            module.__dict__.update(snapshot)
+
+        # Sketch modules new in this reload may be half initialized; other
+        # libraries they imported finished importing and stay
+        for full_name in set(sys.modules) - imported_before:
+            if full_name.startswith(f"{package_name}."):
+                del sys.modules[full_name]
+                self.loaded_modules.pop(full_name, None)
+
     def unload_all(self) -> None:
         """Unload all loaded modules."""
         for module_name in list(self.loaded_modules.keys()):
@@ -118,6 +328,7 @@ class ModuleLoader:
                 logger.debug(f"Unloaded module: {module_name}")
 
         self.loaded_modules.clear()
+        self.injected_globals.clear()
 
         # Remove package path from sys.path
         if self.package_path:
@@ -140,3 +351,41 @@ class ModuleLoader:
 
         """
         return getattr(module, function_name, None)
+
+
+def _imported_modules(source: str, package_name: str | None) -> set[str]:
+    """Find the names of sibling modules imported by a module.
+
+    Args:
+        source: Module source code
+        package_name: Name of the sketch package
+
+    Returns:
+        Names of the modules imported from the sketch package
+
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+
+    imported: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                package, _, module = alias.name.partition(".")
+                if package == package_name and module:
+                    imported.add(module.split(".")[0])
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                module = node.module
+            elif node.module and node.module.split(".")[0] == package_name:
+                module = node.module.partition(".")[2]
+            else:
+                continue
+            if module:
+                imported.add(module.split(".")[0])
+            else:
+                # Imports of whole modules, as in "from . import helpers"
+                imported.update(alias.name for alias in node.names)
+    return imported
@@ -1,5 +1,6 @@
 """Package management for sketch modules."""
 
+import hashlib
 from pathlib import Path
 
 from loguru import logger
@@ -7,6 +8,19 @@ from loguru import logger
 from .app_dirs import get_sketches_dir
 
 
+def content_hash(content: str) -> str:
+    """Hash module content to detect changes.
+
+    Args:
+        content: Python code content
+
+    Returns:
+        Hex digest of the content
+
+    """
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
 class PackageManager:
     """Manages the package structure for sketch modules."""
 
@@ -32,6 +46,9 @@ class PackageManager:
     def save_module(self, module_name: str, content: str) -> Path:
         """Save a module to the package.
 
+        The file is left untouched if it already holds the same content,
+        which keeps its modification time and any cached bytecode valid.
+
         Args:
             module_name: Name of the module (without .py extension)
             content: Python code content
@@ -40,31 +57,70 @@ class PackageManager:
             Path to the saved module file
 
         """
-        # Ensure module name is valid
-        if not module_name.endswith(".py"):
-            module_name += ".py"
+        self.write_module(module_name, content)
+        return self.get_module_path(module_name)
 
-        module_path = self.project_dir / module_name
-        module_path.write_text(content)
+    def write_module(self, module_name: str, content: str) -> bool:
+        """Write a module to the package unless it is unchanged on disk.
 
-        logger.debug(f"Saved module: {module_path}")
-        return module_path
+        Args:
+            module_name: Name of the module (without .py extension)
+            content: Python code content
+
+        Returns:
+            True if the file was written, False if it was already current
 
-    def save_all_modules(self, modules: dict[str, str]) -> dict[str, Path]:
+        """
+        module_path = self.get_module_path(module_name)
+        data = content.encode()
+
+        try:
+            # Only files of the same size need to be read and compared
+            unchanged = (
+                module_path.stat().st_size == len(data)
+                and module_path.read_bytes() == data
+            )
+        except OSError:
+            unchanged = False
+
+        if unchanged:
+            logger.debug(f"Module unchanged: {module_path}")
+            return False
+
+        module_path.write_bytes(data)
+        logger.debug(f"Saved module: {module_path}")
+        return True
+
+    def save_all_modules(
+        self,
+        modules: dict[str, str],
+        *,
+        prune: bool = False,
+    ) -> dict[str, Path]:
         """Save multiple modules to the package.
 
         Args:
             modules: Dictionary mapping module names to content
+            prune: Also remove module files that are not in modules
 
         Returns:
             Dictionary mapping module names to file paths
 
         """
         paths = {}
+        written = 0
         for name, content in modules.items():
-            paths[name] = self.save_module(name, content)
+            written += self.write_module(name, content)
+            paths[name] = self.get_module_path(name)
+
+        if prune:
+            keep = {path.name for path in paths.values()} | {"__init__.py"}
+            for file in self.project_dir.glob("*.py"):
+                if file.name not in keep:
+                    file.unlink()
+                    logger.debug(f"Removed module: {file}")
 
-        logger.info(f"Saved {len(modules)} modules")
+        logger.info(f"Saved {len(modules)} modules ({written} changed)")
         return paths
 
     def get_module_path(self, module_name: str) -> Path:
@@ -0,0 +1,280 @@
+"""Poster-resolution export, rendered tile by tile.
+
+A 20000x20000 canvas needs 1.6 GB as a single framebuffer. A poster is
+instead rendered one tile at a time: the sketch's draw() is called once per
+tile with ``display`` set to a tile-sized OffscreenWidget, and finished
+rows of tiles are streamed into a PNG or TIFF writer. Memory stays bounded
+by one band of tiles (tile height x poster width), and tiles can be
+rendered by several worker processes at once.
+
+While a poster renders, the sketch sees:
+
+- ``WIDTH`` and ``HEIGHT``: the size of the whole canvas in canvas units,
+  the poster size divided by ``scale``
+- ``display.get_painter()``: a QPainter translated and scaled so canvas
+  coordinates land in the right place on the tile
+- ``graphics.Context`` on ``display.framebuffer``: a cairo context mapped
+  the same way between ``start_cairo_context()`` and
+  ``end_cairo_context()``
+- ``display.origin`` and ``display.scale``: the tile's top left corner in
+  poster pixels and the poster pixels per canvas unit, to offset NumPy
+  drawing
+- ``renderTiles()``: called with canvas coordinates
+
+draw() must draw the same picture every time it is called, so seed random
+generators inside it rather than once in setup().
+"""
+
+import concurrent.futures
+import contextlib
+import multiprocessing
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from .export import open_image_writer
+from .headless import HeadlessRenderer
+from .tiles import Tile, split_tiles
+
+DEFAULT_POSTER_TILE_SIZE = 1024
+
+# Spawned like the other sketch processes; forking a process that runs Qt
+# threads is not safe
+_mp = multiprocessing.get_context("spawn")
+
+
+def _canvas_units(pixels: int, scale: float) -> float:
+    """Convert poster pixels to canvas units, as an int when exact."""
+    units = pixels / scale
+    return int(units) if units.is_integer() else units
+
+
+class PosterTileRenderer:
+    """Renders tiles of a poster with the sketch loaded in this process."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        modules: dict[str, str],
+        main_module_name: str,
+        w: int,
+        h: int,
+        *,
+        scale: float = 1.0,
+        tile_size: int = DEFAULT_POSTER_TILE_SIZE,
+        background: tuple[int, int, int] = (0, 0, 0),
+    ) -> None:
+        """Load the sketch and run setup().
+
+        Args:
+            modules: Dictionary mapping module names to content
+            main_module_name: Name of the main module (without .py)
+            w: Poster width in pixels
+            h: Poster height in pixels
+            scale: Poster pixels per canvas unit
+            tile_size: Width and height of a full tile
+            background: Color each tile is cleared to before draw()
+
+        """
+        self.scale = scale
+        self.background = background
+        self.renderer = HeadlessRenderer(tile_size, tile_size)
+        canvas = {
+            "WIDTH": _canvas_units(w, scale),
+            "HEIGHT": _canvas_units(h, scale),
+        }
+        self.renderer.load(modules, main_module_name, sketch_globals=canvas)
+        display = self.renderer.display_widget
+        display.scale = scale
+        self.renderer.tiles.scale = scale
+
+    def render(self, tile: Tile) -> np.ndarray:
+        """Render one tile.
+
+        Args:
+            tile: (x, y, w, h) of the tile in poster pixels
+
+        Returns:
+            (h, w, 4) uint8 straight RGBA array
+
+        """
+        x, y, w, h = tile
+        display = self.renderer.display_widget
+        display.origin = (x, y)
+        self.renderer.tiles.origin = (x, y)
+        display.clear(self.background)
+
+        if self.renderer.draw_func:
+            self.renderer.draw_func()
+        self.renderer.frame_count += 1
+        return display.framebuffer.to_rgba()[:h, :w]
+
+    def close(self) -> None:
+        """Unload the sketch."""
+        self.renderer.unload()
+
+
+# The renderer of a worker process, created by _init_worker()
+_worker: PosterTileRenderer | None = None
+
+
+def _init_worker(args: tuple, options: dict[str, object]) -> None:
+    """Load the sketch in a worker process.
+
+    Args:
+        args: Positional arguments of PosterTileRenderer
+        options: Keyword arguments of PosterTileRenderer
+
+    """
+    global _worker  # noqa: PLW0603
+    _worker = PosterTileRenderer(*args, **options)
+
+
+def _render_in_worker(tile: Tile) -> np.ndarray:
+    """Render a tile with the worker's renderer.
+
+    Args:
+        tile: (x, y, w, h) of the tile
+
+    Returns:
+        (h, w, 4) uint8 straight RGBA array
+
+    """
+    assert _worker is not None  # noqa: S101
+    return _worker.render(tile)
+
+
+def _assemble(
+    band_buf: np.ndarray,
+    band: list[Tile],
+    results: Iterable[np.ndarray],
+) -> np.ndarray:
+    """Copy the rendered tiles of one band into the band buffer.
+
+    Args:
+        band_buf: (tile_size, w, 4) buffer reused for every band
+        band: Tiles of the band, left to right
+        results: RGBA arrays of the tiles, in the same order
+
+    Returns:
+        View of the band's rows in band_buf
+
+    """
+    for (x, _, w, h), rgba in zip(band, results, strict=True):
+        band_buf[:h, x : x + w] = rgba
+    return band_buf[: band[0][3]]
+
+
+def render_poster(  # noqa: PLR0913
+    modules: dict[str, str],
+    main_module_name: str,
+    path: Path,
+    w: int,
+    h: int,
+    *,
+    scale: float = 1.0,
+    tile_size: int = DEFAULT_POSTER_TILE_SIZE,
+    workers: int = 1,
+    background: tuple[int, int, int] = (0, 0, 0),
+    compress_level: int = 6,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """Render a sketch as a poster, streaming it into an image file.
+
+    Args:
+        modules: Dictionary mapping module names to content
+        main_module_name: Name of the main module (without .py)
+        path: Output path; the suffix selects PNG or TIFF
+        w: Poster width in pixels
+        h: Poster height in pixels
+        scale: Poster pixels per canvas unit
+        tile_size: Width and height of a full tile
+        workers: Number of worker processes; 1 renders in this process
+        background: Color each tile is cleared to before draw()
+        compress_level: zlib compression level (0-9)
+        on_progress: Called with (tiles done, total tiles) after each band
+
+    Returns:
+        Number of tiles rendered
+
+    """
+    tiles = split_tiles(w, h, tile_size)
+    bands: dict[int, list[Tile]] = {}
+    for tile in tiles:
+        bands.setdefault(tile[1], []).append(tile)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    args = (modules, main_module_name, w, h)
+    options = {"scale": scale, "tile_size": tile_size, "background": background}
+    logger.info(
+        f"Rendering {w}x{h} poster in {len(tiles)} tiles of {tile_size} "
+        f"with {workers} worker(s)",
+    )
+
+    band_buf = np.empty((tile_size, w, 4), dtype=np.uint8)
+    done = 0
+    rendered = _render_bands(list(bands.values()), args, options, workers)
+    with (
+        contextlib.closing(rendered),
+        open_image_writer(path, w, h, compress_level=compress_level) as writer,
+    ):
+        for band, results in rendered:
+            writer.write_rows(_assemble(band_buf, band, results))
+            done += len(band)
+            if on_progress:
+                on_progress(done, len(tiles))
+
+    return done
+
+
+def _render_bands(
+    bands: list[list[Tile]],
+    args: tuple,
+    options: dict[str, object],
+    workers: int,
+) -> Iterator[tuple[list[Tile], Iterator[np.ndarray]]]:
+    """Render bands of tiles in order, in this process or on workers.
+
+    Args:
+        bands: Rows of tiles, top to bottom
+        args: Positional arguments of PosterTileRenderer
+        options: Keyword arguments of PosterTileRenderer
+        workers: Number of worker processes; 1 renders in this process
+
+    Yields:
+        Each band with an iterator over the RGBA arrays of its tiles
+
+    """
+    if workers <= 1:
+        renderer = PosterTileRenderer(*args, **options)
+        try:
+            for band in bands:
+                yield band, map(renderer.render, band)
+        finally:
+            renderer.close()
+        return
+
+    pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_mp,
+        initializer=_init_worker,
+        initargs=(args, options),
+    )
+    try:
+        # The next band is queued while this one is written, so workers
+        # don't wait on the writer; at most two bands are in flight
+        queued = [
+            [pool.submit(_render_in_worker, tile) for tile in band]
+            for band in bands[:2]
+        ]
+        for index, band in enumerate(bands):
+            futures = queued.pop(0)
+            if index + 2 < len(bands):
+                queued.append(
+                    [pool.submit(_render_in_worker, tile) for tile in bands[index + 2]],
+                )
+            yield band, (future.result() for future in futures)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,299 @@
+"""Run sketches in a separate process with a shared-memory framebuffer.
+
+The sketch process loads the modules with its own ModuleLoader and draws
+into the first of two frames in a ``multiprocessing.shared_memory`` block,
+laid out like a peyote.util.framebuffer.Framebuffer. After each draw() it
+copies the rectangles draw() damaged into the second frame under a shared
+lock. The IDE wraps that second frame with a QImage without copying it.
+Console output, frame-ready notifications (with the draw() time and the
+damaged rectangles, which the IDE repaints) and errors are sent back over
+a pipe, so a CPU-bound or crashing sketch cannot take the editor down with
+it.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import sys
+import time
+import traceback
+from collections.abc import Callable
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from multiprocessing.synchronize import Lock
+
+import numpy as np
+from loguru import logger
+
+from peyote.util.framebuffer import Framebuffer
+
+from .headless import HeadlessRenderer
+
+# Processes are spawned rather than forked; forking a process that runs Qt
+# threads is not safe
+_mp = multiprocessing.get_context("spawn")
+
+
+def _frames(shm: shared_memory.SharedMemory, w: int, h: int) -> np.ndarray:
+    """View the shared memory block as (draw, front) framebuffer arrays.
+
+    Args:
+        shm: Shared memory block of 2 * h * w * 4 bytes
+        w: Width of the framebuffer
+        h: Height of the framebuffer
+
+    Returns:
+        Array of shape (2, h, w, 4) backed by the shared memory
+
+    """
+    return np.ndarray((2, h, w, 4), dtype=np.uint8, buffer=shm.buf)
+
+
+def _publish_damage(
+    framebuffer: Framebuffer,
+    frames: np.ndarray,
+    lock: Lock,
+) -> list[tuple[int, int, int, int]]:
+    """Copy the rectangles drawn since the last frame into the front frame.
+
+    Args:
+        framebuffer: Framebuffer wrapping the draw frame
+        frames: (draw, front) frames in shared memory
+        lock: Lock guarding the front frame
+
+    Returns:
+        The copied (x, y, w, h) rectangles, for the IDE to repaint
+
+    """
+    _, damage = framebuffer.take_damage()
+    if damage:
+        with lock:
+            for x, y, w, h in damage:
+                frames[1][y : y + h, x : x + w] = frames[0][y : y + h, x : x + w]
+    return damage
+
+
+def _run_frames(
+    renderer: HeadlessRenderer,
+    conn: Connection,
+    frames: np.ndarray,
+    lock: Lock,
+    send_output: Callable[[], None],
+) -> None:
+    """Call draw() whenever a frame is due, until the IDE asks to stop.
+
+    Args:
+        renderer: Renderer with the sketch loaded into the draw frame
+        conn: Pipe to the IDE process
+        frames: (draw, front) frames in shared memory
+        lock: Lock guarding the front frame
+        send_output: Sends the sketch's captured output to the IDE
+
+    """
+    scheduler = renderer.scheduler
+    while True:
+        delay = scheduler.time_until_next_frame()
+        if delay is None or delay > 0:
+            # Wait for the frame to be due; a None delay (after noLoop())
+            # waits for the IDE to stop the sketch
+            if conn.poll(delay) and conn.recv() == "stop":
+                return
+            continue
+
+        scheduler.begin_frame()
+        start = time.perf_counter()
+        if renderer.draw_func:
+            renderer.draw_func()
+        draw_time = time.perf_counter() - start
+        scheduler.end_frame()
+        renderer.frame_count += 1
+
+        damage = _publish_damage(renderer.display_widget.framebuffer, frames, lock)
+        send_output()
+        conn.send(("frame", (renderer.frame_count, draw_time, damage)))
+
+        if conn.poll() and conn.recv() == "stop":
+            return
+
+
+def run_sketch_process(  # noqa: PLR0913, PLR0917
+    conn: Connection,
+    shm_name: str,
+    lock: Lock,
+    w: int,
+    h: int,
+    modules: dict[str, str],
+    main_module_name: str,
+) -> None:
+    """Entry point of the sketch process.
+
+    Args:
+        conn: Pipe to the IDE process
+        shm_name: Name of the shared memory block
+        lock: Lock guarding the front frame
+        w: Width of the framebuffer
+        h: Height of the framebuffer
+        modules: Dictionary mapping module names to content
+        main_module_name: Name of the main module (without .py)
+
+    """
+    # Spawned children share the IDE's resource tracker, which already knows
+    # the block; the IDE unlinks it in SketchProcess.stop()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = _frames(shm, w, h)
+
+    # Capture output for the whole run and ship it once per frame
+    output = io.StringIO()
+    sys.stdout = sys.stderr = output
+
+    def send_output() -> None:
+        text = output.getvalue()
+        if text:
+            conn.send(("output", text))
+            output.seek(0)
+            output.truncate()
+
+    renderer = HeadlessRenderer(w, h, buf=frames[0])
+    try:
+        renderer.load(modules, main_module_name)
+        send_output()
+
+        _run_frames(renderer, conn, frames, lock, send_output)
+    except (BrokenPipeError, EOFError):
+        pass  # The IDE went away
+    except Exception:
+        # Reported once, as the error message; printing it as well would
+        # show it twice in the IDE console
+        try:
+            send_output()
+            conn.send(("error", traceback.format_exc()))
+        except OSError:
+            pass
+    finally:
+        renderer.unload()
+        del frames
+        shm.close()
+
+
+class SketchProcess:
+    """Parent-side handle on a sketch running in a separate process."""
+
+    def __init__(self, w: int, h: int) -> None:
+        """Allocate the shared framebuffer.
+
+        Args:
+            w: Width of the framebuffer
+            h: Height of the framebuffer
+
+        """
+        self.w = w
+        self.h = h
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * h * w * 4)
+        # None once stop() has released the shared memory
+        self.frames: np.ndarray | None = _frames(self.shm, w, h)
+        for frame in self.frames:
+            Framebuffer(w, h, frame).fill((0, 0, 0))
+        self.lock = _mp.Lock()
+
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.conn: Connection | None = None
+
+    @property
+    def front_buf(self) -> np.ndarray:
+        """The finished frame, to be displayed by the IDE.
+
+        Raises:
+            RuntimeError: If the shared memory was released by stop()
+
+        """
+        if self.frames is None:
+            msg = "Sketch process was stopped; its framebuffer is released"
+            raise RuntimeError(msg)
+        return self.frames[1]
+
+    def start(
+        self,
+        modules: dict[str, str],
+        main_module_name: str,
+    ) -> None:
+        """Start the sketch process.
+
+        Args:
+            modules: Dictionary mapping module names to content
+            main_module_name: Name of the main module (without .py)
+
+        """
+        self.conn, child_conn = _mp.Pipe()
+        self.process = _mp.Process(
+            target=run_sketch_process,
+            args=(
+                child_conn,
+                self.shm.name,
+                self.lock,
+                self.w,
+                self.h,
+                modules,
+                main_module_name,
+            ),
+            name="peyote-sketch",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        logger.info(f"Started sketch process: pid {self.process.pid}")
+
+    def poll(self) -> list[tuple[str, object]]:
+        """Collect the messages sent by the sketch process so far.
+
+        A final ``("exit", exitcode)`` message is added once the process
+        has ended, however it ended.
+
+        Returns:
+            List of (kind, payload) messages
+
+        """
+        messages: list[tuple[str, object]] = []
+        if self.conn is None or self.process is None:
+            return messages
+
+        try:
+            while self.conn.poll():
+                messages.append(self.conn.recv())
+        except (EOFError, OSError):
+            pass
+
+        if not self.process.is_alive():
+            messages.append(("exit", self.process.exitcode))
+        return messages
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop the sketch process and release the shared memory.
+
+        Safe to call more than once; later calls do nothing.
+
+        Args:
+            timeout: Seconds to wait for a clean exit before terminating
+
+        """
+        if self.process is not None:
+            if self.process.is_alive():
+                with contextlib.suppress(OSError):
+                    self.conn.send("stop")
+                self.process.join(timeout)
+            if self.process.is_alive():
+                logger.warning("Sketch process did not stop; terminating")
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+        if self.frames is None:
+            return
+        # Views of the block must go before it can be closed
+        self.frames = None
+        self.shm.close()
+        self.shm.unlink()
+        logger.info("Sketch process stopped")
@@ -0,0 +1,356 @@
+"""Per-frame profiling for running sketches.
+
+A FrameProfiler keeps the timings of the most recent frames in a fixed-size
+ring buffer. Each record holds draw() wall time, paint time, the interval
+since the previous frame and the time spent in garbage collection. It
+costs a few clock reads per frame, so it is always on. The display widget
+can show a summary of it as an FPS/ms overlay.
+
+Two heavier tools can be enabled on demand:
+
+- ``profile_next(frames)`` runs cProfile around the next draw() calls and
+  hands a pstats report to ``on_report`` when they are done.
+- ``start_sampling()`` starts a thread that samples the stack of the
+  thread running draw(). Samples are tagged with their frame, so
+  ``sample_report(frames)`` can summarize the last N frames after the fact.
+"""
+
+import cProfile
+import gc
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+
+import numpy as np
+from loguru import logger
+
+_RECORD_DTYPE = np.dtype(
+    [
+        ("start", "f8"),
+        ("draw", "f8"),
+        ("paint", "f8"),
+        ("interval", "f8"),
+        ("gc", "f8"),
+    ],
+)
+
+
+class FrameProfiler:
+    """Ring buffer of per-frame timings with optional deep profiling."""
+
+    def __init__(
+        self,
+        capacity: int = 300,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            capacity: Number of recent frames to keep
+            clock: Monotonic clock returning seconds
+
+        """
+        self.capacity = capacity
+        self.clock = clock
+        self.on_report: Callable[[str], None] | None = None
+
+        self._lock = threading.Lock()
+        self._records = np.zeros(capacity, dtype=_RECORD_DTYPE)
+
+        self._gc_started: float | None = None
+        self._gc_installed = False
+
+        self._profile: cProfile.Profile | None = None
+        self._profile_frames = 0
+
+        self._samples: deque[tuple[int, tuple[str, ...]]] = deque(maxlen=100_000)
+        self._sampler: threading.Thread | None = None
+        self._sampling = threading.Event()
+        self._draw_thread: int | None = None
+        self._switch_interval: float | None = None
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all recorded frames."""
+        with self._lock:
+            self._records[:] = 0
+            self.frame_count = 0
+            self._frame_start: float | None = None
+            self._last_start: float | None = None
+            self._gc_time = 0.0
+        self._samples.clear()
+
+    # Recording
+
+    def begin_frame(self) -> None:
+        """Mark the start of draw(); call on the thread that runs it."""
+        now = self.clock()
+        self._frame_start = now
+        self._draw_thread = threading.get_ident()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def end_frame(self) -> None:
+        """Mark the end of draw() and record the frame."""
+        if self._profile is not None:
+            self._profile.disable()
+        self._draw_thread = None
+
+        if self._frame_start is None:
+            return
+        start = self._frame_start
+        self._frame_start = None
+        self.add_frame(self.clock() - start, start)
+
+        if self._profile is not None:
+            self._profile_frames -= 1
+            if self._profile_frames <= 0:
+                self._finish_profile()
+
+    def add_frame(self, draw_time: float, start: float | None = None) -> None:
+        """Record a frame whose draw() was timed elsewhere.
+
+        Args:
+            draw_time: Wall time of draw() in seconds
+            start: Clock time the frame started, defaults to now
+
+        """
+        if start is None:
+            start = self.clock()
+        with self._lock:
+            record = self._records[self.frame_count % self.capacity]
+            record["start"] = start
+            record["draw"] = draw_time
+            record["paint"] = 0.0
+            record["interval"] = (
+                start - self._last_start if self._last_start is not None else 0.0
+            )
+            record["gc"] = self._gc_time
+            self._gc_time = 0.0
+            self._last_start = start
+            self.frame_count += 1
+
+    def record_paint(self, paint_time: float) -> None:
+        """Add paint time to the most recent frame.
+
+        Args:
+            paint_time: Time spent painting the frame in seconds
+
+        """
+        with self._lock:
+            if self.frame_count:
+                index = (self.frame_count - 1) % self.capacity
+                self._records["paint"][index] += paint_time
+
+    def recent(self, frames: int | None = None) -> np.ndarray:
+        """Get a copy of the most recent records, oldest first.
+
+        Args:
+            frames: Number of frames, defaults to all that are kept
+
+        Returns:
+            Structured array with start, draw, paint, interval and gc fields
+
+        """
+        with self._lock:
+            count = min(self.frame_count, self.capacity)
+            if frames is not None:
+                count = min(count, frames)
+            end = self.frame_count % self.capacity
+            index = np.arange(end - count, end) % self.capacity
+            return self._records[index]
+
+    def summary(self, frames: int | None = None) -> dict[str, float]:
+        """Summarize the most recent frames.
+
+        Args:
+            frames: Number of frames, defaults to all that are kept
+
+        Returns:
+            Dictionary with fps, mean and worst draw/paint times in
+            milliseconds, interval jitter in milliseconds and total GC time
+            in milliseconds
+
+        """
+        records = self.recent(frames)
+        if not len(records):
+            return dict.fromkeys(
+                ("fps", "draw_ms", "draw_max_ms", "paint_ms", "jitter_ms", "gc_ms"),
+                0.0,
+            )
+
+        # The first frame of a run has no interval
+        intervals = records["interval"][records["interval"] > 0]
+        return {
+            "fps": float(len(intervals) / intervals.sum()) if len(intervals) else 0.0,
+            "draw_ms": float(records["draw"].mean() * 1000),
+            "draw_max_ms": float(records["draw"].max() * 1000),
+            "paint_ms": float(records["paint"].mean() * 1000),
+            "jitter_ms": float(intervals.std() * 1000) if len(intervals) else 0.0,
+            "gc_ms": float(records["gc"].sum() * 1000),
+        }
+
+    def hud_text(self, frames: int = 60) -> str:
+        """Format a one-line summary for the FPS overlay.
+
+        Args:
+            frames: Number of recent frames to summarize
+
+        Returns:
+            Text such as "60.0 fps | draw 2.1 ms | paint 0.3 ms"
+
+        """
+        stats = self.summary(frames)
+        text = (
+            f"{stats['fps']:.1f} fps | draw {stats['draw_ms']:.1f} ms"
+            f" | paint {stats['paint_ms']:.1f} ms"
+            f" | jitter {stats['jitter_ms']:.1f} ms"
+        )
+        if stats["gc_ms"]:
+            text += f" | gc {stats['gc_ms']:.1f} ms"
+        return text
+
+    # Garbage collection
+
+    def install_gc_hook(self) -> None:
+        """Start attributing garbage collection pauses to frames."""
+        if not self._gc_installed:
+            gc.callbacks.append(self._on_gc)
+            self._gc_installed = True
+
+    def uninstall_gc_hook(self) -> None:
+        """Stop tracking garbage collection pauses."""
+        if self._gc_installed:
+            gc.callbacks.remove(self._on_gc)
+            self._gc_installed = False
+            self._gc_started = None
+
+    def _on_gc(self, phase: str, info: dict) -> None:  # noqa: ARG002
+        """Time a garbage collection; registered in gc.callbacks."""
+        if phase == "start":
+            self._gc_started = self.clock()
+        elif self._gc_started is not None:
+            with self._lock:
+                self._gc_time += self.clock() - self._gc_started
+            self._gc_started = None
+
+    # cProfile
+
+    def profile_next(self, frames: int = 60) -> None:
+        """Run cProfile around the next draw() calls.
+
+        When they are done the report is passed to ``on_report``.
+
+        Args:
+            frames: Number of frames to profile
+
+        """
+        self._profile = cProfile.Profile()
+        self._profile_frames = frames
+        logger.info(f"Profiling the next {frames} frames")
+
+    def _finish_profile(self) -> None:
+        """Format the cProfile report and hand it to on_report."""
+        profile = self._profile
+        self._profile = None
+        if profile is None:
+            return
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(25)
+        report = f"cProfile report:\n{stream.getvalue()}"
+        if self.on_report:
+            self.on_report(report)
+
+    # Stack sampling
+
+    def start_sampling(self, interval: float = 0.001) -> None:
+        """Start sampling the stack of the thread running draw().
+
+        Args:
+            interval: Seconds between samples
+
+        """
+        if self._sampler is not None:
+            return
+
+        # The sampler can only look at the draw thread when it gets the GIL,
+        # which by default may take 5 ms, longer than many whole draw() calls
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, interval / 2))
+
+        self._sampling.set()
+        self._sampler = threading.Thread(
+            target=self._run_sampler,
+            args=(interval,),
+            name="frame-sampler",
+            daemon=True,
+        )
+        self._sampler.start()
+        logger.info("Stack sampling started")
+
+    def stop_sampling(self) -> None:
+        """Stop the sampler thread."""
+        if self._sampler is None:
+            return
+        self._sampling.clear()
+        self._sampler.join()
+        self._sampler = None
+        if self._switch_interval is not None:
+            sys.setswitchinterval(self._switch_interval)
+            self._switch_interval = None
+        logger.info("Stack sampling stopped")
+
+    def _run_sampler(self, interval: float) -> None:
+        """Sample the draw thread's stack until stopped."""
+        while self._sampling.is_set():
+            thread_id = self._draw_thread
+            if thread_id is not None:
+                frame = sys._current_frames().get(thread_id)  # noqa: SLF001
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})",
+                    )
+                    frame = frame.f_back
+                if stack:
+                    self._samples.append((self.frame_count, tuple(stack)))
+            time.sleep(interval)
+
+    def sample_report(self, frames: int = 60, limit: int = 20) -> str:
+        """Summarize the stack samples of the last N frames.
+
+        Args:
+            frames: Number of recent frames to include
+            limit: Number of functions to list
+
+        Returns:
+            Report listing the functions seen most often, by samples in the
+            function itself and by samples anywhere below it
+
+        """
+        first = self.frame_count - frames
+        samples = [stack for index, stack in list(self._samples) if index >= first]
+        if not samples:
+            return "Stack samples: none recorded (is sampling on?)\n"
+
+        own = Counter(stack[0] for stack in samples)
+        total = Counter(name for stack in samples for name in set(stack))
+
+        lines = [
+            f"Stack samples over the last {frames} frames ({len(samples)} samples):",
+        ]
+        for title, counts in (("Self", own), ("Total", total)):
+            lines.append(f"  {title}:")
+            lines.extend(
+                f"    {count / len(samples):6.1%}  {name}"
+                for name, count in counts.most_common(limit)
+            )
+        return "\n".join(lines) + "\n"
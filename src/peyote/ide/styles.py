@@ -105,7 +105,7 @@ QPlainTextEdit {
 }
 
 /* Console - dark background */
-QTextEdit#console {
+QPlainTextEdit#console {
     background-color: #2d3436;
     color: #dfe6e9;
     font-family: 'Menlo', 'Monaco', 'Courier New', monospace;
@@ -1,11 +1,73 @@
 """Python syntax highlighter for the code editor."""
 
-from PySide6.QtCore import QRegularExpression
+import re
+
 from PySide6.QtGui import QColor, QFont, QSyntaxHighlighter, QTextCharFormat
 
+KEYWORDS = frozenset(
+    [
+        "and", "as", "assert", "async", "await", "break", "class", "continue",
+        "def", "del", "elif", "else", "except", "False", "finally", "for",
+        "from", "global", "if", "import", "in", "is", "lambda", "None",
+        "nonlocal", "not", "or", "pass", "raise", "return", "True", "try",
+        "while", "with", "yield",
+    ],
+)
+
+BUILTINS = frozenset(
+    [
+        "abs", "all", "any", "bin", "bool", "bytes", "chr", "dict", "dir",
+        "divmod", "enumerate", "filter", "float", "format", "hex", "input",
+        "int", "isinstance", "len", "list", "map", "max", "min", "oct",
+        "open", "ord", "pow", "print", "range", "repr", "round", "set",
+        "slice", "sorted", "str", "sum", "tuple", "type", "zip",
+    ],
+)
+
+_STRING_PREFIX = r"(?:[rRbBuUfF]{1,2})?"
+
+# One pattern for every token, tried left to right in a single pass. Words
+# are matched whole and then looked up in KEYWORDS/BUILTINS, so there is no
+# need for a separate scan per keyword.
+_TOKEN_RE = re.compile(
+    rf"""
+    (?P<comment>\#.*)
+    | (?P<triple>{_STRING_PREFIX}(?:\"\"\"|'''))
+    | (?P<string>{_STRING_PREFIX}
+        (?:"[^"\\\n]*(?:\\.[^"\\\n]*)*"?|'[^'\\\n]*(?:\\.[^'\\\n]*)*'?))
+    | (?P<definition>\b(?:def|class))\s+(?P<name>\w+)
+    | (?P<word>\b[^\W\d]\w*)
+    | (?P<number>\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*(?:\.[\d_]*)?
+        (?:[eE][+-]?\d+)?[jJ]?))
+    """,
+    re.VERBOSE,
+)
+
+# The rest of a triple-quoted string, up to and including the closing quotes
+_TRIPLE_END_RE = {
+    quotes: re.compile(rf"(?:\\.|[^\\])*?{quotes}", re.DOTALL)
+    for quotes in ('"""', "'''")
+}
+
+# Block states: whether a block ends inside a triple-quoted string
+NORMAL = 0
+IN_TRIPLE_DOUBLE = 1
+IN_TRIPLE_SINGLE = 2
+
+_STATE_QUOTES = {IN_TRIPLE_DOUBLE: '"""', IN_TRIPLE_SINGLE: "'''"}
+_QUOTES_STATE = {quotes: state for state, quotes in _STATE_QUOTES.items()}
+
 
 class PythonSyntaxHighlighter(QSyntaxHighlighter):
-    """Syntax highlighter for Python code."""
+    """Syntax highlighter for Python code.
+
+    Each block (line) is tokenized in a single pass. A block that ends inside
+    a triple-quoted string records it in its block state, and the next block
+    starts from that state. QSyntaxHighlighter re-highlights an edited block
+    and only moves on to the following blocks while their starting state
+    changes, so typing costs one line and opening or closing a docstring
+    costs the lines it affects.
+    """
 
     def __init__(self, parent=None) -> None:  # noqa: ANN001
         """Initialize the syntax highlighter.
@@ -37,60 +99,14 @@ class PythonSyntaxHighlighter(QSyntaxHighlighter):
         function_format = QTextCharFormat()
         function_format.setForeground(QColor("#00627A"))  # Teal for functions
 
-        # Define highlighting rules
-        self.highlighting_rules = []
-
-        # Keywords
-        keywords = [
-            "and", "as", "assert", "async", "await", "break", "class", "continue",
-            "def", "del", "elif", "else", "except", "False", "finally", "for",
-            "from", "global", "if", "import", "in", "is", "lambda", "None",
-            "nonlocal", "not", "or", "pass", "raise", "return", "True", "try",
-            "while", "with", "yield",
-        ]
-        for keyword in keywords:
-            pattern = QRegularExpression(rf"\b{keyword}\b")
-            self.highlighting_rules.append((pattern, keyword_format))
-
-        # Built-in functions
-        builtins = [
-            "abs", "all", "any", "bin", "bool", "bytes", "chr", "dict", "dir",
-            "divmod", "enumerate", "filter", "float", "format", "hex", "input",
-            "int", "isinstance", "len", "list", "map", "max", "min", "oct",
-            "open", "ord", "pow", "print", "range", "repr", "round", "set",
-            "slice", "sorted", "str", "sum", "tuple", "type", "zip",
-        ]
-        for builtin in builtins:
-            pattern = QRegularExpression(rf"\b{builtin}\b")
-            self.highlighting_rules.append((pattern, builtin_format))
-
-        # Function definitions
-        self.highlighting_rules.append(
-            (QRegularExpression(r"\bdef\s+(\w+)"), function_format),
-        )
-        self.highlighting_rules.append(
-            (QRegularExpression(r"\bclass\s+(\w+)"), function_format),
-        )
-
-        # Numbers
-        self.highlighting_rules.append(
-            (QRegularExpression(r"\b[0-9]+\.?[0-9]*\b"), number_format),
-        )
-
-        # Strings (double quotes)
-        self.highlighting_rules.append(
-            (QRegularExpression(r'"[^"\\]*(\\.[^"\\]*)*"'), string_format),
-        )
-
-        # Strings (single quotes)
-        self.highlighting_rules.append(
-            (QRegularExpression(r"'[^'\\]*(\\.[^'\\]*)*'"), string_format),
-        )
-
-        # Comments
-        self.highlighting_rules.append(
-            (QRegularExpression(r"#[^\n]*"), comment_format),
-        )
+        self.formats = {
+            "keyword": keyword_format,
+            "builtin": builtin_format,
+            "string": string_format,
+            "comment": comment_format,
+            "number": number_format,
+            "function": function_format,
+        }
 
     def highlightBlock(self, text: str) -> None:  # noqa: N802
         """Highlight a block of text.
@@ -99,8 +115,64 @@ class PythonSyntaxHighlighter(QSyntaxHighlighter):
             text: Text to highlight
 
         """
-        for pattern, fmt in self.highlighting_rules:
-            iterator = pattern.globalMatch(text)
-            while iterator.hasNext():
-                match = iterator.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+        formats = self.formats
+        pos = 0
+
+        # Finish a triple-quoted string left open by the previous block
+        quotes = _STATE_QUOTES.get(self.previousBlockState())
+        if quotes:
+            pos = self._highlight_triple_string(text, 0, 0, quotes)
+            if pos < 0:
+                return
+
+        self.setCurrentBlockState(NORMAL)
+        while match := _TOKEN_RE.search(text, pos):
+            kind = match.lastgroup
+            start, pos = match.span()
+
+            if kind == "word":
+                word = match.group("word")
+                if word in KEYWORDS:
+                    self.setFormat(start, pos - start, formats["keyword"])
+                elif word in BUILTINS:
+                    self.setFormat(start, pos - start, formats["builtin"])
+            elif kind == "name":
+                keyword_end, name_start = match.end("definition"), match.start("name")
+                self.setFormat(start, keyword_end - start, formats["keyword"])
+                self.setFormat(name_start, pos - name_start, formats["function"])
+            elif kind == "triple":
+                quotes = match.group("triple")[-3:]
+                pos = self._highlight_triple_string(text, start, pos, quotes)
+                if pos < 0:
+                    return
+            else:
+                self.setFormat(start, pos - start, formats[kind])
+
+    def _highlight_triple_string(
+        self,
+        text: str,
+        start: int,
+        pos: int,
+        quotes: str,
+    ) -> int:
+        """Highlight a triple-quoted string that continues from pos.
+
+        Args:
+            text: Text of the block
+            start: Index where the string (or the block) starts
+            pos: Index after the opening quotes
+            quotes: The quotes that close the string
+
+        Returns:
+            Index after the closing quotes, or -1 if the string continues
+            into the next block
+
+        """
+        end = _TRIPLE_END_RE[quotes].match(text, pos)
+        if end is None:
+            self.setFormat(start, len(text) - start, self.formats["string"])
+            self.setCurrentBlockState(_QUOTES_STATE[quotes])
+            return -1
+
+        self.setFormat(start, end.end() - start, self.formats["string"])
+        return end.end()
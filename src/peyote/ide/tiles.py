@@ -0,0 +1,364 @@
+"""Tile-parallel rendering for per-pixel sketches.
+
+Fractals and fields are computed independently for every pixel, so the
+canvas can be split into tiles that are evaluated at the same time. A sketch
+supplies a function of a pixel block: it is called with two (th, tw) float
+arrays holding the x and y coordinates of the tile's pixels, and returns
+the tile's colors as a (th, tw, 3) or (th, tw, 4) array of 0-255 values::
+
+    def julia(xs, ys):
+        z = (xs - WIDTH / 2) / 200 + 1j * (ys - HEIGHT / 2) / 200
+        ...
+        return rgb
+
+    def draw():
+        renderTiles(julia)
+
+Tiles are rendered on a thread pool by default. NumPy releases the GIL for
+most array operations, so vectorized tile functions use every core. With
+``processes=True`` tiles are rendered in a process pool instead, which also
+parallelizes pure Python code. The function must then be defined at the top
+level of a sketch module, since worker processes import it by name. Workers
+get copies of the injected globals that are plain values, such as ``WIDTH``
+and ``HEIGHT``; objects like ``display`` and the drawing functions only
+exist in the sketch's own process.
+
+Finished tiles are written straight into the framebuffer, and a progress
+callback lets the display show them while the rest are still rendering.
+"""
+
+import builtins
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable
+
+import numpy as np
+from loguru import logger
+
+from peyote.util.framebuffer import Framebuffer, premultiply
+
+# A function of a pixel block: (xs, ys) coordinate arrays in, colors out
+TileFunction = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+# (x, y, w, h) of a tile in pixels
+Tile = tuple[int, int, int, int]
+
+DEFAULT_TILE_SIZE = 64
+
+# Spawned like the sketch process; forking a process that runs Qt threads
+# is not safe
+_mp = multiprocessing.get_context("spawn")
+
+# Types of sketch globals that are copied into worker processes
+_PLAIN_TYPES = (bool, int, float, complex, str, bytes, type(None))
+
+
+def _init_worker(namespace: dict[str, object]) -> None:
+    """Make sketch globals visible to modules imported in a worker process.
+
+    Workers import the tile function's module themselves, so the globals
+    are made builtins, which the module sees while it is being imported too.
+
+    Args:
+        namespace: Mapping of global names to plain values
+
+    """
+    builtins.__dict__.update(namespace)
+
+
+def split_tiles(w: int, h: int, tile_size: int = DEFAULT_TILE_SIZE) -> list[Tile]:
+    """Split a canvas into tiles, row by row.
+
+    Tiles on the right and bottom edges are smaller when the canvas size is
+    not a multiple of the tile size.
+
+    Args:
+        w: Width of the canvas
+        h: Height of the canvas
+        tile_size: Width and height of a full tile
+
+    Returns:
+        List of (x, y, w, h) tiles covering the canvas
+
+    Raises:
+        ValueError: If tile_size is not positive
+
+    """
+    if tile_size <= 0:
+        msg = f"Tile size must be positive, got {tile_size!r}"
+        raise ValueError(msg)
+    return [
+        (x, y, min(tile_size, w - x), min(tile_size, h - y))
+        for y in range(0, h, tile_size)
+        for x in range(0, w, tile_size)
+    ]
+
+
+def render_tile(
+    func: TileFunction,
+    tile: Tile,
+    origin: tuple[int, int] = (0, 0),
+    scale: float = 1.0,
+) -> np.ndarray:
+    """Evaluate a tile function over one tile.
+
+    Args:
+        func: Function of the tile's pixel coordinates
+        tile: (x, y, w, h) of the tile
+        origin: Canvas position of the framebuffer's top left pixel, when
+            the framebuffer is one tile of a larger canvas
+        scale: Framebuffer pixels per canvas unit
+
+    Returns:
+        (h, w, 3) or (h, w, 4) uint8 array of colors
+
+    Raises:
+        ValueError: If func returns an array of the wrong shape
+
+    """
+    x, y, w, h = tile
+    ox, oy = origin
+    xs, ys = np.meshgrid(
+        np.arange(ox + x, ox + x + w, dtype=np.float64) / scale,
+        np.arange(oy + y, oy + y + h, dtype=np.float64) / scale,
+    )
+    colors = np.asarray(func(xs, ys))
+    if colors.shape not in ((h, w, 3), (h, w, 4)):
+        msg = (
+            f"Tile function returned shape {colors.shape}, "
+            f"expected ({h}, {w}, 3) or ({h}, {w}, 4)"
+        )
+        raise ValueError(msg)
+    if colors.dtype != np.uint8:
+        colors = np.clip(colors, 0, 255).astype(np.uint8)
+    return colors
+
+
+class TileRenderer:
+    """Renders tile functions into a framebuffer on a worker pool.
+
+    The pool is created on first use and kept for later frames; call
+    ``shutdown()`` when the sketch stops, or when its modules change so
+    worker processes pick up the new code.
+    """
+
+    def __init__(
+        self,
+        framebuffer: Framebuffer,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        workers: int | None = None,
+        progress_interval: float = 0.05,
+    ) -> None:
+        """Initialize the tile renderer.
+
+        Args:
+            framebuffer: Framebuffer to render into
+            tile_size: Default width and height of a tile
+            workers: Default number of workers, defaults to the CPU count
+            progress_interval: Minimum seconds between progress callbacks
+
+        """
+        self.framebuffer = framebuffer
+        # Globals injected into sketch modules; plain values are copied into
+        # worker processes, see _init_worker()
+        self.sketch_globals: dict[str, object] = {}
+        # Placement of the framebuffer on a larger canvas, see render_tile()
+        self.origin = (0, 0)
+        self.scale = 1.0
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.progress_interval = progress_interval
+
+        self._lock = threading.Lock()
+        self._pool: concurrent.futures.Executor | None = None
+        self._pool_key: tuple[bool, int, dict[str, object]] | None = None
+
+    def render(
+        self,
+        func: TileFunction,
+        *,
+        tile_size: int | None = None,
+        processes: bool = False,
+        workers: int | None = None,
+        on_progress: Callable[[], None] | None = None,
+    ) -> int:
+        """Render a tile function over the whole framebuffer.
+
+        Returns once every tile is written. If a tile fails, the tiles that
+        have not started are cancelled and the error is raised.
+
+        Args:
+            func: Function of a tile's pixel coordinates, see the module
+                docstring
+            tile_size: Width and height of a tile, defaults to tile_size
+            processes: Render in worker processes instead of threads
+            workers: Number of workers, defaults to workers
+            on_progress: Called on this thread as tiles complete, at most
+                once per progress_interval, to display them early
+
+        Returns:
+            Number of tiles rendered
+
+        """
+        tiles = split_tiles(
+            self.framebuffer.w,
+            self.framebuffer.h,
+            tile_size or self.tile_size,
+        )
+        pool = self._get_pool(processes, workers or self.workers)
+
+        # Threads write their tile themselves; results from processes are
+        # copied in here
+        if processes:
+            futures = {
+                pool.submit(render_tile, func, tile, self.origin, self.scale): tile
+                for tile in tiles
+            }
+        else:
+            futures = {
+                pool.submit(self._render_into, func, tile): tile for tile in tiles
+            }
+
+        last_progress = time.perf_counter()
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                colors = future.result()
+                if processes:
+                    self._write(futures[future], colors)
+
+                now = time.perf_counter()
+                if on_progress and now - last_progress >= self.progress_interval:
+                    on_progress()
+                    last_progress = now
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        return len(tiles)
+
+    def sketch_api(
+        self,
+        on_progress: Callable[[], None] | None = None,
+    ) -> dict[str, Callable]:
+        """Get the Processing-style tile rendering function for sketch globals.
+
+        ``renderTiles(func, tile_size=None, processes=False, workers=None)``
+        renders func over the whole canvas, see ``render()``. The options
+        are keyword-only.
+
+        Args:
+            on_progress: Called as tiles complete, to display them early
+
+        Returns:
+            Dictionary mapping global names to functions
+
+        """
+
+        def render_tiles(
+            func: TileFunction,
+            *,
+            tile_size: int | None = None,
+            processes: bool = False,
+            workers: int | None = None,
+        ) -> int:
+            return self.render(
+                func,
+                tile_size=tile_size,
+                processes=processes,
+                workers=workers,
+                on_progress=on_progress,
+            )
+
+        return {"renderTiles": render_tiles}
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool, waiting for running tiles."""
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+            self._pool_key = None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+            logger.debug("Tile pool shut down")
+
+    def _get_pool(self, processes: bool, workers: int) -> concurrent.futures.Executor:
+        """Get a pool of the requested kind, replacing one of another kind.
+
+        A process pool is also replaced when the plain sketch globals its
+        workers were started with have changed.
+
+        Args:
+            processes: True for a process pool, False for a thread pool
+            workers: Number of workers
+
+        Returns:
+            The pool
+
+        """
+        namespace = {
+            name: value
+            for name, value in self.sketch_globals.items()
+            if isinstance(value, _PLAIN_TYPES)
+        }
+        key = (processes, workers, namespace if processes else {})
+        with self._lock:
+            if self._pool_key == key:
+                return self._pool
+            old_pool = self._pool
+
+            if processes:
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=_mp,
+                    initializer=_init_worker,
+                    initargs=(namespace,),
+                )
+            else:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="peyote-tile",
+                )
+            self._pool_key = key
+            pool = self._pool
+
+        if old_pool is not None:
+            old_pool.shutdown(wait=True)
+        kind = "process" if processes else "thread"
+        logger.debug(f"Started tile {kind} pool with {workers} workers")
+        return pool
+
+    def _render_into(self, func: TileFunction, tile: Tile) -> None:
+        """Render a tile and write it into the framebuffer.
+
+        Args:
+            func: Function of the tile's pixel coordinates
+            tile: (x, y, w, h) of the tile
+
+        """
+        self._write(tile, render_tile(func, tile, self.origin, self.scale))
+
+    def _write(self, tile: Tile, colors: np.ndarray) -> None:
+        """Write a rendered tile into the framebuffer.
+
+        Tiles don't overlap, so no locking is needed. Three-channel colors
+        leave the alpha channel as it is. Colors are straight, and are
+        premultiplied for premultiplied framebuffers.
+
+        Args:
+            tile: (x, y, w, h) of the tile
+            colors: (h, w, 3) or (h, w, 4) uint8 colors
+
+        """
+        x, y, w, h = tile
+        rows, columns = slice(y, y + h), slice(x, x + w)
+        rgb = colors[..., :3]
+        if colors.shape[2] == 4:  # noqa: PLR2004
+            self.framebuffer.alpha[rows, columns] = colors[..., 3]
+        if self.framebuffer.premultiplied:
+            rgb = premultiply(rgb, self.framebuffer.alpha[rows, columns])
+        self.framebuffer.rgb[rows, columns] = rgb
+        self.framebuffer.mark_dirty(x, y, w, h)
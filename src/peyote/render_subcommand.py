@@ -0,0 +1,389 @@
+"""Render subcommand for headless batch rendering of sketches."""
+
+import time
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from loguru import logger
+
+cli = typer.Typer()
+
+# Options shared by several commands
+SketchArgument = Annotated[
+    Path,
+    typer.Argument(
+        exists=True,
+        help="Sketch package directory or single .py file",
+    ),
+]
+MainOption = Annotated[
+    str | None,
+    typer.Option(
+        "--main",
+        "-m",
+        help="Main module name (default: file stem, or 'main' for a directory)",
+    ),
+]
+CompressionOption = Annotated[
+    int,
+    typer.Option("--compression", "-c", min=0, max=9, help="zlib compression level"),
+]
+
+
+@cli.command()
+def frames(  # noqa: PLR0913
+    sketch: SketchArgument,
+    *,
+    output: Annotated[
+        Path,
+        typer.Option("--output", "-o", help="Directory to write PNG frames into"),
+    ] = Path("frames"),
+    count: Annotated[
+        int,
+        typer.Option("--frames", "-n", min=1, help="Number of frames"),
+    ] = 1,
+    width: Annotated[int, typer.Option("--width", "-w", help="Canvas width")] = 640,
+    height: Annotated[
+        int,
+        typer.Option("--height", "-h", help="Canvas height"),
+    ] = 360,
+    jobs: Annotated[
+        int | None,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="PNG encoder processes (default: one per CPU)",
+        ),
+    ] = None,
+    compression: CompressionOption = 6,
+    main: MainOption = None,
+) -> None:
+    """Render frames of a sketch to PNG files without opening a window.
+
+    setup() is called once, then draw() is called once per frame. Each
+    frame is copied into a bounded queue and encoded on a pool of worker
+    processes while the next frames are drawn.
+    """
+    logger.info(f"Rendering {sketch=} with {count=}, {width=}, {height=}")
+
+    # Import here to avoid loading Qt unless needed
+    from .ide.headless import HeadlessRenderer, read_sketch_modules  # noqa: PLC0415
+
+    modules = read_sketch_modules(sketch)
+    if not modules:
+        typer.secho(f"No modules found in {sketch}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    main_module_name = main or (sketch.stem if sketch.is_file() else "main")
+
+    renderer = HeadlessRenderer(width, height)
+    try:
+        renderer.load(modules, main_module_name)
+        start = time.perf_counter()
+        written = renderer.render(
+            count,
+            output,
+            jobs=jobs,
+            compress_level=compression,
+        )
+        elapsed = time.perf_counter() - start
+    except Exception as error:
+        logger.exception("Headless render failed")
+        typer.secho(f"Render failed: {error}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1) from None
+    finally:
+        renderer.unload()
+
+    fps = written / max(elapsed, 1e-9)
+    typer.secho(
+        f"Rendered {written} frames to {output} ({fps:.1f} fps)",
+        fg=typer.colors.GREEN,
+    )
+
+
+@cli.command()
+def animation(  # noqa: PLR0913
+    sketch: SketchArgument,
+    *,
+    output: Annotated[
+        Path,
+        typer.Option(
+            "--output",
+            "-o",
+            help="Animation file to write (.gif, .png or .apng)",
+        ),
+    ] = Path("animation.gif"),
+    count: Annotated[
+        int,
+        typer.Option("--frames", "-n", min=1, help="Number of frames"),
+    ] = 60,
+    duration: Annotated[
+        int,
+        typer.Option(
+            "--duration",
+            "-d",
+            min=1,
+            help="Duration per frame in milliseconds",
+        ),
+    ] = 33,
+    width: Annotated[int, typer.Option("--width", "-w", help="Canvas width")] = 640,
+    height: Annotated[
+        int,
+        typer.Option("--height", "-h", help="Canvas height"),
+    ] = 360,
+    main: MainOption = None,
+) -> None:
+    """Render a sketch to an animated GIF or APNG without opening a window.
+
+    Frames are encoded on a worker thread as they are drawn, so memory use
+    stays constant no matter how many frames are rendered.
+    """
+    logger.info(f"Rendering animation {sketch=} to {output=} with {count=}")
+
+    # Import here to avoid loading Qt unless needed
+    from .ide.headless import HeadlessRenderer, read_sketch_modules  # noqa: PLC0415
+
+    if output.suffix.lower() not in {".gif", ".png", ".apng"}:
+        typer.secho(
+            f"Unsupported animation format: {output.suffix}",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(code=1)
+
+    modules = read_sketch_modules(sketch)
+    if not modules:
+        typer.secho(f"No modules found in {sketch}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    main_module_name = main or (sketch.stem if sketch.is_file() else "main")
+
+    renderer = HeadlessRenderer(width, height)
+    try:
+        renderer.load(modules, main_module_name)
+        written = renderer.render_animation(count, output, duration=duration)
+    except Exception as error:
+        logger.exception("Headless render failed")
+        typer.secho(f"Render failed: {error}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1) from None
+    finally:
+        renderer.unload()
+
+    typer.secho(f"Rendered {written} frames to {output}", fg=typer.colors.GREEN)
+
+
+@cli.command()
+def poster(  # noqa: PLR0913
+    sketch: SketchArgument,
+    *,
+    output: Annotated[
+        Path,
+        typer.Option(
+            "--output", "-o", help="Image file to write (.png, .tif or .tiff)"
+        ),
+    ] = Path("poster.png"),
+    width: Annotated[
+        int,
+        typer.Option("--width", "-w", min=1, help="Poster width"),
+    ] = 8000,
+    height: Annotated[
+        int,
+        typer.Option("--height", "-h", min=1, help="Poster height"),
+    ] = 8000,
+    scale: Annotated[
+        float,
+        typer.Option("--scale", "-s", min=0.01, help="Poster pixels per canvas unit"),
+    ] = 1.0,
+    tile_size: Annotated[
+        int,
+        typer.Option("--tile-size", "-t", min=16, help="Tile size"),
+    ] = 1024,
+    workers: Annotated[
+        int,
+        typer.Option("--workers", "-j", min=1, help="Worker processes"),
+    ] = 1,
+    compression: CompressionOption = 6,
+    main: MainOption = None,
+) -> None:
+    """Render one frame of a sketch at poster resolution, tile by tile.
+
+    draw() is called once per tile and finished rows of tiles are streamed
+    into the image, so memory use is bounded by one row of tiles however
+    large the poster is.
+    """
+    logger.info(f"Rendering poster {sketch=} to {output=} with {width=}, {height=}")
+
+    # Import here to avoid loading Qt unless needed
+    from .ide.headless import read_sketch_modules  # noqa: PLC0415
+    from .ide.poster import render_poster  # noqa: PLC0415
+
+    if output.suffix.lower() not in {".png", ".tif", ".tiff"}:
+        typer.secho(
+            f"Unsupported poster format: {output.suffix}",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(code=1)
+
+    modules = read_sketch_modules(sketch)
+    if not modules:
+        typer.secho(f"No modules found in {sketch}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    main_module_name = main or (sketch.stem if sketch.is_file() else "main")
+
+    try:
+        start = time.perf_counter()
+        tiles = render_poster(
+            modules,
+            main_module_name,
+            output,
+            width,
+            height,
+            scale=scale,
+            tile_size=tile_size,
+            workers=workers,
+            compress_level=compression,
+        )
+        elapsed = time.perf_counter() - start
+    except Exception as error:
+        logger.exception("Poster render failed")
+        typer.secho(f"Render failed: {error}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1) from None
+
+    typer.secho(
+        f"Rendered {width}x{height} poster in {tiles} tiles to {output} "
+        f"({elapsed:.1f} s)",
+        fg=typer.colors.GREEN,
+    )
+
+
+@cli.command()
+def canvas(  # noqa: PLR0913
+    sketch: SketchArgument,
+    *,
+    output: Annotated[
+        Path,
+        typer.Option(
+            "--output",
+            "-o",
+            help="Raw frame file backing the canvas; reopened if it exists",
+        ),
+    ] = Path("canvas.raw"),
+    count: Annotated[
+        int,
+        typer.Option("--frames", "-n", min=1, help="Number of frames"),
+    ] = 1,
+    width: Annotated[
+        int,
+        typer.Option("--width", "-w", min=1, help="Canvas width"),
+    ] = 640,
+    height: Annotated[
+        int,
+        typer.Option("--height", "-h", min=1, help="Canvas height"),
+    ] = 360,
+    opaque: Annotated[
+        bool,
+        typer.Option(
+            "--opaque",
+            help="Start a new canvas opaque black instead of transparent; "
+            "writes the whole file once",
+        ),
+    ] = False,
+    main: MainOption = None,
+) -> None:
+    """Render a sketch into a memory-mapped canvas file.
+
+    The canvas lives in the file rather than in memory, so it can be larger
+    than RAM and keeps the last frame drawn even if the render crashes.
+    Running again with the same file continues on the existing pixels.
+    Convert the file to an image with `render convert`.
+    """
+    logger.info(f"Rendering {sketch=} into {output=} with {count=}")
+
+    # Import here to avoid loading Qt unless needed
+    from .ide.headless import HeadlessRenderer, open_canvas_file, read_sketch_modules  # noqa: PLC0415
+
+    modules = read_sketch_modules(sketch)
+    if not modules:
+        typer.secho(f"No modules found in {sketch}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    main_module_name = main or (sketch.stem if sketch.is_file() else "main")
+
+    try:
+        framebuffer = open_canvas_file(output, width, height, opaque=opaque)
+    except (OSError, ValueError) as error:
+        typer.secho(f"Cannot open canvas: {error}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1) from None
+
+    renderer = HeadlessRenderer(
+        width,
+        height,
+        buf=framebuffer.array,
+        premultiplied=framebuffer.premultiplied,
+    )
+    written = 0
+    try:
+        renderer.load(modules, main_module_name)
+        for _ in renderer.iter_frames(count):
+            written += 1
+    except Exception as error:
+        logger.exception("Headless render failed")
+        typer.secho(f"Render failed: {error}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1) from None
+    finally:
+        renderer.unload()
+
+    typer.secho(f"Rendered {written} frames into {output}", fg=typer.colors.GREEN)
+
+
+@cli.command()
+def convert(
+    canvas_file: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            dir_okay=False,
+            help="Raw frame file written by `render canvas`",
+        ),
+    ],
+    *,
+    output: Annotated[
+        Path,
+        typer.Option(
+            "--output", "-o", help="Image file to write (.png, .tif or .tiff)"
+        ),
+    ] = Path("canvas.png"),
+    compression: CompressionOption = 6,
+) -> None:
+    """Convert a raw frame file to a PNG or TIFF image.
+
+    Rows are converted a band at a time, so canvases larger than RAM are
+    converted with little memory, without running the sketch again.
+    """
+    # Import here to avoid loading NumPy-heavy modules unless needed
+    from .ide.export import save_framebuffer  # noqa: PLC0415
+    from .util.framebuffer import Framebuffer  # noqa: PLC0415
+
+    if output.suffix.lower() not in {".png", ".tif", ".tiff"}:
+        typer.secho(
+            f"Unsupported image format: {output.suffix}",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(code=1)
+
+    try:
+        framebuffer = Framebuffer.open_file(canvas_file, readonly=True)
+        save_framebuffer(framebuffer, output, compress_level=compression)
+    except (OSError, ValueError) as error:
+        typer.secho(f"Convert failed: {error}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1) from None
+
+    typer.secho(
+        f"Converted {framebuffer.w}x{framebuffer.h} canvas to {output}",
+        fg=typer.colors.GREEN,
+    )
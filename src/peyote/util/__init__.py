@@ -1,7 +1,6 @@
 """Utility module for peyote."""
 
-from . import interp
+from . import interp, noise
 from .interp import *
 
 __all__ = list(interp.__all__)
-
@@ -0,0 +1,202 @@
+"""Vectorized compositing kernels.
+
+Blend a color (or per-pixel colors) into a framebuffer at many pixels in a
+single call, instead of reading, blending and writing one pixel at a time.
+Supported modes are source-over, additive, multiply and screen, each
+weighted by an alpha that may be a scalar or given per pixel.
+
+Framebuffers are NumPy arrays of shape (h, w, 3) or (h, w, 4) indexed
+[y, x]. Pixels that are hit more than once in one call are blended in call
+order, exactly as a Python loop over the points would.
+"""
+
+import numpy as np
+
+__all__ = ["MODES", "blend", "blend_at", "blend_mask", "blend_points"]
+
+MODES = ("source_over", "add", "multiply", "screen")
+
+
+def blend(dst, src, alpha, mode="source_over"):
+    """Blend source colors over destination colors.
+
+    Args:
+        dst: Destination colors, float array in [0, 1] with shape (..., 3)
+        src: Source colors, float array in [0, 1] broadcastable to dst
+        alpha: Blend weight in [0, 1], broadcastable to dst[..., 0]
+        mode: One of MODES
+
+    Returns:
+        Blended colors as a float array in [0, 1]
+
+    Raises:
+        ValueError: If mode is not one of MODES
+
+    """
+    a = np.asarray(alpha, dtype=np.float32)[..., None]
+    if mode == "source_over":
+        return dst + (src - dst) * a
+    if mode == "add":
+        return np.minimum(dst + src * a, 1.0)
+    if mode == "multiply":
+        return dst + (dst * src - dst) * a
+    if mode == "screen":
+        return dst + (src - dst * src) * a
+    msg = f"Unknown blend mode: {mode!r} (expected one of {', '.join(MODES)})"
+    raise ValueError(msg)
+
+
+def _split_color(color, count):
+    """Split RGB(A) uint8 colors into float RGB in [0, 1] and alpha.
+
+    Args:
+        color: A single RGB(A) color or an (n, 3) / (n, 4) array
+        count: Number of pixels being blended
+
+    Returns:
+        Tuple of (rgb, alpha) float arrays
+
+    """
+    color = np.asarray(color)
+    rgb = color[..., :3].astype(np.float32) / np.float32(255.0)
+    if color.shape[-1] == 4:
+        alpha = color[..., 3].astype(np.float32) / np.float32(255.0)
+    else:
+        alpha = np.float32(1.0)
+    if rgb.ndim == 1:
+        rgb = np.broadcast_to(rgb, (count, 3))
+    return rgb, alpha
+
+
+def _occurrences(linear):
+    """Number each index by how many times it appeared before.
+
+    Args:
+        linear: 1-D array of linear pixel indices
+
+    Returns:
+        Array with the occurrence rank of each index (0 for first hits)
+
+    """
+    count = len(linear)
+    order = np.argsort(linear, kind="stable")
+    ordered = linear[order]
+    starts = np.ones(count, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    positions = np.arange(count)
+    group_start = np.maximum.accumulate(np.where(starts, positions, 0))
+    occurrence = np.empty(count, dtype=np.intp)
+    occurrence[order] = positions - group_start
+    return occurrence
+
+
+def blend_at(rgb, index, color, alpha=1.0, mode="source_over", dst_alpha=None):
+    """Blend colors into an RGB array at explicit indices.
+
+    This is the general form used by blend_points and by graphics.Context,
+    whose pygame surface views are indexed [x, y] with alpha kept in a
+    separate array. Indices must be in bounds.
+
+    Args:
+        rgb: uint8 array whose first two axes are indexed by index
+        index: Tuple of two integer arrays selecting the pixels
+        color: A single RGB(A) color or an (n, 3) / (n, 4) uint8 array
+        alpha: Scalar or per-pixel blend weight in [0, 1]
+        mode: One of MODES
+        dst_alpha: Optional uint8 alpha array updated with source-over
+            coverage
+
+    """
+    first, second = (np.asarray(i, dtype=np.intp) for i in index)
+    count = len(first)
+    if count == 0:
+        return
+
+    src, src_alpha = _split_color(color, count)
+    weight = np.broadcast_to(
+        np.asarray(alpha, dtype=np.float32) * src_alpha,
+        (count,),
+    )
+
+    # Pixels hit several times are blended in successive rounds, in call order
+    occurrence = _occurrences(np.ravel_multi_index((first, second), rgb.shape[:2]))
+    rounds = int(occurrence.max()) + 1
+    for rank in range(rounds):
+        sel = slice(None) if rounds == 1 else occurrence == rank
+        i, j, a = first[sel], second[sel], weight[sel]
+
+        dst = rgb[i, j].astype(np.float32) / np.float32(255.0)
+        out = blend(dst, src[sel], a, mode)
+        rgb[i, j] = (out * 255.0 + 0.5).astype(np.uint8)
+
+        if dst_alpha is not None:
+            da = dst_alpha[i, j].astype(np.float32) / np.float32(255.0)
+            dst_alpha[i, j] = ((a + da * (1.0 - a)) * 255.0 + 0.5).astype(np.uint8)
+
+
+def blend_points(buf, xs, ys, color, alpha=1.0, mode="source_over"):
+    """Blend colors into a framebuffer at many (x, y) points.
+
+    Points outside the framebuffer are dropped.
+
+    Args:
+        buf: uint8 framebuffer of shape (h, w, 3) or (h, w, 4)
+        xs: Integer x coordinates
+        ys: Integer y coordinates
+        color: A single RGB(A) color or an (n, 3) / (n, 4) uint8 array
+        alpha: Scalar or per-point blend weight in [0, 1]
+        mode: One of MODES
+
+    """
+    xs = np.asarray(xs, dtype=np.intp)
+    ys = np.asarray(ys, dtype=np.intp)
+    h, w = buf.shape[:2]
+    inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+
+    color = np.asarray(color)
+    if color.ndim > 1:
+        color = color[inside]
+    alpha = np.asarray(alpha, dtype=np.float32)
+    if alpha.ndim:
+        alpha = alpha[inside]
+
+    blend_at(
+        buf[..., :3],
+        (ys[inside], xs[inside]),
+        color,
+        alpha,
+        mode,
+        buf[..., 3] if buf.shape[2] == 4 else None,
+    )
+
+
+def blend_mask(buf, mask, color, alpha=1.0, mode="source_over"):
+    """Blend colors into a framebuffer wherever a mask is set.
+
+    Args:
+        buf: uint8 framebuffer of shape (h, w, 3) or (h, w, 4)
+        mask: Boolean mask or float coverage in [0, 1] of shape (h, w)
+        color: A single RGB(A) color or a (h, w, 3) / (h, w, 4) image
+        alpha: Scalar blend weight in [0, 1]
+        mode: One of MODES
+
+    """
+    mask = np.asarray(mask)
+    ys, xs = np.nonzero(mask)
+
+    weight = np.float32(alpha)
+    if mask.dtype != bool:
+        weight = mask[ys, xs].astype(np.float32) * weight
+
+    color = np.asarray(color)
+    if color.ndim > 1:
+        color = color[ys, xs]
+
+    blend_at(
+        buf[..., :3],
+        (ys, xs),
+        color,
+        weight,
+        mode,
+        buf[..., 3] if buf.shape[2] == 4 else None,
+    )
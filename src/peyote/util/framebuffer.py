@@ -0,0 +1,405 @@
+"""A framebuffer shared without copies by NumPy, cairo, Qt and pygame.
+
+Pixels are stored row by row as native-endian 32-bit ARGB words
+(0xAARRGGBB). That is cairo's FORMAT_ARGB32, Qt's Format_ARGB32 and the
+layout pygame calls "BGRA" on little-endian machines, so all of them can
+wrap the same memory. Drawing through any one of the views below is seen
+by the others right away, with no per-frame copies or format conversions:
+
+- ``array``: (h, w, 4) uint8 bytes in memory order (B, G, R, A on
+  little-endian machines)
+- ``pixels``: (h, w) uint32 words
+- ``rgb`` and ``alpha``: (h, w, 3) and (h, w) channel views in R, G, B
+  order, whatever the byte order
+- ``qimage()``, ``cairo_surface()`` and ``pygame_surface()``
+
+All NumPy views are indexed [y, x], like the Qt and cairo images. Straight
+RGBA copies are only made for export, by ``to_rgba()``.
+
+cairo treats the words as premultiplied by alpha while Qt's Format_ARGB32
+does not. The two agree on opaque pixels, which is what the display shows.
+A framebuffer created with ``premultiplied=True`` stores premultiplied
+colors, and its QImage uses Format_ARGB32_Premultiplied: Qt's native
+format, which it paints without converting, and the layout cairo draws.
+``rgb`` then holds premultiplied values, ``fill()`` premultiplies its color
+and ``to_rgba()`` converts back to straight alpha for export. pygame always
+reads and writes straight alpha.
+
+Writes through the views are not tracked. Whoever changes pixels records
+the changed rectangle with ``mark_dirty()``, which bumps ``generation``;
+the display takes the damage once per frame with ``take_damage()`` and
+copies and repaints only those rectangles, or nothing at all.
+
+``Framebuffer.create_file()`` and ``Framebuffer.open_file()`` back the
+pixels with a ``numpy.memmap`` of a raw frame file: a 64 byte header
+(magic, version, size, flags and byte order) followed by the pixel rows.
+Canvases larger than RAM work, since the OS only keeps the regions being
+drawn in memory, and the file keeps the last frame if the process crashes.
+"""
+
+import struct
+import sys
+import threading
+
+import numpy as np
+
+__all__ = [
+    "BYTE_ORDER",
+    "FILE_HEADER_SIZE",
+    "MAX_DAMAGE_RECTS",
+    "Framebuffer",
+    "pack_color",
+    "premultiply",
+    "unpremultiply",
+]
+
+# Order of the channels in memory
+BYTE_ORDER = "BGRA" if sys.byteorder == "little" else "ARGB"
+
+_R, _G, _B, _A = (BYTE_ORDER.index(channel) for channel in "RGBA")
+
+# Damage beyond this many rectangles is merged into their bounding box
+MAX_DAMAGE_RECTS = 16
+
+# Header of a raw frame file: magic, version, width, height, flags and
+# byte order, padded so the pixels start at FILE_HEADER_SIZE
+_FILE_MAGIC = b"PEYOTEFB"
+_FILE_VERSION = 1
+_FILE_HEADER = struct.Struct("<8sIIII4s")
+_FILE_PREMULTIPLIED = 1
+FILE_HEADER_SIZE = 64
+
+
+def pack_color(color, premultiplied=False):
+    """Pack an RGB or RGBA color into a native ARGB32 word.
+
+    Args:
+        color: (r, g, b) or (r, g, b, a) with 0-255 components; RGB colors
+            are opaque
+        premultiplied: Premultiply the color channels by alpha
+
+    Returns:
+        The color as a numpy.uint32
+
+    """
+    r, g, b, *rest = (int(c) for c in color)
+    a = rest[0] if rest else 255
+    if premultiplied:
+        r, g, b = ((c * a + 127) // 255 for c in (r, g, b))
+    return np.uint32((a << 24) | (r << 16) | (g << 8) | b)
+
+
+def premultiply(rgb, alpha):
+    """Multiply straight colors by their alpha.
+
+    Args:
+        rgb: (..., 3) uint8 straight colors
+        alpha: uint8 alpha broadcastable to rgb[..., 0]
+
+    Returns:
+        (..., 3) uint8 premultiplied colors
+
+    """
+    a = np.asarray(alpha, dtype=np.uint16)[..., np.newaxis]
+    return ((rgb * a + 127) // 255).astype(np.uint8)
+
+
+def unpremultiply(rgb, alpha):
+    """Divide premultiplied colors by their alpha.
+
+    Fully transparent pixels come out black.
+
+    Args:
+        rgb: (..., 3) uint8 premultiplied colors
+        alpha: uint8 alpha broadcastable to rgb[..., 0]
+
+    Returns:
+        (..., 3) uint8 straight colors
+
+    """
+    a = np.asarray(alpha, dtype=np.uint16)[..., np.newaxis]
+    straight = (rgb * np.uint16(255) + a // 2) // np.maximum(a, 1)
+    return np.minimum(straight, 255).astype(np.uint8)
+
+
+def _bounding_box(rects):
+    """Smallest (x, y, w, h) rectangle containing all the rectangles."""
+    x0 = min(x for x, _, _, _ in rects)
+    y0 = min(y for _, y, _, _ in rects)
+    x1 = max(x + w for x, _, w, _ in rects)
+    y1 = max(y + h for _, y, _, h in rects)
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+class Framebuffer:
+    """A w x h ARGB32 pixel buffer with zero-copy views."""
+
+    def __init__(self, w, h, buf=None, premultiplied=False):
+        """Allocate a framebuffer or wrap existing memory.
+
+        Args:
+            w: Width in pixels
+            h: Height in pixels
+            buf: Optional (h, w, 4) uint8 array to wrap, e.g. a view of
+                shared memory; a new opaque black buffer is allocated if
+                omitted
+            premultiplied: Store colors premultiplied by alpha
+
+        Raises:
+            ValueError: If buf has the wrong shape, type or layout
+
+        """
+        if buf is None:
+            buf = np.zeros((h, w, 4), dtype=np.uint8)
+            buf[..., _A] = 255
+        if buf.shape != (h, w, 4) or buf.dtype != np.uint8:
+            msg = f"Expected a ({h}, {w}, 4) uint8 buffer, got {buf.shape} {buf.dtype}"
+            raise ValueError(msg)
+        if buf.strides[1:] != (4, 1):
+            msg = "Framebuffer pixels must be contiguous within a row"
+            raise ValueError(msg)
+
+        self.w = w
+        self.h = h
+        self.premultiplied = premultiplied
+        self.array = buf
+        self.pixels = buf.view(np.uint32)[..., 0]
+
+        if _R > _B:
+            self.rgb = buf[..., _R : _B - 1 if _B else None : -1]
+        else:
+            self.rgb = buf[..., _R : _B + 1]
+        self.alpha = buf[..., _A]
+
+        # Placement on a larger canvas when the framebuffer holds one tile of
+        # a poster: the canvas position of the top left pixel in poster
+        # pixels, and poster pixels per canvas unit
+        self.origin = (0, 0)
+        self.scale = 1.0
+
+        # Changed (x, y, w, h) rectangles since the last take_damage(); may
+        # be marked from tile threads
+        self.generation = 0
+        self._damage = []
+        self._damage_lock = threading.Lock()
+
+    @classmethod
+    def create_file(cls, path, w, h, premultiplied=False, opaque=False):
+        """Create a raw frame file and map it as a framebuffer.
+
+        The file is created sparse and reads as transparent black; disk
+        space and memory are only used for the regions that are drawn.
+
+        Args:
+            path: File to create, replacing an existing one
+            w: Width in pixels
+            h: Height in pixels
+            premultiplied: Store colors premultiplied by alpha
+            opaque: Start opaque black, like a framebuffer in memory,
+                instead. This writes every row of the file once
+
+        Returns:
+            Framebuffer whose array is a numpy.memmap of the file
+
+        """
+        flags = _FILE_PREMULTIPLIED if premultiplied else 0
+        header = _FILE_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, w, h, flags,
+                                   BYTE_ORDER.encode("ascii"))
+        with open(path, "wb") as f:
+            f.write(header.ljust(FILE_HEADER_SIZE, b"\0"))
+            f.truncate(FILE_HEADER_SIZE + h * w * 4)
+        framebuffer = cls.open_file(path)
+        if opaque:
+            framebuffer.fill((0, 0, 0))
+        return framebuffer
+
+    @classmethod
+    def open_file(cls, path, readonly=False):
+        """Map an existing raw frame file as a framebuffer.
+
+        Args:
+            path: File written by create_file()
+            readonly: Map the file read-only, e.g. to convert it
+
+        Returns:
+            Framebuffer whose array is a numpy.memmap of the file, with the
+            size and alpha mode recorded in the header
+
+        Raises:
+            ValueError: If the file is not a raw frame file, was written on
+                a machine of the other byte order, or is truncated
+
+        """
+        with open(path, "rb") as f:
+            header = f.read(_FILE_HEADER.size)
+            f.seek(0, 2)
+            size = f.tell()
+        if len(header) < _FILE_HEADER.size or not header.startswith(_FILE_MAGIC):
+            msg = f"{path} is not a raw frame file"
+            raise ValueError(msg)
+
+        _, version, w, h, flags, byte_order = _FILE_HEADER.unpack(header)
+        if version != _FILE_VERSION:
+            msg = f"Unsupported raw frame file version {version} in {path}"
+            raise ValueError(msg)
+        if byte_order.decode("ascii") != BYTE_ORDER:
+            msg = f"{path} was written with {byte_order.decode('ascii')} byte order"
+            raise ValueError(msg)
+        if size < FILE_HEADER_SIZE + h * w * 4:
+            msg = f"{path} is truncated: expected {w}x{h} pixels"
+            raise ValueError(msg)
+
+        buf = np.memmap(path, dtype=np.uint8, mode="r" if readonly else "r+",
+                        offset=FILE_HEADER_SIZE, shape=(h, w, 4))
+        return cls(w, h, buf, premultiplied=bool(flags & _FILE_PREMULTIPLIED))
+
+    def flush(self):
+        """Write changed pixels of a file-backed framebuffer to disk.
+
+        The OS writes them back by itself, even if the process crashes;
+        flushing guards against losing them to a system crash. Does nothing
+        for framebuffers in memory.
+        """
+        if isinstance(self.array, np.memmap) and self.array.flags.writeable:
+            self.array.flush()
+
+    @property
+    def stride(self):
+        """Bytes from one row to the next."""
+        return self.array.strides[0]
+
+    def fill(self, color):
+        """Fill the whole framebuffer with one color.
+
+        Args:
+            color: Straight (r, g, b) or (r, g, b, a); RGB colors are opaque
+
+        """
+        self.pixels.fill(pack_color(color, self.premultiplied))
+        self.mark_dirty()
+
+    def copy_from(self, other):
+        """Copy the pixels of a framebuffer of the same size and mode.
+
+        Args:
+            other: Framebuffer to copy
+
+        """
+        np.copyto(self.array, other.array)
+        self.mark_dirty()
+
+    def mark_dirty(self, x=0, y=0, w=None, h=None):
+        """Record that a rectangle of pixels changed.
+
+        The rectangle is clipped to the framebuffer. Without arguments the
+        whole framebuffer is marked.
+
+        Args:
+            x: Left edge
+            y: Top edge
+            w: Width, defaults to the rest of the row
+            h: Height, defaults to the rest of the column
+
+        """
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1 = self.w if w is None else min(int(x) + int(w), self.w)
+        y1 = self.h if h is None else min(int(y) + int(h), self.h)
+        if x1 <= x0 or y1 <= y0:
+            return
+
+        with self._damage_lock:
+            self.generation += 1
+            full = (0, 0, self.w, self.h)
+            if (x0, y0, x1, y1) == (0, 0, self.w, self.h) or self._damage == [full]:
+                self._damage = [full]
+                return
+            self._damage.append((x0, y0, x1 - x0, y1 - y0))
+            if len(self._damage) > MAX_DAMAGE_RECTS:
+                self._damage = [_bounding_box(self._damage)]
+
+    def take_damage(self):
+        """Return and forget the rectangles changed since the last call.
+
+        Returns:
+            (generation, rects): the generation when the damage was taken
+            and a list of (x, y, w, h) rectangles, empty if nothing changed
+
+        """
+        with self._damage_lock:
+            damage = self._damage
+            self._damage = []
+            return self.generation, damage
+
+    def to_rgba(self, out=None):
+        """Convert to a straight RGBA array, e.g. for export.
+
+        Args:
+            out: Optional (h, w, 4) uint8 array to write into
+
+        Returns:
+            (h, w, 4) uint8 array in R, G, B, A order
+
+        """
+        if out is None:
+            out = np.empty((self.h, self.w, 4), dtype=np.uint8)
+        # Opaque pixels are the same either way, and the display is opaque
+        if self.premultiplied and not (self.alpha == 255).all():
+            out[..., :3] = unpremultiply(self.rgb, self.alpha)
+        else:
+            out[..., :3] = self.rgb
+        out[..., 3] = self.alpha
+        return out
+
+    def qimage(self):
+        """Wrap the pixels in a QImage without copying.
+
+        Returns:
+            QImage in Format_ARGB32, or Format_ARGB32_Premultiplied for
+            premultiplied framebuffers, that keeps the memory alive
+
+        """
+        from PySide6.QtGui import QImage
+
+        image = QImage(
+            self.array.data,
+            self.w,
+            self.h,
+            self.stride,
+            QImage.Format.Format_ARGB32_Premultiplied
+            if self.premultiplied
+            else QImage.Format.Format_ARGB32,
+        )
+        # Keep a reference so the memory outlives the QImage
+        image._buf = self.array
+        return image
+
+    def cairo_surface(self):
+        """Wrap the pixels in a cairo image surface without copying.
+
+        Returns:
+            cairo.ImageSurface in FORMAT_ARGB32
+
+        """
+        import cairo
+
+        return cairo.ImageSurface.create_for_data(
+            self.array,
+            cairo.FORMAT_ARGB32,
+            self.w,
+            self.h,
+            self.stride,
+        )
+
+    def pygame_surface(self):
+        """Wrap the pixels in a pygame surface without copying.
+
+        The surface does not lock the memory, so blits work while other
+        views are alive.
+
+        Returns:
+            pygame.Surface with per-pixel alpha
+
+        """
+        import pygame
+
+        return pygame.image.frombuffer(self.array, (self.w, self.h), BYTE_ORDER)
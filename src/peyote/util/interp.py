@@ -1,21 +1,269 @@
-"""processing will let you specify your coordinates as the centerpoint of a shape.  
-shiftPosToCenter will translate your point by half of the width/height of your shape."""
+"""Interpolation and mapping helpers in the style of Processing.
+
+Every function accepts scalars, sequences or NumPy arrays, and broadcasts
+array arguments against each other, so a whole particle system can be
+mapped in one call::
+
+    xs = remap(positions[:, 0], -1, 1, 0, WIDTH)
+
+For a range that doesn't change between frames, a Remap object computes
+its scale and offset once and applies them with a single multiply-add.
+
+processing will let you specify your coordinates as the centerpoint of a
+shape. shiftPosToCenter will translate your point by half of the
+width/height of your shape.
+"""
+
+import math
+
+import numpy as np
 
 __all__ = ['shiftPosToCenter',
            'norm',
            'lerp',
-           'remap']
+           'remap',
+           'Remap',
+           'constrain',
+           'smoothstep',
+           'lerpColor',
+           'EASINGS',
+           'ease',
+           'easeInQuad',
+           'easeOutQuad',
+           'easeInOutQuad',
+           'easeInCubic',
+           'easeOutCubic',
+           'easeInOutCubic',
+           'easeInSine',
+           'easeOutSine',
+           'easeInOutSine',
+           'easeInExpo',
+           'easeOutExpo',
+           'easeInOutExpo']
+
+
+def _values(value):
+    """Pass scalars and arrays through, turn sequences into float arrays."""
+    if isinstance(value, (int, float, np.ndarray, np.generic)):
+        return value
+    return np.asarray(value, dtype=np.float64)
+
 
 def shiftPosToCenter(value, distance):
-    return value - (distance/2)
+    return _values(value) - (_values(distance)/2)
 
 def norm(value, rangeMin, rangeMax):
-    rangeSize = rangeMax - rangeMin
-    return (value - rangeMin) / rangeSize
+    rangeMin = _values(rangeMin)
+    return (_values(value) - rangeMin) / (_values(rangeMax) - rangeMin)
 
 def lerp(pos1, pos2, intermediatePos):
-    return pos1 + intermediatePos * (pos2 - pos1)
+    pos1 = _values(pos1)
+    return pos1 + _values(intermediatePos) * (_values(pos2) - pos1)
 
 def remap(value, dataMin, dataMax, outputMin, outputMax):
     return lerp(outputMin, outputMax, norm(value, dataMin, dataMax))
 
+
+class Remap:
+    """remap() with a fixed input and output range.
+
+    The range sizes are computed once, so each call is one multiply-add::
+
+        to_screen = Remap(-1, 1, 0, WIDTH)
+        xs = to_screen(positions[:, 0])
+    """
+
+    def __init__(self, dataMin, dataMax, outputMin, outputMax, clamp=False):
+        """Precompute the mapping.
+
+        Args:
+            dataMin: Input value mapped to outputMin
+            dataMax: Input value mapped to outputMax
+            outputMin: Output for dataMin
+            outputMax: Output for dataMax
+            clamp: Constrain results to the output range
+
+        """
+        self.dataMin = dataMin
+        self.dataMax = dataMax
+        self.outputMin = outputMin
+        self.outputMax = outputMax
+        self.clamp = clamp
+
+        self.scale = (outputMax - outputMin) / (dataMax - dataMin)
+        self.offset = outputMin - dataMin * self.scale
+        self._low = min(outputMin, outputMax)
+        self._high = max(outputMin, outputMax)
+
+    def __call__(self, value, out=None):
+        """Map values from the input range to the output range.
+
+        Args:
+            value: Scalar, sequence or array of input values
+            out: Optional float array to write the result into
+
+        Returns:
+            The mapped values
+
+        """
+        value = _values(value)
+        if out is None:
+            result = value * self.scale + self.offset
+        else:
+            result = np.multiply(value, self.scale, out=out)
+            result += self.offset
+        if self.clamp:
+            result = np.clip(result, self._low, self._high, out=out)
+        return result
+
+    def inverse(self):
+        """Return the Remap from the output range back to the input range."""
+        return Remap(self.outputMin, self.outputMax, self.dataMin, self.dataMax,
+                     self.clamp)
+
+    def __repr__(self):
+        return (f"Remap({self.dataMin!r}, {self.dataMax!r}, "
+                f"{self.outputMin!r}, {self.outputMax!r}, clamp={self.clamp!r})")
+
+
+def constrain(value, low, high):
+    """Limit values to the range [low, high].
+
+    Args:
+        value: Scalar, sequence or array
+        low: Lower bound
+        high: Upper bound
+
+    Returns:
+        The constrained values
+
+    """
+    return np.clip(_values(value), low, high)
+
+
+def smoothstep(edge0, edge1, x):
+    """Smooth Hermite step from 0 at edge0 to 1 at edge1, like GLSL's.
+
+    Args:
+        edge0: Input where the result starts rising from 0
+        edge1: Input where the result reaches 1
+        x: Scalar, sequence or array of inputs
+
+    Returns:
+        Values in [0, 1]
+
+    """
+    t = np.clip(norm(x, edge0, edge1), 0.0, 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+
+def lerpColor(c1, c2, amt):
+    """Interpolate between two colors, like Processing's lerpColor().
+
+    Args:
+        c1: RGB(A) color, or an (..., 3) / (..., 4) array of colors
+        c2: Color or colors with the same number of channels as c1
+        amt: Scalar or array of amounts in [0, 1]; an array gives one color
+            per amount
+
+    Returns:
+        uint8 array of colors with shape (..., channels)
+
+    """
+    c1 = np.asarray(c1, dtype=np.float32)
+    c2 = np.asarray(c2, dtype=np.float32)
+    amt = np.clip(np.asarray(amt, dtype=np.float32), 0.0, 1.0)[..., np.newaxis]
+    color = c1 + amt * (c2 - c1)
+    return (color + 0.5).astype(np.uint8)
+
+
+# Easing curves map t in [0, 1] to [0, 1], starting at 0 and ending at 1.
+# The piecewise ones use np.where/np.select, which return 0-d arrays for
+# scalars; [()] turns those back into scalars and leaves arrays alone
+
+def easeInQuad(t):
+    t = _values(t)
+    return t * t
+
+def easeOutQuad(t):
+    t = _values(t)
+    return t * (2 - t)
+
+def easeInOutQuad(t):
+    t = _values(t)
+    return np.where(t < 0.5, 2 * t * t, 1 - (-2 * t + 2) ** 2 / 2)[()]
+
+def easeInCubic(t):
+    t = _values(t)
+    return t * t * t
+
+def easeOutCubic(t):
+    t = _values(t)
+    return 1 - (1 - t) ** 3
+
+def easeInOutCubic(t):
+    t = _values(t)
+    return np.where(t < 0.5, 4 * t * t * t, 1 - (-2 * t + 2) ** 3 / 2)[()]
+
+def easeInSine(t):
+    return 1 - np.cos(_values(t) * math.pi / 2)
+
+def easeOutSine(t):
+    return np.sin(_values(t) * math.pi / 2)
+
+def easeInOutSine(t):
+    return (1 - np.cos(_values(t) * math.pi)) / 2
+
+def easeInExpo(t):
+    t = _values(t)
+    return np.where(t <= 0, 0.0, 2.0 ** (10 * t - 10))[()]
+
+def easeOutExpo(t):
+    t = _values(t)
+    return np.where(t >= 1, 1.0, 1 - 2.0 ** (-10 * t))[()]
+
+def easeInOutExpo(t):
+    t = _values(t)
+    return np.select(
+        [t <= 0, t >= 1, t < 0.5],
+        [0.0, 1.0, 2.0 ** (20 * t - 10) / 2],
+        (2 - 2.0 ** (-20 * t + 10)) / 2)[()]
+
+
+EASINGS = {
+    'linear': lambda t: _values(t),
+    'easeInQuad': easeInQuad,
+    'easeOutQuad': easeOutQuad,
+    'easeInOutQuad': easeInOutQuad,
+    'easeInCubic': easeInCubic,
+    'easeOutCubic': easeOutCubic,
+    'easeInOutCubic': easeInOutCubic,
+    'easeInSine': easeInSine,
+    'easeOutSine': easeOutSine,
+    'easeInOutSine': easeInOutSine,
+    'easeInExpo': easeInExpo,
+    'easeOutExpo': easeOutExpo,
+    'easeInOutExpo': easeInOutExpo,
+}
+
+
+def ease(name, t):
+    """Apply an easing curve by name.
+
+    Args:
+        name: A key of EASINGS, e.g. "easeInOutCubic"
+        t: Scalar, sequence or array of inputs in [0, 1]
+
+    Returns:
+        The eased values
+
+    Raises:
+        KeyError: If name is not a known easing
+
+    """
+    try:
+        curve = EASINGS[name]
+    except KeyError:
+        msg = f"Unknown easing {name!r}, expected one of {', '.join(EASINGS)}"
+        raise KeyError(msg) from None
+    return curve(t)
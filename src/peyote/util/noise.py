@@ -0,0 +1,340 @@
+"""Perlin, simplex and fractal noise evaluated over whole arrays.
+
+Coordinates may be scalars, sequences or NumPy arrays, and are broadcast
+against each other, so a flow field over a grid or the noise at every
+particle position is a single call::
+
+    from peyote.util.noise import Noise
+
+    field = Noise(seed=1)
+    ys, xs = np.mgrid[0:HEIGHT, 0:WIDTH] * 0.01
+    angles = field.fbm(xs, ys, frame * 0.01, octaves=4) * np.pi
+    speeds = field.simplex(positions[:, 0] * 0.02, positions[:, 1] * 0.02)
+
+Each Noise holds a seeded permutation table and, per dimension, the
+gradient of every lattice hash, looked up once instead of being rebuilt
+from hash bits for every point. Noise values are in [-1, 1].
+
+The module functions use a shared generator. ``noise()``, ``noiseSeed()``
+and ``noiseDetail()`` behave like Processing's (with values in [0, 1]),
+and ``pnoise2``/``pnoise3``/``snoise2``/``snoise3``/``snoise4`` take the
+same octave arguments as the functions of the ``noise`` package.
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+__all__ = ['Noise',
+           'noise',
+           'noiseSeed',
+           'noiseDetail',
+           'pnoise2',
+           'pnoise3',
+           'pnoise4',
+           'snoise2',
+           'snoise3',
+           'snoise4']
+
+
+def _edge_gradients(n):
+    """Gradients pointing at the edge midpoints of an n-cube (n >= 3).
+
+    Returns:
+        (count, n) float array
+    """
+    gradients = []
+    for zero in range(n):
+        for signs in itertools.product((1.0, -1.0), repeat=n - 1):
+            gradient = list(signs)
+            gradient.insert(zero, 0.0)
+            gradients.append(gradient)
+    return np.array(gradients)
+
+
+# Simplex gradients and scales as in Stefan Gustavson's reference code: 2D
+# uses the xy part of the 3D set, and each scale maps the sum to [-1, 1]
+_SIMPLEX_GRADIENTS = {
+    2: _edge_gradients(3)[:, :2],
+    3: _edge_gradients(3),
+    4: _edge_gradients(4),
+}
+_SIMPLEX_RADIUS = {2: 0.5, 3: 0.6, 4: 0.6}
+_SIMPLEX_SCALE = {2: 70.0, 3: 32.0, 4: 27.0}
+
+# Perlin noise with unit gradients is bounded by sqrt(n) / 2
+_PERLIN_DIRECTIONS = {
+    2: np.array([[math.cos(a), math.sin(a)]
+                 for a in np.arange(8) * math.pi / 4]),
+    3: _edge_gradients(3) / math.sqrt(2),
+    4: _edge_gradients(4) / math.sqrt(3),
+}
+
+
+def _fade(t):
+    """Perlin's quintic fade curve 6t^5 - 15t^4 + 10t^3."""
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def _coordinates(coords):
+    """Broadcast coordinates into float arrays of a common shape."""
+    return np.broadcast_arrays(*(np.asarray(c, dtype=np.float64) for c in coords))
+
+
+class Noise:
+    """Seeded Perlin and simplex noise in 2, 3 and 4 dimensions."""
+
+    def __init__(self, seed=0):
+        """Build the permutation table and gradient lattices.
+
+        Args:
+            seed: Seed of the permutation table; equal seeds give equal noise
+
+        """
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        permutation = rng.permutation(256).astype(np.intp)
+        # Doubled, so perm[hash + i] never needs wrapping for i < 256
+        self._perm = np.concatenate([permutation, permutation])
+
+        # Gradient of each lattice hash, per dimension
+        self._perlin_gradients = {
+            n: directions[self._perm % len(directions)]
+            for n, directions in _PERLIN_DIRECTIONS.items()
+        }
+        self._simplex_gradients = {
+            n: gradients[self._perm % len(gradients)]
+            for n, gradients in _SIMPLEX_GRADIENTS.items()
+        }
+
+    def perlin(self, x, y, z=None, w=None):
+        """Evaluate Perlin noise.
+
+        Args:
+            x: x coordinates
+            y: y coordinates
+            z: Optional z coordinates, for 3D noise
+            w: Optional w coordinates, for 4D noise (requires z)
+
+        Returns:
+            Noise values in [-1, 1], broadcast over the coordinates
+
+        """
+        coords = _coordinates(self._dimensions(x, y, z, w))
+        n = len(coords)
+        cells = [np.floor(c) for c in coords]
+        lattice = [cell.astype(np.intp) & 255 for cell in cells]
+        offsets = [c - cell for c, cell in zip(coords, cells)]
+        gradients = self._perlin_gradients[n]
+
+        # Dot products at the 2^n cell corners, combined dimension by
+        # dimension from the last one
+        corners = []
+        for corner in itertools.product((0, 1), repeat=n):
+            gradient = gradients[self._hash(lattice, corner)]
+            corners.append(sum(
+                gradient[..., d] * (offsets[d] - corner[d]) for d in range(n)))
+
+        for d in reversed(range(n)):
+            fade = _fade(offsets[d])
+            corners = [low + fade * (high - low)
+                       for low, high in zip(corners[::2], corners[1::2])]
+        return corners[0] * (2.0 / math.sqrt(n))
+
+    def simplex(self, x, y, z=None, w=None):
+        """Evaluate simplex noise.
+
+        Simplex noise has fewer directional artifacts than Perlin noise
+        and is cheaper in 4D: it sums n + 1 corners instead of 2^n.
+
+        Args:
+            x: x coordinates
+            y: y coordinates
+            z: Optional z coordinates, for 3D noise
+            w: Optional w coordinates, for 4D noise (requires z)
+
+        Returns:
+            Noise values in [-1, 1], broadcast over the coordinates
+
+        """
+        coords = _coordinates(self._dimensions(x, y, z, w))
+        n = len(coords)
+        skew = (math.sqrt(n + 1) - 1) / n
+        unskew = (1 - 1 / math.sqrt(n + 1)) / n
+
+        # Find the simplex cell and the offset from its first corner
+        s = sum(coords) * skew
+        cells = [np.floor(c + s) for c in coords]
+        t = sum(cells) * unskew
+        offsets = [c - cell + t for c, cell in zip(coords, cells)]
+        lattice = [cell.astype(np.intp) & 255 for cell in cells]
+
+        # The corners are reached by stepping along the axes in order of
+        # decreasing offset; rank[d] is the number of axes that come after d
+        rank = [np.zeros(coords[0].shape, dtype=np.intp) for _ in range(n)]
+        for a, b in itertools.combinations(range(n), 2):
+            a_first = offsets[a] >= offsets[b]
+            rank[a] += a_first
+            rank[b] += ~a_first
+
+        gradients = self._simplex_gradients[n]
+        radius = _SIMPLEX_RADIUS[n]
+        total = np.zeros(coords[0].shape)
+        for k in range(n + 1):
+            steps = [(r >= n - k).astype(np.intp) for r in rank]
+            corner = [offsets[d] - steps[d] + k * unskew for d in range(n)]
+            falloff = np.maximum(radius - sum(c * c for c in corner), 0.0)
+            gradient = gradients[self._hash(lattice, steps)]
+            dot = sum(gradient[..., d] * corner[d] for d in range(n))
+            total += falloff ** 4 * dot
+        return total * _SIMPLEX_SCALE[n]
+
+    def fbm(self, x, y, z=None, w=None, octaves=4, lacunarity=2.0, gain=0.5,
+            kind="perlin"):
+        """Evaluate fractal (octave) noise.
+
+        Each octave adds noise at lacunarity times the frequency and gain
+        times the amplitude of the previous one.
+
+        Args:
+            x: x coordinates
+            y: y coordinates
+            z: Optional z coordinates, for 3D noise
+            w: Optional w coordinates, for 4D noise (requires z)
+            octaves: Number of octaves
+            lacunarity: Frequency multiplier between octaves
+            gain: Amplitude multiplier between octaves (persistence)
+            kind: "perlin" or "simplex"
+
+        Returns:
+            Noise values in [-1, 1], broadcast over the coordinates
+
+        Raises:
+            ValueError: If kind is unknown or octaves is less than 1
+
+        """
+        if kind not in ("perlin", "simplex"):
+            msg = f"Unknown noise kind {kind!r}, expected 'perlin' or 'simplex'"
+            raise ValueError(msg)
+        if octaves < 1:
+            msg = f"octaves must be at least 1, got {octaves!r}"
+            raise ValueError(msg)
+
+        evaluate = getattr(self, kind)
+        coords = _coordinates(self._dimensions(x, y, z, w))
+        total = 0.0
+        amplitude = 1.0
+        frequency = 1.0
+        weight = 0.0
+        for _ in range(octaves):
+            total = total + amplitude * evaluate(*(c * frequency for c in coords))
+            weight += amplitude
+            amplitude *= gain
+            frequency *= lacunarity
+        return total / weight
+
+    def _dimensions(self, x, y, z, w):
+        """Collect the given coordinates, checking the dimension."""
+        if w is not None:
+            if z is None:
+                msg = "4D noise needs both z and w"
+                raise ValueError(msg)
+            return (x, y, z, w)
+        if z is not None:
+            return (x, y, z)
+        return (x, y)
+
+    def _hash(self, lattice, corner):
+        """Hash the lattice point at a corner of each cell.
+
+        Args:
+            lattice: Cell coordinates, each wrapped to [0, 255]
+            corner: Per-dimension offsets (0 or 1, or arrays of them)
+
+        Returns:
+            Index into the permutation and gradient tables
+        """
+        perm = self._perm
+        index = np.zeros_like(lattice[0])
+        for cell, step in zip(lattice, corner):
+            index = perm[index + ((cell + step) & 255)]
+        return index
+
+
+_noise = Noise()
+_detail = {"octaves": 4, "gain": 0.5}
+
+
+def noiseSeed(seed):
+    """Reseed the noise used by the module functions.
+
+    Args:
+        seed: Seed of the permutation table
+
+    """
+    global _noise
+    _noise = Noise(seed)
+
+
+def noiseDetail(octaves, falloff=0.5):
+    """Set the octaves used by noise(), like Processing's noiseDetail().
+
+    Args:
+        octaves: Number of octaves
+        falloff: Amplitude multiplier between octaves
+
+    """
+    _detail["octaves"] = octaves
+    _detail["gain"] = falloff
+
+
+def noise(x, y=0.0, z=0.0):
+    """Fractal Perlin noise in [0, 1], like Processing's noise().
+
+    Args:
+        x: x coordinates
+        y: y coordinates
+        z: z coordinates
+
+    Returns:
+        Noise values in [0, 1], broadcast over the coordinates
+
+    """
+    return _noise.fbm(x, y, z, octaves=_detail["octaves"], gain=_detail["gain"]) * 0.5 + 0.5
+
+
+def pnoise2(x, y, octaves=1, persistence=0.5, lacunarity=2.0):
+    """2D Perlin noise with the arguments of noise.pnoise2."""
+    return _noise.fbm(x, y, octaves=octaves, lacunarity=lacunarity,
+                      gain=persistence)
+
+
+def pnoise3(x, y, z, octaves=1, persistence=0.5, lacunarity=2.0):
+    """3D Perlin noise with the arguments of noise.pnoise3."""
+    return _noise.fbm(x, y, z, octaves=octaves, lacunarity=lacunarity,
+                      gain=persistence)
+
+
+def pnoise4(x, y, z, w, octaves=1, persistence=0.5, lacunarity=2.0):
+    """4D Perlin noise with the arguments of noise.pnoise4."""
+    return _noise.fbm(x, y, z, w, octaves=octaves, lacunarity=lacunarity,
+                      gain=persistence)
+
+
+def snoise2(x, y, octaves=1, persistence=0.5, lacunarity=2.0):
+    """2D simplex noise with the arguments of noise.snoise2."""
+    return _noise.fbm(x, y, octaves=octaves, lacunarity=lacunarity,
+                      gain=persistence, kind="simplex")
+
+
+def snoise3(x, y, z, octaves=1, persistence=0.5, lacunarity=2.0):
+    """3D simplex noise with the arguments of noise.snoise3."""
+    return _noise.fbm(x, y, z, octaves=octaves, lacunarity=lacunarity,
+                      gain=persistence, kind="simplex")
+
+
+def snoise4(x, y, z, w, octaves=1, persistence=0.5, lacunarity=2.0):
+    """4D simplex noise with the arguments of noise.snoise4."""
+    return _noise.fbm(x, y, z, w, octaves=octaves, lacunarity=lacunarity,
+                      gain=persistence, kind="simplex")
@@ -0,0 +1,67 @@
+"""Test peyote.util.compositing blend kernels."""
+
+import numpy as np
+import pytest
+
+from peyote.util.compositing import MODES, blend, blend_mask, blend_points
+
+# Random points blended onto a 6x5 buffer, many of them hitting one pixel
+# several times
+POINTS = 200
+
+
+def _blend_loop(  # noqa: PLR0913, PLR0917
+    buf: np.ndarray,
+    xs: np.ndarray,
+    ys: np.ndarray,
+    colors: np.ndarray,
+    alpha: np.ndarray,
+    mode: str,
+) -> None:
+    """Reference implementation blending one pixel at a time."""
+    h, w = buf.shape[:2]
+    for x, y, color, a in zip(xs, ys, colors, alpha, strict=True):
+        if not (0 <= x < w and 0 <= y < h):
+            continue
+        weight = np.float32(a) * np.float32(color[3] / 255.0)
+        dst = buf[y, x, :3].astype(np.float32) / np.float32(255.0)
+        src = color[:3].astype(np.float32) / np.float32(255.0)
+        out = blend(dst, src, weight, mode)
+        buf[y, x, :3] = (out * 255.0 + 0.5).astype(np.uint8)
+        da = buf[y, x, 3] / 255.0
+        buf[y, x, 3] = int((weight + da * (1.0 - weight)) * 255.0 + 0.5)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_blend_points_matches_loop(mode: str) -> None:
+    """Test that overlapping points blend in call order like a Python loop."""
+    rng = np.random.default_rng(0)
+    buf = rng.integers(0, 256, (5, 6, 4), dtype=np.uint8)
+    expected = buf.copy()
+    xs = rng.integers(-1, 7, POINTS)
+    ys = rng.integers(-1, 6, POINTS)
+    colors = rng.integers(0, 256, (POINTS, 4), dtype=np.uint8)
+    alpha = rng.random(POINTS)
+
+    blend_points(buf, xs, ys, colors, alpha, mode)
+    _blend_loop(expected, xs, ys, colors, alpha, mode)
+
+    np.testing.assert_array_equal(buf, expected)
+
+
+def test_blend_mask_coverage() -> None:
+    """Test that float masks weight the blend and untouched pixels survive."""
+    buf = np.zeros((4, 4, 4), dtype=np.uint8)
+    mask = np.zeros((4, 4))
+    mask[1, 1] = 0.5
+
+    blend_mask(buf, mask, (255, 255, 255))
+
+    assert tuple(buf[1, 1]) == (128, 128, 128, 128)
+    assert not buf[0, 0].any()
+
+
+def test_blend_unknown_mode() -> None:
+    """Test that an unknown blend mode is rejected."""
+    with pytest.raises(ValueError, match="Unknown blend mode"):
+        blend(np.zeros(3), np.ones(3), 1.0, "overlay")
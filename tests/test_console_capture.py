@@ -0,0 +1,31 @@
+"""Test the console capture of sketch output."""
+
+from peyote.ide.console_capture import ConsoleCapture
+
+DROPPED = "[... earlier output dropped ...]\n"
+
+
+def test_drain_batches_writes() -> None:
+    """Test that writes are collected until drained."""
+    capture = ConsoleCapture()
+    capture.write("a")
+    capture.write("")
+    capture.write("bc\n")
+    assert capture.drain() == "abc\n"
+    assert capture.drain() == ""
+
+
+def test_keeps_most_recent_output() -> None:
+    """Test that undrained output is trimmed to the newest max_chars."""
+    capture = ConsoleCapture(max_chars=10)
+    for index in range(1000):
+        capture.write(f"{index % 10}")
+    assert capture.drain() == DROPPED + "0123456789"
+
+    # One write larger than the limit is cut to its tail
+    capture.write("x" * 5)
+    capture.write("0123456789abcdef")
+    assert capture.drain() == DROPPED + "6789abcdef"
+
+    capture.write("short")
+    assert capture.drain() == "short"
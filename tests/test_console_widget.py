@@ -0,0 +1,25 @@
+"""Test the bounded console widget."""
+
+from pathlib import Path
+
+from peyote.ide.console_widget import ConsoleWidget
+
+
+def test_output_is_coalesced_bounded_and_logged(qtbot, tmp_path: Path) -> None:  # noqa: ANN001
+    """Test that writes are batched, old lines dropped and all lines logged."""
+    log_path = tmp_path / "console.log"
+    console = ConsoleWidget(max_lines=10, log_path=log_path)
+    qtbot.addWidget(console)
+
+    for index in range(25):
+        console.write(f"line {index}\n")
+    assert console.toPlainText() == ""  # Nothing is shown until the next tick
+
+    qtbot.waitUntil(lambda: "line 24" in console.toPlainText())
+    lines = console.toPlainText().splitlines()
+    assert lines[0] == "line 16"
+    assert lines[-1] == "line 24"
+    assert len(log_path.read_text().splitlines()) == 25  # noqa: PLR2004
+
+    console.clear()
+    assert not log_path.exists()
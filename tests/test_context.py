@@ -0,0 +1,128 @@
+"""Test graphics.Context drawing into a shared framebuffer."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("cairo")
+
+import pygame
+
+from peyote.graphics import Context
+from peyote.util.framebuffer import Framebuffer
+
+TRANSLUCENT = (255, 128, 0, 128)
+
+
+@pytest.fixture
+def premultiplied() -> Framebuffer:
+    """Return a premultiplied framebuffer like the display's."""
+    return Framebuffer(8, 6, premultiplied=True)
+
+
+def test_pygame_writes_premultiplied(premultiplied: Framebuffer) -> None:
+    """Test that pygame drawing stores valid premultiplied pixels."""
+    context = Context({}, (8, 6), framebuffer=premultiplied)
+    context.clear(TRANSLUCENT)
+    assert (premultiplied.rgb == (128, 64, 0)).all()
+    assert (premultiplied.to_rgba() == TRANSLUCENT).all()
+
+    context.set_pixel(1, 2, (0, 0, 255, 64))
+    assert tuple(premultiplied.rgb[2, 1]) == (0, 0, 64)
+    assert tuple(context.get_pixel(1, 2)) == (0, 0, 255, 64)
+
+
+def test_blit_premultiplied(premultiplied: Framebuffer) -> None:
+    """Test that blits blend straight colors and leave other pixels alone."""
+    context = Context({}, (8, 6), framebuffer=premultiplied)
+    context.clear(TRANSLUCENT)
+    sprite = pygame.Surface((2, 2), pygame.SRCALPHA)
+    sprite.fill((0, 0, 255, 255))
+    context.blit(sprite, (3, 3))
+
+    rgba = premultiplied.to_rgba()
+    assert (rgba[3:5, 3:5] == (0, 0, 255, 255)).all()
+    rgba[3:5, 3:5] = TRANSLUCENT
+    assert (rgba == TRANSLUCENT).all()
+
+
+@pytest.mark.parametrize("premultiplied", [False, True])
+def test_set_and_get_pixels(premultiplied: bool) -> None:
+    """Test the batch pixel API against a plain framebuffer."""
+    framebuffer = Framebuffer(8, 6, premultiplied=premultiplied)
+    framebuffer.take_damage()
+    context = Context({}, (8, 6), framebuffer=framebuffer)
+    xs = np.array([0, 7, 3, 9, -1])
+    ys = np.array([0, 5, 2, 1, 1])
+    colors = np.array(
+        [(255, 0, 0, 255), (0, 255, 0, 255), TRANSLUCENT, (1, 2, 3, 4), (5, 6, 7, 8)],
+    )
+    context.set_pixels(xs, ys, colors)
+
+    # Coordinates outside the surface are dropped, like pygame's set_at
+    np.testing.assert_array_equal(context.get_pixels(xs, ys), colors[:3])
+    assert tuple(framebuffer.rgb[5, 7]) == (0, 255, 0)
+    assert framebuffer.take_damage()[1] == [(0, 0, 8, 6)]
+
+    # One RGB color is broadcast to every pixel and is opaque
+    context.set_pixels([1, 2], [3, 3], (10, 20, 30))
+    np.testing.assert_array_equal(
+        context.get_pixels([1, 2], [3, 3]),
+        [(10, 20, 30, 255)] * 2,
+    )
+    assert framebuffer.take_damage()[1] == [(1, 3, 2, 1)]
+
+
+def test_blend_pixels(premultiplied: Framebuffer) -> None:
+    """Test that blended pixels match a source-over blend."""
+    context = Context({}, (8, 6), framebuffer=premultiplied)
+    context.clear((0, 0, 255))
+    context.blend_pixels([2, 2], [1, 1], (255, 0, 0), alpha=0.5)
+    # The pixel is hit twice, and each hit blends onto the result of the last
+    red, green, blue, alpha = context.get_pixels([2], [1])[0].astype(int)
+    assert (red, green, blue, alpha) == pytest.approx((191, 0, 64, 255), abs=1)
+
+
+def test_cairo_context_persists() -> None:
+    """Test that one cairo context is reused across frames until size()."""
+    namespace = {}
+    context = Context(namespace, (8, 6))
+    with context as cr:
+        cr.set_line_width(5.0)
+    with context as cr_next_frame:
+        assert cr_next_frame is cr
+
+    context.size(16, 12)
+    with context as resized:
+        assert resized is not cr
+        assert resized.get_line_width() == 5.0  # Drawing state carries over
+    assert (namespace["WIDTH"], namespace["HEIGHT"]) == (16, 12)
+    assert (context.framebuffer.w, context.framebuffer.h) == (16, 12)
+
+    context.size(16, 12)
+    with context as same_size:
+        assert same_size is resized
+
+
+def test_size_keeps_shared_framebuffer(premultiplied: Framebuffer) -> None:
+    """Test that a Context can't silently leave a framebuffer it was given."""
+    context = Context({}, (8, 6), framebuffer=premultiplied)
+    context.size(8, 6)
+    with pytest.raises(ValueError, match="shared 8x6 framebuffer"):
+        context.size(16, 12)
+    assert context.framebuffer is premultiplied
+
+
+def test_cairo_follows_tile_placement(premultiplied: Framebuffer) -> None:
+    """Test that cairo draws in canvas coordinates on a poster tile."""
+    premultiplied.origin = (40, 30)
+    premultiplied.scale = 2.0
+    context = Context({}, (8, 6), framebuffer=premultiplied)
+    with context as cr:
+        cr.translate(1, 0)
+        assert cr.user_to_device(20, 15) == (2, 0)
+
+    # Only the sketch's own transform is kept for the next tile
+    premultiplied.origin = (0, 0)
+    with context as cr:
+        assert cr.user_to_device(0, 0) == (2, 0)
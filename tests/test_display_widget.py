@@ -0,0 +1,63 @@
+"""Test damage tracking and partial repaints of the display widget."""
+
+import numpy as np
+import pytest
+from PySide6.QtCore import QRect
+
+from peyote.ide.display_widget import FramebufferWidget, OffscreenWidget
+from peyote.util.framebuffer import BYTE_ORDER
+
+
+def make_widget(qtbot, monkeypatch) -> tuple[FramebufferWidget, list]:  # noqa: ANN001
+    """Create a widget that records the regions it is asked to repaint."""
+    widget = FramebufferWidget(64, 48)
+    qtbot.addWidget(widget)
+    widget.framebuffer.take_damage()
+    updates = []
+    monkeypatch.setattr(widget, "update", lambda region: updates.append(list(region)))
+    return widget, updates
+
+
+def test_idle_frames_do_not_repaint(qtbot, monkeypatch) -> None:  # noqa: ANN001
+    """Test that presenting an unchanged frame schedules nothing."""
+    widget, updates = make_widget(qtbot, monkeypatch)
+    widget.present()
+    widget.present()
+    assert updates == []
+    assert widget.presented_generation == 0
+
+
+def test_only_damage_is_repainted(qtbot, monkeypatch) -> None:  # noqa: ANN001
+    """Test that only marked rectangles are copied and repainted."""
+    widget, updates = make_widget(qtbot, monkeypatch)
+    widget.set_double_buffered(True)
+
+    widget.framebuffer.rgb[...] = 200
+    widget.mark_dirty(4, 5, 6, 7)
+    widget.present()
+
+    assert updates == [[QRect(4, 5, 6, 7)]]
+    assert widget.presented_generation == widget.framebuffer.generation
+    front = np.zeros((48, 64), dtype=bool)
+    front[5:12, 4:10] = True
+    copied = (widget.front_buf[..., :3] == 200).all(axis=-1)
+    np.testing.assert_array_equal(copied, front)
+
+
+def test_sketch_views_mark_everything(qtbot, monkeypatch) -> None:  # noqa: ANN001
+    """Test that handing out a writable view damages the whole frame."""
+    widget, updates = make_widget(qtbot, monkeypatch)
+    widget.rgb[0, 0] = (255, 0, 0)
+    widget.present()
+    assert updates == [[QRect(0, 0, 64, 48)]]
+
+
+def test_buf_is_deprecated() -> None:
+    """Test that display.buf warns that it no longer holds RGBA."""
+    widget = OffscreenWidget(4, 4)
+    widget.rgb[...] = (255, 0, 0)
+    with pytest.warns(FutureWarning, match="not RGBA"):
+        buf = widget.buf
+    assert buf is widget.raw
+    assert (buf[..., BYTE_ORDER.index("R")] == 255).all()
+    assert (buf[..., BYTE_ORDER.index("B")] == 0).all()
@@ -0,0 +1,137 @@
+"""Test running sketches on the render thread."""
+
+import gc
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from peyote.ide.display_widget import FramebufferWidget
+from peyote.ide.execution_engine import SketchExecutor
+from peyote.util.framebuffer import BYTE_ORDER
+
+# Each frame is drawn in two halves, with the render thread held in between
+# until the test releases it
+HALVES_SKETCH = """
+import threading
+
+gate = threading.Event()
+started = 0
+finished = 0
+
+
+def draw():
+    global started, finished
+    started += 1
+    display.rgb[: HEIGHT // 2] = (started, 0, 0)
+    gate.wait(10)
+    gate.clear()
+    display.rgb[HEIGHT // 2 :] = (started, 0, 0)
+    finished += 1
+"""
+
+FAILING_SKETCH = """
+def draw():
+    raise RuntimeError("broken sketch")
+"""
+
+SETUP_FAILING_SKETCH = """
+def setup():
+    raise RuntimeError("broken setup")
+
+
+def draw():
+    pass
+"""
+
+
+@pytest.fixture
+def console() -> list[str]:
+    """Return a list collecting the executor's console output."""
+    return []
+
+
+@pytest.fixture
+def executor(  # noqa: ANN201
+    qtbot,  # noqa: ANN001
+    console: list[str],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Return an executor running sketches on the render thread."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    widget = FramebufferWidget(16, 8)
+    qtbot.addWidget(widget)
+    executor = SketchExecutor(widget, console.append, execution_mode="thread")
+    yield executor
+    executor.stop()
+
+
+def reds(buf: np.ndarray) -> set[int]:
+    """Return the distinct red values of a display buffer."""
+    return set(np.unique(buf[..., BYTE_ORDER.index("R")]).tolist())
+
+
+def test_frames_are_handed_off_whole(qtbot, executor: SketchExecutor) -> None:  # noqa: ANN001
+    """Test that the display only shows frames draw() has finished."""
+    assert executor.load_and_run({"main": HALVES_SKETCH}, "main")
+    sketch = executor.main_module
+    display = executor.display_widget
+    assert display.front_buf is not display.framebuffer.array
+
+    qtbot.waitUntil(lambda: sketch.started == 1)
+    assert reds(display.front_buf) == {0}  # Nothing presented yet
+
+    sketch.gate.set()
+    qtbot.waitUntil(lambda: sketch.started == 2)  # noqa: PLR2004
+    # Frame 2 is half drawn, but the display holds all of frame 1
+    assert reds(display.framebuffer.array) == {1, 2}
+    assert reds(display.front_buf) == {1}
+
+    threading.Timer(0.1, sketch.gate.set).start()
+    executor.stop()
+
+
+def test_stop_waits_for_the_frame(qtbot, executor: SketchExecutor) -> None:  # noqa: ANN001
+    """Test that stopping while draw() runs lets the frame finish first."""
+    assert executor.load_and_run({"main": HALVES_SKETCH}, "main")
+    sketch = executor.main_module
+    qtbot.waitUntil(lambda: sketch.started == 1)
+
+    threading.Timer(0.1, sketch.gate.set).start()
+    executor.stop()
+
+    assert (sketch.started, sketch.finished) == (1, 1)
+    assert executor.render_thread is None
+    assert not executor.is_running
+    # The display paints its own framebuffer again
+    display = executor.display_widget
+    assert display.front_buf is display.framebuffer.array
+
+
+def test_draw_error_stops_the_thread(
+    qtbot,  # noqa: ANN001
+    executor: SketchExecutor,
+    console: list[str],
+) -> None:
+    """Test that an error in draw() on the render thread is reported."""
+    assert executor.load_and_run({"main": FAILING_SKETCH}, "main")
+    qtbot.waitUntil(lambda: not executor.is_running)
+    assert executor.render_thread is None
+    text = "".join(console)
+    assert "Error in draw()" in text
+    assert "broken sketch" in text
+
+
+@pytest.mark.parametrize(
+    "source",
+    [SETUP_FAILING_SKETCH, "def setup():\n    pass\n"],
+    ids=["setup-error", "no-draw"],
+)
+def test_gc_hook_only_while_running(executor: SketchExecutor, source: str) -> None:
+    """Test that a sketch that never starts drawing leaves no gc callback."""
+    callbacks = list(gc.callbacks)
+    executor.load_and_run({"main": source}, "main")
+    assert not executor.is_running
+    assert gc.callbacks == callbacks
@@ -0,0 +1,107 @@
+"""Test the streaming still image writers."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from peyote.ide.export import (
+    AnimationWriter,
+    ImageWriter,
+    PngSequenceWriter,
+    open_animation_writer,
+    open_image_writer,
+)
+
+
+@pytest.mark.parametrize("name", ["out.png", "out.tif"])
+def test_image_writer_round_trip(tmp_path: Path, name: str) -> None:
+    """Test that rows written in bands read back unchanged."""
+    rng = np.random.default_rng(0)
+    rgba = rng.integers(0, 256, (70, 50, 4), dtype=np.uint8)
+    path = tmp_path / name
+    with open_image_writer(path, 50, 70, compress_level=1) as writer:
+        for y in range(0, 70, 32):
+            writer.write_rows(rgba[y : y + 32])
+
+    with Image.open(path) as image:
+        assert image.mode == "RGBA"
+        assert np.array_equal(np.asarray(image), rgba)
+
+
+def test_image_writer_incomplete(tmp_path: Path) -> None:
+    """Test that an image missing rows is not left behind."""
+    path = tmp_path / "out.png"
+    writer = open_image_writer(path, 8, 8)
+    writer.write_rows(np.zeros((4, 8, 4), dtype=np.uint8))
+    with pytest.raises(ValueError, match="4 of 8 rows"):
+        writer.close()
+    assert not path.exists()
+
+
+def test_image_writer_format(tmp_path: Path) -> None:
+    """Test that unknown suffixes are rejected."""
+    with pytest.raises(ValueError, match="Unsupported"):
+        open_image_writer(tmp_path / "out.bmp", 8, 8)
+
+
+def write_then_fail(path: Path, *, threaded: bool) -> None:
+    """Add two frames to an animation, then fail inside its with block."""
+    frame = np.zeros((8, 8, 4), dtype=np.uint8)
+    with open_animation_writer(path, threaded=threaded) as writer:
+        writer.add_frame(frame)
+        writer.add_frame(frame)
+        msg = "draw failed"
+        raise RuntimeError(msg)
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_animation_discarded_on_error(tmp_path: Path, threaded: bool) -> None:
+    """Test that an animation interrupted by an error is not left behind."""
+    path = tmp_path / "out.gif"
+    with pytest.raises(RuntimeError, match="draw failed"):
+        write_then_fail(path, threaded=threaded)
+    assert not path.exists()
+
+
+def test_writer_bases_are_abstract(tmp_path: Path) -> None:
+    """Test that the writer base classes can't be used on their own."""
+    with pytest.raises(TypeError, match="abstract"):
+        AnimationWriter(tmp_path / "out.gif")
+    with pytest.raises(TypeError, match="abstract"):
+        ImageWriter(tmp_path / "out.png", 8, 8)
+    assert not list(tmp_path.iterdir())
+
+
+def test_png_sequence_writer(tmp_path: Path) -> None:
+    """Test that frames are encoded in parallel and reported in order."""
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, (10, 12, 16, 4), dtype=np.uint8)
+    buf = np.empty_like(frames[0])
+    written = []
+    with PngSequenceWriter(
+        tmp_path,
+        jobs=2,
+        queue_size=3,
+        compress_level=1,
+        on_frame=lambda index, path: written.append((index, path.name)),
+    ) as writer:
+        for frame in frames:
+            # One buffer redrawn every frame, as a sketch's framebuffer is
+            buf[...] = frame
+            writer.add_frame(buf)
+            assert writer.pending <= 3  # Backpressure bounds the queue
+
+    assert written == [(i, f"frame_{i:05d}.png") for i in range(10)]
+    for index, name in written:
+        with Image.open(tmp_path / name) as image:
+            assert np.array_equal(np.asarray(image), frames[index])
+
+
+def test_png_sequence_writer_error(tmp_path: Path) -> None:
+    """Test that a frame that can't be written is reported."""
+    writer = PngSequenceWriter(tmp_path, "missing/frame_{:05d}.png", jobs=1)
+    writer.add_frame(np.zeros((4, 4, 4), dtype=np.uint8))
+    with pytest.raises(OSError, match="Failed to write frame"):
+        writer.close()
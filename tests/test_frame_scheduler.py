@@ -0,0 +1,84 @@
+"""Test frame pacing in peyote.ide.frame_scheduler."""
+
+import pytest
+
+from peyote.ide.frame_scheduler import FrameScheduler
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def _run_frame(scheduler: FrameScheduler, clock: FakeClock, draw_time: float) -> None:
+    """Advance the clock to the next frame and draw it."""
+    clock.now += max(scheduler.time_until_next_frame(), 0.0)
+    scheduler.begin_frame()
+    clock.now += draw_time
+    scheduler.end_frame()
+
+
+def test_short_lateness_is_caught_up() -> None:
+    """Test that a frame starting late keeps the frame grid."""
+    clock = FakeClock()
+    scheduler = FrameScheduler(10, clock=clock)
+
+    _run_frame(scheduler, clock, 0.01)
+    clock.now = 0.15  # Half an interval late
+    scheduler.begin_frame()
+
+    assert scheduler.time_until_next_frame() == pytest.approx(0.05)
+    assert scheduler.dropped_frames == 0
+
+
+def test_missed_frames_are_dropped() -> None:
+    """Test that a slow draw() drops whole frame slots instead of bursting."""
+    clock = FakeClock()
+    scheduler = FrameScheduler(10, clock=clock)
+
+    _run_frame(scheduler, clock, 0.35)
+    _run_frame(scheduler, clock, 0.0)
+
+    assert scheduler.dropped_frames == 2
+    assert scheduler.time_until_next_frame() == pytest.approx(0.05)
+
+
+def test_no_loop_and_redraw() -> None:
+    """Test noLoop(), redraw() and loop() from the sketch API."""
+    clock = FakeClock()
+    scheduler = FrameScheduler(clock=clock)
+    api = scheduler.sketch_api()
+
+    api["noLoop"]()
+    assert scheduler.time_until_next_frame() == 0.0  # First frame still draws
+    _run_frame(scheduler, clock, 0.0)
+    assert scheduler.time_until_next_frame() is None
+
+    api["redraw"]()
+    _run_frame(scheduler, clock, 0.0)
+    assert scheduler.time_until_next_frame() is None
+
+    api["loop"]()
+    assert scheduler.time_until_next_frame() == 0.0
+    assert scheduler.frame_count == 2
+
+
+def test_frame_rate() -> None:
+    """Test setting and measuring the frame rate."""
+    clock = FakeClock()
+    scheduler = FrameScheduler(clock=clock)
+    frame_rate = scheduler.sketch_api()["frameRate"]
+
+    frame_rate(20)
+    for _ in range(5):
+        _run_frame(scheduler, clock, 0.01)
+
+    assert frame_rate() == pytest.approx(20)
+    assert scheduler.draw_time == pytest.approx(0.01)
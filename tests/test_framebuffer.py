@@ -0,0 +1,163 @@
+"""Test the framebuffer shared by NumPy, Qt, cairo and pygame."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from peyote.util.framebuffer import (
+    MAX_DAMAGE_RECTS,
+    Framebuffer,
+    pack_color,
+    premultiply,
+    unpremultiply,
+)
+
+
+@pytest.fixture
+def framebuffer() -> Framebuffer:
+    """Return a small framebuffer with one colored pixel."""
+    framebuffer = Framebuffer(5, 3)
+    framebuffer.rgb[1, 2] = (10, 20, 30)
+    framebuffer.alpha[1, 2] = 40
+    return framebuffer
+
+
+def test_views_share_memory(framebuffer: Framebuffer) -> None:
+    """Test that every NumPy view sees the same pixel."""
+    assert np.shares_memory(framebuffer.rgb, framebuffer.array)
+    assert np.shares_memory(framebuffer.pixels, framebuffer.array)
+    assert framebuffer.pixels[1, 2] == 0x280A141E  # 0xAARRGGBB
+    assert framebuffer.pixels[1, 2] == pack_color((10, 20, 30, 40))
+    assert tuple(framebuffer.to_rgba()[1, 2]) == (10, 20, 30, 40)
+
+
+def test_fill(framebuffer: Framebuffer) -> None:
+    """Test that an RGB fill is opaque."""
+    framebuffer.fill((1, 2, 3))
+    assert (framebuffer.rgb == (1, 2, 3)).all()
+    assert (framebuffer.alpha == 255).all()
+
+
+def test_wrap_rejects_bad_layout() -> None:
+    """Test that only row-contiguous (h, w, 4) uint8 memory is wrapped."""
+    with pytest.raises(ValueError, match="Expected"):
+        Framebuffer(5, 3, np.zeros((3, 5, 3), dtype=np.uint8))
+    with pytest.raises(ValueError, match="contiguous"):
+        Framebuffer(5, 3, np.zeros((5, 3, 4), dtype=np.uint8).transpose(1, 0, 2))
+
+
+def test_qimage_is_a_view(framebuffer: Framebuffer) -> None:
+    """Test that QImage reads and QPainter writes the same memory."""
+    from PySide6.QtGui import QColor, QPainter
+
+    image = framebuffer.qimage()
+    assert image.pixelColor(2, 1).getRgb() == (10, 20, 30, 40)
+
+    painter = QPainter(image)
+    painter.fillRect(0, 0, 1, 1, QColor(200, 100, 50))
+    painter.end()
+    assert tuple(framebuffer.rgb[0, 0]) == (200, 100, 50)
+
+
+def test_pygame_surface_is_a_view(framebuffer: Framebuffer) -> None:
+    """Test that the pygame surface reads and writes the same memory."""
+    pygame = pytest.importorskip("pygame")
+
+    surface = framebuffer.pygame_surface()
+    assert tuple(surface.get_at((2, 1))) == (10, 20, 30, 40)
+    surface.fill(pygame.Color(7, 8, 9, 255), pygame.Rect(4, 2, 1, 1))
+    assert tuple(framebuffer.rgb[2, 4]) == (7, 8, 9)
+
+
+def test_damage_tracking() -> None:
+    """Test that damage is clipped, counted and taken once."""
+    framebuffer = Framebuffer(10, 8)
+    assert framebuffer.take_damage() == (0, [])
+
+    framebuffer.mark_dirty(2, 3, 4, 2)
+    framebuffer.mark_dirty(8, 6, 5, 5)  # Clipped to the bottom right corner
+    framebuffer.mark_dirty(20, 0, 1, 1)  # Outside: ignored
+    assert framebuffer.take_damage() == (2, [(2, 3, 4, 2), (8, 6, 2, 2)])
+    assert framebuffer.take_damage() == (2, [])
+
+    framebuffer.fill((1, 2, 3))
+    framebuffer.mark_dirty(1, 1, 1, 1)
+    assert framebuffer.take_damage() == (4, [(0, 0, 10, 8)])
+
+
+def test_damage_is_merged() -> None:
+    """Test that many small rectangles collapse into their bounding box."""
+    framebuffer = Framebuffer(100, 100)
+    for i in range(MAX_DAMAGE_RECTS + 1):
+        framebuffer.mark_dirty(i, 2 * i, 1, 1)
+    _, rects = framebuffer.take_damage()
+    assert rects == [(0, 0, MAX_DAMAGE_RECTS + 1, 2 * MAX_DAMAGE_RECTS + 1)]
+
+
+def test_premultiplied_round_trip() -> None:
+    """Test that premultiplied pixels export as straight RGBA."""
+    framebuffer = Framebuffer(4, 2, premultiplied=True)
+    framebuffer.fill((255, 128, 0, 128))
+    assert tuple(framebuffer.rgb[0, 0]) == (128, 64, 0)
+    assert tuple(framebuffer.to_rgba()[1, 3]) == (255, 128, 0, 128)
+
+    framebuffer.fill((0, 0, 0, 0))
+    assert (framebuffer.to_rgba() == 0).all()
+
+
+def test_premultiply_inverse() -> None:
+    """Test that unpremultiply undoes premultiply up to rounding."""
+    rgb = np.arange(256, dtype=np.uint8)[:, np.newaxis].repeat(3, axis=1)
+    for alpha in (1, 64, 128, 255):
+        premultiplied = premultiply(rgb, alpha)
+        np.testing.assert_array_equal(
+            premultiply(unpremultiply(premultiplied, alpha), alpha),
+            premultiplied,
+        )
+    np.testing.assert_array_equal(unpremultiply(premultiply(rgb, 255), 255), rgb)
+
+
+def test_premultiplied_qimage() -> None:
+    """Test that Qt reads premultiplied pixels in its native format."""
+    from PySide6.QtGui import QImage
+
+    framebuffer = Framebuffer(2, 2, premultiplied=True)
+    framebuffer.fill((200, 100, 50, 128))
+    image = framebuffer.qimage()
+    assert image.format() == QImage.Format.Format_ARGB32_Premultiplied
+    red, green, blue, alpha = image.pixelColor(1, 1).getRgb()
+    assert alpha == 128
+    assert abs(red - 200) <= 1
+    assert abs(green - 100) <= 1
+    assert abs(blue - 50) <= 1
+
+
+def test_file_backed(tmp_path: Path) -> None:
+    """Test that a raw frame file keeps its pixels and header across opens."""
+    path = tmp_path / "canvas.raw"
+    framebuffer = Framebuffer.create_file(path, 6, 4, premultiplied=True)
+    assert isinstance(framebuffer.array, np.memmap)
+    assert (framebuffer.array == 0).all()  # Sparse file, transparent black
+    framebuffer.fill((255, 128, 0, 128))
+    framebuffer.flush()
+    del framebuffer
+
+    reopened = Framebuffer.open_file(path, readonly=True)
+    assert (reopened.w, reopened.h, reopened.premultiplied) == (6, 4, True)
+    assert (reopened.to_rgba() == (255, 128, 0, 128)).all()
+    assert not reopened.array.flags.writeable
+
+
+def test_file_rejects_other_files(tmp_path: Path) -> None:
+    """Test that files that aren't whole raw frames are refused."""
+    path = tmp_path / "canvas.raw"
+    path.write_bytes(b"not a frame")
+    with pytest.raises(ValueError, match="not a raw frame file"):
+        Framebuffer.open_file(path)
+
+    Framebuffer.create_file(path, 4, 4)
+    with path.open("r+b") as f:
+        f.truncate(100)
+    with pytest.raises(ValueError, match="truncated"):
+        Framebuffer.open_file(path)
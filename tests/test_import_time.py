@@ -0,0 +1,84 @@
+"""Test peyote CLI cold-start: heavy dependencies stay unloaded."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("PySide6", "numpy", "pydantic", "pydantic_settings")
+
+# The global callback loads the settings (and pydantic) once a subcommand is
+# dispatched, but only the subcommand itself may load Qt and NumPy
+GUI_MODULES = ("PySide6", "numpy")
+
+# Generous enough for slow CI machines; importing PySide6, NumPy and
+# pydantic eagerly took several times longer than a bare import
+MAX_IMPORT_SECONDS = 1.0
+
+_PROBE = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import peyote.__main__
+elapsed = time.perf_counter() - start
+
+args = sys.argv[1:]
+if args:
+    from typer.testing import CliRunner
+
+    CliRunner().invoke(peyote.__main__.cli, args)
+
+heavy = {heavy!r}
+loaded = sorted(name for name in heavy if name in sys.modules)
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def probe(*args: str) -> dict:
+    """Import the CLI in a fresh interpreter, optionally running it.
+
+    Args:
+        *args: Command-line arguments to invoke the CLI with
+
+    Returns:
+        Dictionary with the import time in seconds and the heavy modules
+        that were loaded
+
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_import_does_not_load_heavy_modules() -> None:
+    """Test that importing the CLI loads no heavy dependencies."""
+    assert probe()["loaded"] == []
+
+
+def test_root_help_does_not_load_heavy_modules() -> None:
+    """Test that the top-level help loads no heavy dependencies."""
+    assert probe("--help")["loaded"] == []
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["self", "version"], ["smoke", "--help"], ["render", "frames", "--help"]],
+)
+def test_subcommands_do_not_load_gui_modules(args: list[str]) -> None:
+    """Test that light subcommands load neither Qt nor NumPy."""
+    loaded = probe(*args)["loaded"]
+    assert not set(loaded) & set(GUI_MODULES)
+
+
+def test_import_time() -> None:
+    """Test that importing the CLI stays fast."""
+    # Best of three, to keep a busy machine from failing the test
+    elapsed = min(probe()["elapsed"] for _ in range(3))
+    assert elapsed < MAX_IMPORT_SECONDS
@@ -0,0 +1,83 @@
+"""Test the array-aware interpolation helpers."""
+
+import numpy as np
+import pytest
+
+from peyote.util import interp
+
+
+def test_scalars_stay_scalars() -> None:
+    """Test that scalar inputs give the same results as before."""
+    assert interp.norm(5, 0, 10) == pytest.approx(0.5)
+    assert interp.lerp(0, 10, 0.25) == pytest.approx(2.5)
+    assert interp.remap(5, 0, 10, 100, 200) == pytest.approx(150)
+    assert interp.shiftPosToCenter(10, 4) == pytest.approx(8)
+
+
+def test_broadcasting() -> None:
+    """Test that sequences and arrays broadcast against each other."""
+    values = np.array([[0.0, 5.0], [10.0, 2.5]])
+    np.testing.assert_allclose(
+        interp.remap(values, 0, 10, [100, 0], 200),
+        [[100, 100], [200, 50]],
+    )
+    np.testing.assert_allclose(interp.lerp([0, 10], [10, 20], 0.5), [5, 15])
+
+
+def test_sequence_bounds() -> None:
+    """Test that range bounds may be sequences too."""
+    np.testing.assert_allclose(interp.norm(5, [0, 1], 10), [0.5, 4 / 9])
+    np.testing.assert_allclose(interp.remap(5, [0, 0], 10, 0, 1), [0.5, 0.5])
+
+
+@pytest.mark.parametrize("name", sorted(interp.EASINGS))
+def test_easings_keep_scalars_scalar(name: str) -> None:
+    """Test that every easing returns a scalar for a scalar input."""
+    assert np.ndim(interp.ease(name, 0.5)) == 0
+    assert not isinstance(interp.ease(name, 0.5), np.ndarray)
+    assert interp.ease(name, np.array([0.5])).shape == (1,)
+
+
+def test_remap_object_matches_remap() -> None:
+    """Test that a precomputed Remap matches remap() and inverts."""
+    values = np.linspace(-3, 13, 17)
+    to_screen = interp.Remap(0, 10, 100, 200)
+    np.testing.assert_allclose(to_screen(values), interp.remap(values, 0, 10, 100, 200))
+    np.testing.assert_allclose(to_screen.inverse()(to_screen(values)), values)
+
+    out = np.empty_like(values)
+    assert to_screen(values, out=out) is out
+
+    clamped = interp.Remap(0, 10, 200, 100, clamp=True)
+    np.testing.assert_allclose(clamped([-5, 5, 15]), [200, 150, 100])
+
+
+def test_constrain_and_smoothstep() -> None:
+    """Test constrain() and smoothstep() over arrays."""
+    np.testing.assert_allclose(interp.constrain([-1, 5, 20], 0, 10), [0, 5, 10])
+    np.testing.assert_allclose(
+        interp.smoothstep(0, 2, [-1, 0, 1, 2, 3]),
+        [0, 0, 0.5, 1, 1],
+    )
+
+
+def test_lerp_color() -> None:
+    """Test that lerpColor() gives one color per amount."""
+    colors = interp.lerpColor((255, 0, 0), (0, 0, 255), [0, 0.5, 1])
+    assert colors.dtype == np.uint8
+    np.testing.assert_array_equal(colors, [[255, 0, 0], [128, 0, 128], [0, 0, 255]])
+
+
+@pytest.mark.parametrize("name", sorted(interp.EASINGS))
+def test_easings_are_monotonic_from_0_to_1(name: str) -> None:
+    """Test that each easing curve rises from 0 to 1."""
+    values = interp.ease(name, np.linspace(0, 1, 101))
+    assert values[0] == pytest.approx(0, abs=1e-9)
+    assert values[-1] == pytest.approx(1, abs=1e-9)
+    assert (np.diff(values) >= -1e-12).all()
+
+
+def test_unknown_easing() -> None:
+    """Test that an unknown easing name lists the known ones."""
+    with pytest.raises(KeyError, match="easeInQuad"):
+        interp.ease("bounce", 0.5)
@@ -0,0 +1,105 @@
+"""Test hot reload support in peyote.ide.module_loader."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from peyote.ide.module_loader import ModuleLoader, compile_module
+from peyote.ide.package_manager import PackageManager
+
+
+def test_plan_reload_includes_dependents(tmp_path: Path) -> None:
+    """Test that importers of a changed module are reloaded after it."""
+    loader = ModuleLoader()
+    loader.package_path = tmp_path / "pkg"
+    sources = {
+        "sketch": "from .shapes import draw_shape\n",
+        "shapes": "from pkg import colors\n",
+        "colors": "RED = (255, 0, 0)\n",
+        "unrelated": "import math\n",
+    }
+
+    assert loader.plan_reload(sources, {"colors"}) == ["colors", "shapes", "sketch"]
+    assert loader.plan_reload(sources, {"unrelated"}) == ["unrelated"]
+
+
+def test_reexecute_preserves_globals(tmp_path: Path) -> None:
+    """Test that modules are re-executed in place keeping __preserve__ names."""
+    package_dir = tmp_path / "hot_reload_pkg"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    source = "__preserve__ = ['state']\nstate = []\nspeed = 1\n"
+    (package_dir / "sketch.py").write_text(source)
+
+    loader = ModuleLoader()
+    try:
+        module = loader.load_package_modules(package_dir, ["sketch.py"])["sketch"]
+        loader.inject_globals({"WIDTH": 100})
+        module.state.append("frame")
+
+        new_source = source.replace("speed = 1", "speed = 2")
+        reloaded = loader.reexecute_modules(
+            package_dir,
+            {"sketch": new_source},
+            ["sketch"],
+        )
+
+        assert reloaded["sketch"] is module
+        assert module.speed == 2  # noqa: PLR2004
+        assert module.state == ["frame"]
+        assert module.WIDTH == 100  # noqa: PLR2004
+    finally:
+        loader.unload_all()
+
+
+def test_failed_reexecute_removes_new_modules(tmp_path: Path) -> None:
+    """Test that a failed reload leaves no newly imported modules behind."""
+    package_dir = tmp_path / "failed_reload_pkg"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    (package_dir / "sketch.py").write_text("speed = 1\n")
+
+    loader = ModuleLoader()
+    try:
+        module = loader.load_package_modules(package_dir, ["sketch.py"])["sketch"]
+        (package_dir / "helper.py").write_text("SIZE = 3\n")
+        (package_dir / "shapes.py").write_text("SIDES = 4\n")
+        sources = {
+            "helper": "SIZE = 3\n",
+            "sketch": "from . import shapes\nraise RuntimeError('broken')\n",
+        }
+        with pytest.raises(RuntimeError, match="broken"):
+            loader.reexecute_modules(package_dir, sources, ["helper", "sketch"])
+
+        assert module.speed == 1
+        for name in ("helper", "shapes"):
+            assert f"failed_reload_pkg.{name}" not in sys.modules
+            assert f"failed_reload_pkg.{name}" not in loader.loaded_modules
+        assert "failed_reload_pkg.sketch" in sys.modules
+    finally:
+        loader.unload_all()
+
+
+def test_unchanged_modules_are_not_rewritten_or_recompiled(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that saving and loading the same source twice reuses both."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    manager = PackageManager("code_cache_sketch")
+    modules = {"sketch": "VALUE = 42\n"}
+
+    assert manager.write_module("stale", "")
+    manager.save_all_modules(modules, prune=True)
+    assert not manager.module_exists("stale")
+    assert not manager.write_module("sketch", modules["sketch"])
+
+    path = manager.get_module_path("sketch")
+    first = compile_module(modules["sketch"], path)
+    assert compile_module(modules["sketch"], path) is first
+    assert compile_module("VALUE = 43\n", path) is not first
+
+    # Same size but different content is still written
+    assert manager.write_module("sketch", "VALUE = 43\n")
+    assert path.read_text() == "VALUE = 43\n"
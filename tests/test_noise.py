@@ -0,0 +1,86 @@
+"""Test the vectorized noise functions."""
+
+import numpy as np
+import pytest
+
+from peyote.util import noise
+from peyote.util.noise import Noise
+
+
+@pytest.mark.parametrize("kind", ["perlin", "simplex"])
+@pytest.mark.parametrize("dims", [2, 3, 4])
+def test_noise_range_and_determinism(kind: str, dims: int) -> None:
+    """Test that noise stays in [-1, 1] and depends only on the seed."""
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(-100, 100, (dims, 20000))
+
+    values = getattr(Noise(7), kind)(*coords)
+    assert values.shape == (20000,)
+    assert np.abs(values).max() <= 1.0
+    assert values.std() > 0.1
+
+    np.testing.assert_array_equal(values, getattr(Noise(7), kind)(*coords))
+    assert not np.array_equal(values, getattr(Noise(8), kind)(*coords))
+
+
+@pytest.mark.parametrize("kind", ["perlin", "simplex"])
+def test_noise_matches_pointwise(kind: str) -> None:
+    """Test that a broadcast grid gives the same values as single points."""
+    field = Noise(1)
+    xs = np.linspace(0, 5, 7)
+    ys = np.linspace(-2, 2, 5)[:, np.newaxis]
+
+    grid = getattr(field, kind)(xs, ys, 0.5)
+    assert grid.shape == (5, 7)
+    for j, y in enumerate(ys[:, 0]):
+        for i, x in enumerate(xs):
+            assert grid[j, i] == pytest.approx(getattr(field, kind)(x, y, 0.5))
+
+
+def test_noise_is_continuous() -> None:
+    """Test that nearby points have nearby values."""
+    field = Noise(2)
+    xs = np.linspace(0, 10, 10001)
+    for kind in ("perlin", "simplex"):
+        values = getattr(field, kind)(xs, 0.37, 1.3, 2.1)
+        assert np.abs(np.diff(values)).max() < 0.05
+
+
+def test_perlin_is_zero_on_lattice() -> None:
+    """Test that Perlin noise vanishes at integer coordinates."""
+    xs, ys = np.mgrid[-3:4, -3:4]
+    np.testing.assert_allclose(Noise(3).perlin(xs, ys), 0.0, atol=1e-12)
+
+
+def test_fbm() -> None:
+    """Test that one octave is plain noise and bad arguments are rejected."""
+    field = Noise(4)
+    xs = np.linspace(0, 3, 50)
+    np.testing.assert_allclose(field.fbm(xs, 0.5, octaves=1), field.perlin(xs, 0.5))
+    assert np.abs(field.fbm(xs, 0.5, 1.5, octaves=6, kind="simplex")).max() <= 1.0
+
+    with pytest.raises(ValueError, match="Unknown noise kind"):
+        field.fbm(xs, 0.5, kind="value")
+    with pytest.raises(ValueError, match="octaves"):
+        field.fbm(xs, 0.5, octaves=0)
+    with pytest.raises(ValueError, match="4D"):
+        field.perlin(xs, 0.5, w=1.0)
+
+
+def test_processing_api() -> None:
+    """Test noise(), noiseSeed() and noiseDetail()."""
+    try:
+        noise.noiseSeed(5)
+        noise.noiseDetail(2, 0.4)
+        values = noise.noise(np.linspace(0, 20, 500), 0.3)
+        assert values.min() >= 0.0
+        assert values.max() <= 1.0
+
+        noise.noiseSeed(5)
+        np.testing.assert_array_equal(values, noise.noise(np.linspace(0, 20, 500), 0.3))
+        assert noise.pnoise3(0.1, 0.2, 0.3) == pytest.approx(
+            Noise(5).perlin(0.1, 0.2, 0.3),
+        )
+    finally:
+        noise.noiseSeed(0)
+        noise.noiseDetail(4, 0.5)
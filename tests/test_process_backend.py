@@ -0,0 +1,81 @@
+"""Test running a sketch in a separate process."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from peyote.ide.process_backend import SketchProcess
+from peyote.util.framebuffer import BYTE_ORDER
+
+SKETCH = """
+def setup():
+    print("hello from the sketch")
+
+
+def draw():
+    display.clear((255, 0, 0))
+    noLoop()
+"""
+
+FAILING_SKETCH = """
+def draw():
+    raise RuntimeError("broken")
+"""
+
+
+def wait_for(process: SketchProcess, kind: str, timeout: float = 30.0) -> list:
+    """Poll the process until a message of the given kind arrives."""
+    messages = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        messages += process.poll()
+        if any(message_kind == kind for message_kind, _ in messages):
+            return messages
+        time.sleep(0.01)
+    pytest.fail(f"No {kind!r} message within {timeout}s: {messages}")
+
+
+def test_start_frame_stop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a frame drawn in the sketch process reaches the front frame."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    process = SketchProcess(16, 8)
+    try:
+        process.start({"main": SKETCH}, "main")
+        messages = wait_for(process, "frame")
+        assert ("output", "hello from the sketch\n") in messages
+
+        count, _, damage = next(p for kind, p in messages if kind == "frame")
+        assert count == 1
+        assert damage == [(0, 0, 16, 8)]
+        with process.lock:
+            front = process.front_buf.copy()
+        assert (front[..., BYTE_ORDER.index("R")] == 255).all()
+        assert (front[..., BYTE_ORDER.index("G")] == 0).all()
+    finally:
+        process.stop()
+
+    assert process.process is None
+    process.stop()  # Teardown paths may stop it again
+    with pytest.raises(RuntimeError, match="stopped"):
+        _ = process.front_buf
+
+
+def test_error_is_reported_once(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a sketch error reaches the IDE as one error message."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    process = SketchProcess(16, 8)
+    try:
+        process.start({"main": FAILING_SKETCH}, "main")
+        messages = wait_for(process, "error")
+    finally:
+        process.stop()
+
+    errors = [payload for kind, payload in messages if kind == "error"]
+    assert len(errors) == 1
+    assert "RuntimeError: broken" in errors[0]
+    output = "".join(payload for kind, payload in messages if kind == "output")
+    assert "RuntimeError" not in output
@@ -0,0 +1,43 @@
+"""Test the per-frame profiler in peyote.ide.profiler."""
+
+import pytest
+
+from peyote.ide.profiler import FrameProfiler
+
+
+def test_ring_buffer_keeps_recent_frames() -> None:
+    """Test that the ring buffer wraps and summaries cover the latest frames."""
+    profiler = FrameProfiler(capacity=4)
+    for index in range(10):
+        profiler.add_frame(draw_time=index / 1000, start=index * 0.02)
+    profiler.record_paint(0.004)
+
+    records = profiler.recent()
+    assert list(records["draw"]) == pytest.approx([0.006, 0.007, 0.008, 0.009])
+    assert list(records["paint"]) == pytest.approx([0, 0, 0, 0.004])
+
+    stats = profiler.summary(2)
+    assert stats["fps"] == pytest.approx(50)
+    assert stats["draw_ms"] == pytest.approx(8.5)
+    assert stats["jitter_ms"] == pytest.approx(0)
+    assert "50.0 fps" in profiler.hud_text()
+
+
+def test_profile_next_reports_draw() -> None:
+    """Test that cProfile runs for the requested frames and then reports."""
+    reports = []
+    profiler = FrameProfiler()
+    profiler.on_report = reports.append
+
+    def draw() -> None:
+        sorted(range(1000), reverse=True)
+
+    profiler.profile_next(3)
+    for _ in range(3):
+        profiler.begin_frame()
+        draw()
+        profiler.end_frame()
+
+    assert profiler.frame_count == 3
+    assert len(reports) == 1
+    assert "draw" in reports[0]
@@ -0,0 +1,269 @@
+"""Test peyote render subcommand."""
+
+import importlib
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from typer.testing import CliRunner
+
+from peyote.ide.headless import HeadlessRenderer
+
+main_module_name = "peyote.__main__"
+main_module = importlib.import_module(main_module_name)
+runner = CliRunner()
+
+SKETCH = """
+def setup():
+    display.clear((0, 0, 0))
+
+
+def draw():
+    display.rgb[0, 0] = (255, 0, 0)
+"""
+
+
+@pytest.fixture
+def sketch_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Return a sketch package directory with an isolated data dir."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    sketch = tmp_path / "sketch"
+    sketch.mkdir()
+    (sketch / "main.py").write_text(SKETCH)
+    return sketch
+
+
+def test_render_help() -> None:
+    """Test the render subcommand help flag."""
+    result = runner.invoke(main_module.cli, ["render", "frames", "--help"])
+    assert result.exit_code == 0
+    assert "frames" in result.output.lower()
+
+
+def test_render_frames(sketch_dir: Path, tmp_path: Path) -> None:
+    """Test that frames are rendered to PNG files."""
+    output = tmp_path / "out"
+    result = runner.invoke(
+        main_module.cli,
+        ["render", "frames", str(sketch_dir), "-o", str(output), "-n", "3",
+         "-w", "32", "-h", "16"],
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in output.iterdir()) == [
+        "frame_00000.png",
+        "frame_00001.png",
+        "frame_00002.png",
+    ]
+
+
+def test_render_animation(sketch_dir: Path, tmp_path: Path) -> None:
+    """Test that frames are streamed into an animated GIF and APNG."""
+    for name in ("out.gif", "out.png"):
+        output = tmp_path / name
+        result = runner.invoke(
+            main_module.cli,
+            ["render", "animation", str(sketch_dir), "-o", str(output), "-n", "4",
+             "-w", "32", "-h", "16"],
+        )
+        assert result.exit_code == 0, result.output
+        with Image.open(output) as image:
+            assert image.n_frames == 4
+            assert image.size == (32, 16)
+            assert image.convert("RGB").getpixel((0, 0)) == (255, 0, 0)
+
+
+POSTER_SKETCH = """
+from PySide6.QtGui import QColor
+
+
+def draw():
+    painter = display.get_painter()
+    painter.fillRect(0, 0, WIDTH, HEIGHT, QColor(0, 0, 255))
+    painter.fillRect(10, 5, 20, 10, QColor(255, 0, 0))
+    painter.end()
+"""
+
+
+def test_render_poster(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a scaled poster is assembled from tiles into PNG and TIFF."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    sketch = tmp_path / "poster.py"
+    sketch.write_text(POSTER_SKETCH)
+    for name in ("out.png", "out.tif"):
+        output = tmp_path / name
+        result = runner.invoke(
+            main_module.cli,
+            ["render", "poster", str(sketch), "-o", str(output), "-w", "100",
+             "-h", "60", "--scale", "2", "--tile-size", "32"],
+        )
+        assert result.exit_code == 0, result.output
+        with Image.open(output) as image:
+            assert image.size == (100, 60)
+            # The red rectangle spans canvas units 10-30 x 5-15, across tiles
+            assert image.convert("RGB").getpixel((20, 10)) == (255, 0, 0)
+            assert image.convert("RGB").getpixel((59, 29)) == (255, 0, 0)
+            assert image.convert("RGB").getpixel((60, 30)) == (0, 0, 255)
+            assert image.convert("RGB").getpixel((99, 59)) == (0, 0, 255)
+
+
+CAIRO_POSTER_SKETCH = """
+from peyote.graphics import Context
+
+context = None
+
+
+def setup():
+    global context
+    context = Context({}, (display.w, display.h), framebuffer=display.framebuffer)
+
+
+def draw():
+    with context as cr:
+        cr.set_source_rgb(0, 0, 1)
+        cr.rectangle(0, 0, WIDTH, HEIGHT)
+        cr.fill()
+        cr.set_source_rgb(1, 0, 0)
+        cr.rectangle(10, 5, 20, 10)
+        cr.fill()
+"""
+
+
+def test_render_poster_cairo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that cairo drawing through a Context lands on the right tiles."""
+    pytest.importorskip("pygame")
+    pytest.importorskip("cairo")
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    sketch = tmp_path / "poster.py"
+    sketch.write_text(CAIRO_POSTER_SKETCH)
+    output = tmp_path / "out.png"
+    result = runner.invoke(
+        main_module.cli,
+        ["render", "poster", str(sketch), "-o", str(output), "-w", "100",
+         "-h", "60", "--scale", "2", "--tile-size", "32"],
+    )
+    assert result.exit_code == 0, result.output
+    with Image.open(output) as image:
+        rgb = image.convert("RGB")
+        # The red rectangle spans canvas units 10-30 x 5-15, across tiles
+        assert rgb.getpixel((20, 10)) == (255, 0, 0)
+        assert rgb.getpixel((59, 29)) == (255, 0, 0)
+        assert rgb.getpixel((60, 30)) == (0, 0, 255)
+        assert rgb.getpixel((99, 59)) == (0, 0, 255)
+
+
+def test_render_canvas(sketch_dir: Path, tmp_path: Path) -> None:
+    """Test rendering into a canvas file, resuming it and converting it."""
+    canvas = tmp_path / "canvas.raw"
+    args = ["render", "canvas", str(sketch_dir), "-o", str(canvas), "-n", "2",
+            "-w", "32", "-h", "16"]
+    result = runner.invoke(main_module.cli, args)
+    assert result.exit_code == 0, result.output
+    # Reopened with its pixels, but a different size is refused
+    assert runner.invoke(main_module.cli, args).exit_code == 0
+    result = runner.invoke(main_module.cli, [*args[:-4], "-w", "64", "-h", "16"])
+    assert result.exit_code == 1
+    assert "not 64x16" in result.output
+
+    output = tmp_path / "canvas.png"
+    result = runner.invoke(
+        main_module.cli,
+        ["render", "convert", str(canvas), "-o", str(output)],
+    )
+    assert result.exit_code == 0, result.output
+    with Image.open(output) as image:
+        assert image.size == (32, 16)
+        assert image.getpixel((0, 0)) == (255, 0, 0, 255)
+        assert image.getpixel((31, 15)) == (0, 0, 0, 255)
+
+
+NO_LOOP_SKETCH = """
+def setup():
+    noLoop()
+
+
+def draw():
+    display.clear((0, 0, 255))
+"""
+
+
+def test_render_no_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a sketch calling noLoop() in setup() still draws one frame."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    sketch = tmp_path / "still.py"
+    sketch.write_text(NO_LOOP_SKETCH)
+
+    output = tmp_path / "out"
+    result = runner.invoke(
+        main_module.cli,
+        ["render", "frames", str(sketch), "-o", str(output), "-n", "5",
+         "-w", "8", "-h", "8", "-j", "1"],
+    )
+    assert result.exit_code == 0, result.output
+    assert [p.name for p in output.iterdir()] == ["frame_00000.png"]
+
+    animation = tmp_path / "still.gif"
+    result = runner.invoke(
+        main_module.cli,
+        ["render", "animation", str(sketch), "-o", str(animation), "-n", "5",
+         "-w", "8", "-h", "8"],
+    )
+    assert result.exit_code == 0, result.output
+    with Image.open(animation) as image:
+        assert image.n_frames == 1
+        assert image.convert("RGB").getpixel((0, 0)) == (0, 0, 255)
+
+
+TILES_SKETCH = """
+import numpy as np
+
+
+def field(xs, ys):
+    return np.stack([xs, ys, xs + ys], axis=-1) % 256
+
+
+def draw():
+    renderTiles(field, tile_size=8)
+"""
+
+
+def test_render_canvas_tiles(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that RGB renderTiles() output in a new opaque canvas is visible."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    sketch = tmp_path / "tiles.py"
+    sketch.write_text(TILES_SKETCH)
+    canvas = tmp_path / "canvas.raw"
+    output = tmp_path / "canvas.png"
+    result = runner.invoke(
+        main_module.cli,
+        ["render", "canvas", str(sketch), "-o", str(canvas), "-w", "20", "-h", "12",
+         "--opaque"],
+    )
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(
+        main_module.cli,
+        ["render", "convert", str(canvas), "-o", str(output)],
+    )
+    assert result.exit_code == 0, result.output
+
+    with Image.open(output) as image:
+        assert image.getpixel((5, 7)) == (5, 7, 12, 255)
+        assert image.getpixel((19, 11)) == (19, 11, 30, 255)
+
+
+def test_renderers_use_separate_packages(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that each renderer saves into its own package and removes it."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    first, second = HeadlessRenderer(8, 8), HeadlessRenderer(8, 8)
+    first.load({"main": SKETCH}, "main")
+    second.load({"main": "def draw():\n    pass\n"}, "main")
+    package = first.package_manager.get_package_dir()
+    assert package != second.package_manager.get_package_dir()
+
+    second.unload()
+    assert (package / "main.py").read_text() == SKETCH
+    assert next(first.iter_frames(1)) == 0
+    first.unload()
+    assert not package.exists()
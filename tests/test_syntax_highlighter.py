@@ -0,0 +1,97 @@
+"""Test the single-pass Python syntax highlighter."""
+
+import pytest
+from PySide6.QtGui import QTextDocument
+from PySide6.QtWidgets import QPlainTextEdit
+
+from peyote.ide.syntax_highlighter import (
+    IN_TRIPLE_DOUBLE,
+    IN_TRIPLE_SINGLE,
+    NORMAL,
+    PythonSyntaxHighlighter,
+)
+
+SOURCE = '''def draw():
+    """Draw a frame.
+
+    if this were code, it would not be highlighted
+    """
+    return len("x")  # done
+'''
+
+
+class CountingHighlighter(PythonSyntaxHighlighter):
+    """Highlighter that records which blocks it highlighted."""
+
+    def __init__(self, parent: QTextDocument) -> None:
+        """Initialize the highlighter with an empty record."""
+        super().__init__(parent)
+        self.highlighted: list[str] = []
+
+    def highlightBlock(self, text: str) -> None:  # noqa: N802
+        """Record and highlight a block."""
+        self.highlighted.append(text)
+        super().highlightBlock(text)
+
+
+@pytest.fixture
+def editor(qtbot) -> QPlainTextEdit:  # noqa: ANN001
+    """Return an editor with a highlighted document holding SOURCE."""
+    editor = QPlainTextEdit()
+    qtbot.addWidget(editor)
+    editor.highlighter = CountingHighlighter(editor.document())
+    editor.setPlainText(SOURCE)
+    return editor
+
+
+@pytest.fixture
+def document(editor: QPlainTextEdit) -> QTextDocument:
+    """Return the editor's document."""
+    return editor.document()
+
+
+def _formats(document: QTextDocument, line: int) -> list[tuple[int, int, str]]:
+    """Get the (start, length, color) ranges highlighted on a line."""
+    block = document.findBlockByNumber(line)
+    return [
+        (fmt.start, fmt.length, fmt.format.foreground().color().name())
+        for fmt in block.layout().formats()
+    ]
+
+
+def test_triple_quoted_string_spans_blocks(document: QTextDocument) -> None:
+    """Test that docstring state is carried from block to block."""
+    states = [document.findBlockByNumber(i).userState() for i in range(6)]
+    in_string = [IN_TRIPLE_DOUBLE] * 3
+    assert states == [NORMAL, *in_string, NORMAL, NORMAL]
+
+    line = document.findBlockByNumber(3).text()
+    assert _formats(document, 3) == [(0, len(line), "#067d17")]
+
+
+def test_tokens_after_docstring(document: QTextDocument) -> None:
+    """Test keywords, builtins, strings and comments in one pass."""
+    assert _formats(document, 0) == [(0, 3, "#0033b3"), (4, 4, "#00627a")]
+    assert _formats(document, 5) == [
+        (4, 6, "#0033b3"),
+        (11, 3, "#871094"),
+        (15, 3, "#067d17"),
+        (21, 6, "#8c8c8c"),
+    ]
+
+
+def test_edits_rehighlight_only_affected_blocks(editor: QPlainTextEdit) -> None:
+    """Test that edits re-highlight a block, and later ones if state changed."""
+    document = editor.document()
+    highlighted = editor.highlighter.highlighted
+
+    highlighted.clear()
+    document.find("return").insertText("yield")
+    assert highlighted == ['    yield len("x")  # done']
+
+    # Reopening the docstring with other quotes leaves the rest unclosed
+    highlighted.clear()
+    document.find('"""Draw').insertText("'''Draw")
+    assert len(highlighted) == document.blockCount() - 1
+    assert document.findBlockByNumber(5).userState() == IN_TRIPLE_SINGLE
+    assert _formats(document, 5)[0][2] == "#067d17"
@@ -0,0 +1,157 @@
+"""Test tile-parallel rendering."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from peyote.ide.headless import HeadlessRenderer
+from peyote.ide.tiles import TileRenderer, split_tiles
+from peyote.util.framebuffer import Framebuffer
+
+
+def gradient(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Color each pixel by its coordinates."""
+    return np.stack([xs, ys, xs + ys], axis=-1) % 256
+
+
+def expected_gradient(w: int, h: int) -> np.ndarray:
+    """Return the RGB image gradient() renders on a w x h canvas."""
+    ys, xs = np.mgrid[0:h, 0:w]
+    return np.stack([xs, ys, xs + ys], axis=-1).astype(np.uint8)
+
+
+SKETCH = """
+import numpy as np
+
+
+def field(xs, ys):
+    return np.stack([xs, ys, xs + ys], axis=-1) % 256
+
+
+def draw():
+    renderTiles(field, tile_size=16, processes=PROCESSES, workers=2)
+"""
+
+
+def test_split_tiles_covers_canvas() -> None:
+    """Test that tiles cover the canvas once, with smaller edge tiles."""
+    tiles = split_tiles(100, 40, 32)
+    assert tiles[:4] == [
+        (0, 0, 32, 32),
+        (32, 0, 32, 32),
+        (64, 0, 32, 32),
+        (96, 0, 4, 32),
+    ]
+    assert tiles[-1] == (96, 32, 4, 8)
+
+    covered = np.zeros((40, 100), dtype=int)
+    for x, y, w, h in tiles:
+        covered[y : y + h, x : x + w] += 1
+    assert (covered == 1).all()
+
+
+def test_render_threads() -> None:
+    """Test that thread-rendered tiles land in the framebuffer."""
+    framebuffer = Framebuffer(70, 50)
+    progress = []
+    renderer = TileRenderer(framebuffer, tile_size=16, workers=4, progress_interval=0)
+    try:
+        assert renderer.render(gradient, on_progress=lambda: progress.append(1)) == 20
+    finally:
+        renderer.shutdown()
+
+    np.testing.assert_array_equal(framebuffer.rgb, expected_gradient(70, 50))
+    assert (framebuffer.alpha == 255).all()  # Three channels leave alpha alone
+    assert len(progress) == 20
+
+
+def test_render_premultiplied() -> None:
+    """Test that RGBA tiles are stored premultiplied when asked to."""
+    framebuffer = Framebuffer(8, 8, premultiplied=True)
+    renderer = TileRenderer(framebuffer, tile_size=4, workers=2)
+    try:
+        renderer.render(lambda xs, ys: np.full((*xs.shape, 4), (255, 128, 0, 128)))  # noqa: ARG005
+    finally:
+        renderer.shutdown()
+
+    assert (framebuffer.rgb == (128, 64, 0)).all()
+    assert (framebuffer.to_rgba() == (255, 128, 0, 128)).all()
+
+
+def test_render_origin_and_scale() -> None:
+    """Test that a framebuffer covering part of a scaled canvas gets its part."""
+    framebuffer = Framebuffer(20, 10)
+    renderer = TileRenderer(framebuffer, tile_size=8, workers=2)
+    renderer.origin = (40, 30)
+    renderer.scale = 2.0
+    try:
+        renderer.render(gradient)
+    finally:
+        renderer.shutdown()
+
+    ys, xs = np.mgrid[30:40, 40:60] / 2.0
+    expected = np.stack([xs, ys, xs + ys], axis=-1).astype(np.uint8)
+    np.testing.assert_array_equal(framebuffer.rgb, expected)
+
+
+def test_render_rejects_wrong_shape() -> None:
+    """Test that a tile function returning the wrong shape is an error."""
+    renderer = TileRenderer(Framebuffer(8, 8), tile_size=4)
+    try:
+        with pytest.raises(ValueError, match="expected"):
+            renderer.render(lambda xs, ys: xs)  # noqa: ARG005
+    finally:
+        renderer.shutdown()
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_sketch_render_tiles(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    processes: bool,
+) -> None:
+    """Test renderTiles() from a sketch, on threads and on processes."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    renderer = HeadlessRenderer(40, 24, f"tiles_{processes}")
+    try:
+        renderer.load({"main": f"PROCESSES = {processes}\n{SKETCH}"}, "main")
+        assert list(renderer.iter_frames(1)) == [0]
+        np.testing.assert_array_equal(
+            renderer.display_widget.rgb,
+            expected_gradient(40, 24),
+        )
+    finally:
+        renderer.unload()
+
+
+MIRROR_SKETCH = """
+import numpy as np
+
+
+def mirror(xs, ys):
+    return np.stack([WIDTH - 1 - xs, HEIGHT - 1 - ys, xs + ys], axis=-1) % 256
+
+
+def draw():
+    renderTiles(mirror, tile_size=16, processes=PROCESSES, workers=2)
+"""
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_sketch_render_tiles_globals(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    processes: bool,
+) -> None:
+    """Test that tile functions see WIDTH and HEIGHT, also in processes."""
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    renderer = HeadlessRenderer(40, 24, f"tile_globals_{processes}")
+    try:
+        renderer.load({"main": f"PROCESSES = {processes}\n{MIRROR_SKETCH}"}, "main")
+        assert list(renderer.iter_frames(1)) == [0]
+        expected = expected_gradient(40, 24)
+        expected[..., :2] = expected[::-1, ::-1, :2]
+        np.testing.assert_array_equal(renderer.display_widget.rgb, expected)
+    finally:
+        renderer.unload()